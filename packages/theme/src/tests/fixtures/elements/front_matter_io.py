@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Front matter I/O for MDX files.
+
+read_front_matter_head reads a file only up to the closing '---' and parses the YAML with libyaml when
+PyYAML was built with it. write_front_matter writes the new front matter and then streams the body
+from the original file, so the body is never decoded or copied through Python strings. Top-level keys
+whose values did not change keep their original text, so key order and comments survive an update.
+"""
+import os
+import re
+import shutil
+import logging
+
+import yaml # PyYAML
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# Same layout html_to_mdx_v10 has always written front matter with
+YAML_DUMP_OPTIONS = {"sort_keys": False, "allow_unicode": True, "default_flow_style": False, "width": 1000}
+
+FRONT_MATTER_DELIMITER = b"---"
+OPENING_LINE_PATTERN = re.compile(rb"---\s*\n")
+# A line that starts a top-level "key: value" entry (anything but indentation, comments and blank lines)
+TOP_LEVEL_ENTRY_PATTERN = re.compile(r"[^\s#]")
+# Lines that continue the current entry: indented, or a block sequence item, which PyYAML writes unindented
+CONTINUATION_LINE_PATTERN = re.compile(r"[ \t]|-(?:[ \t]|$)")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class FrontMatterHead:
+    """
+    The front matter of one MDX file. raw is the YAML text between the delimiters (None when the file has
+    no usable front matter), data the parsed mapping ({} if none) and body_offset the byte offset where
+    the body starts.
+    """
+    __slots__ = ("path", "raw", "data", "body_offset")
+
+    def __init__(self, path, raw, data, body_offset):
+        self.path = path
+        self.raw = raw
+        self.data = data
+        self.body_offset = body_offset
+
+
+def load_yaml(yaml_text):
+    return yaml.load(yaml_text, Loader=YAML_LOADER)
+
+
+def dump_yaml(data):
+    return yaml.dump(data, Dumper=YAML_DUMPER, **YAML_DUMP_OPTIONS)
+
+
+def read_front_matter_head(mdx_file_path):
+    """
+    Reads the front matter block of mdx_file_path, matching the '^---\\s*?\\n(.*?\\n)---\\s*?\\n?(.*)'
+    split the sidebar generator used on whole files: the first line after the opening delimiter is
+    always front matter, and the next line starting with '---' closes it.
+    """
+    try:
+        with open(mdx_file_path, 'rb') as f:
+            opening_line = f.readline()
+            if not OPENING_LINE_PATTERN.fullmatch(opening_line):
+                return FrontMatterHead(mdx_file_path, None, {}, 0)
+            yaml_lines = [f.readline()]
+            while yaml_lines[-1].endswith(b"\n"):
+                line = f.readline()
+                if line.startswith(FRONT_MATTER_DELIMITER):
+                    body_offset = f.tell() - len(line) + len(FRONT_MATTER_DELIMITER)
+                    if line[len(FRONT_MATTER_DELIMITER):].startswith((b"\n", b"\r\n")):
+                        body_offset = f.tell()
+                    break
+                yaml_lines.append(line)
+            else:
+                return FrontMatterHead(mdx_file_path, None, {}, 0) # Never closed
+    except FileNotFoundError:
+        return FrontMatterHead(mdx_file_path, None, {}, 0)
+
+    raw = b"".join(yaml_lines).decode('utf-8').replace("\r\n", "\n")
+    try:
+        data = load_yaml(raw)
+    except yaml.YAMLError as e:
+        logging.error(f"YAML err in {mdx_file_path}: {e}")
+        return FrontMatterHead(mdx_file_path, None, {}, 0)
+    if not isinstance(data, dict):
+        return FrontMatterHead(mdx_file_path, None, {}, body_offset)
+    return FrontMatterHead(mdx_file_path, raw, data, body_offset)
+
+
+def read_body(front_matter_head):
+    """The body as text, with newlines translated the way a text-mode read would."""
+    try:
+        with open(front_matter_head.path, 'rb') as f:
+            f.seek(front_matter_head.body_offset)
+            body_bytes = f.read()
+    except FileNotFoundError:
+        return ""
+    return body_bytes.decode('utf-8').replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_front_matter(mdx_file_path):
+    """Returns (front matter dict, body text), like the whole-file reader it replaces."""
+    front_matter_head = read_front_matter_head(mdx_file_path)
+    return front_matter_head.data, read_body(front_matter_head)
+
+
+def split_front_matter_entries(front_matter_head):
+    """
+    Splits raw front matter into ({key: (leading comment lines, entry text)}, trailing lines), pairing
+    top-level entries with the parsed keys in order. Returns None when the counts differ.
+    """
+    entries, pending_lines, current_lines = [], [], None
+    for line in front_matter_head.raw.splitlines(keepends=True):
+        if current_lines is not None and CONTINUATION_LINE_PATTERN.match(line):
+            current_lines.extend(pending_lines) # Blank lines and comments inside the value
+            current_lines.append(line)
+            pending_lines = []
+        elif TOP_LEVEL_ENTRY_PATTERN.match(line):
+            current_lines = [line]
+            entries.append(("".join(pending_lines), current_lines))
+            pending_lines = []
+        else:
+            pending_lines.append(line)
+
+    if len(entries) != len(front_matter_head.data): return None
+    entries_by_key = {key: (leading_text, "".join(entry_lines))
+                      for key, (leading_text, entry_lines) in zip(front_matter_head.data, entries)}
+    return entries_by_key, "".join(pending_lines)
+
+
+def render_front_matter(front_matter_head, front_matter_dict):
+    """
+    Returns the '---' delimited front matter text for front_matter_dict ("" for an empty dict). Entries
+    whose values are unchanged are copied from the original text; the result is parsed back once and the
+    whole mapping re-dumped if it does not round-trip (anchors shared between entries, flow mappings, ...).
+    """
+    if not front_matter_dict: return ""
+    split_entries = split_front_matter_entries(front_matter_head) if front_matter_head.raw else None
+    if split_entries is not None:
+        entries_by_key, trailing_text = split_entries
+        parts = []
+        for key, value in front_matter_dict.items():
+            leading_text, entry_text = entries_by_key.get(key, ("", None))
+            if entry_text is None or front_matter_head.data[key] != value:
+                entry_text = dump_yaml({key: value})
+            parts.append(leading_text)
+            parts.append(entry_text)
+        parts.append(trailing_text)
+        yaml_text = "".join(parts)
+        try:
+            if load_yaml(yaml_text) == front_matter_dict: return f"---\n{yaml_text}---\n"
+        except yaml.YAMLError:
+            pass
+    return f"---\n{dump_yaml(front_matter_dict)}---\n"
+
+
+def write_front_matter(front_matter_head, front_matter_dict, output_path=None):
+    """
+    Writes front_matter_dict followed by the body of front_matter_head's file to output_path (default:
+    the file itself, replaced atomically, keeping its permission bits). With no front matter the body is
+    written left-stripped.
+    """
+    output_path = output_path or front_matter_head.path
+    head_bytes = render_front_matter(front_matter_head, front_matter_dict).encode('utf-8')
+    tmp_path = output_path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as output_file:
+            output_file.write(head_bytes)
+            try:
+                with open(front_matter_head.path, 'rb') as source_file:
+                    source_file.seek(front_matter_head.body_offset)
+                    if not head_bytes:
+                        chunk = source_file.read(COPY_CHUNK_SIZE).lstrip()
+                        while not chunk and source_file.peek(1):
+                            chunk = source_file.read(COPY_CHUNK_SIZE).lstrip()
+                        output_file.write(chunk)
+                    shutil.copyfileobj(source_file, output_file, COPY_CHUNK_SIZE)
+            except FileNotFoundError:
+                pass
+        # A new file would get the umask's permissions; the rewritten one keeps those of the original
+        target_path = output_path if os.path.exists(output_path) else front_matter_head.path
+        if os.path.exists(target_path): shutil.copymode(target_path, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
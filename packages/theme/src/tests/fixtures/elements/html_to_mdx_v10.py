@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 import os
 import re
-import yaml # PyYAML
+import sys
+import copy
+import json
+import hashlib
 from bs4 import BeautifulSoup
 import argparse
 import logging
-from collections import defaultdict # Not strictly used in this version, but good for complex grouping
+from collections import defaultdict, Counter # defaultdict not strictly used in this version, but good for complex grouping
 import shutil
+import difflib
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import front_matter_io
 
 # --- Configuration Constants ---
 DEFAULT_SOURCE_HTML_ROOT = "ISBDM/docs/"
@@ -76,8 +84,25 @@ SECTION_CONFIG = {
 }
 
 
+# Name of the sidebar written by --sidebars_output (the key sidebars.ts uses)
+DEFAULT_SIDEBAR_NAME = "docs"
+
+# html_to_mdx_v2 --formats json writes each page's model, sidebar entries included, to <dest>/<page>.ast.json
+MODEL_AST_SUFFIX = ".ast.json"
+
+# Parsed sidebars are kept between runs; bump SIDEBAR_CACHE_VERSION when the parsing logic changes.
+DEFAULT_SIDEBAR_CACHE_FILE = ".sidebar_structure_cache.json"
+SIDEBAR_CACHE_VERSION = 1
+
+
 # --- Data Structures ---
 class NavItem:
+    # Slotted: big sidebars hold tens of thousands of these. Ancestor flags are packed into an int
+    # (bit i set = the stack ancestor at depth i is a last sibling) instead of a per-item list.
+    __slots__ = ("original_href", "normalized_key", "label", "html_level", "html_position_in_section",
+                 "source_html_file_path", "mdx_path", "is_last_sibling", "has_children_in_html",
+                 "stack_parent", "ancestor_flag_bits", "ancestor_flag_count")
+
     def __init__(self, original_href, normalized_key, label, html_level, # html_level is NOW ABSOLUTE
                  html_position_in_section, source_html_file_path, mdx_path=None):
         self.original_href = original_href
@@ -88,8 +113,19 @@ class NavItem:
         self.source_html_file_path = source_html_file_path
         self.mdx_path = mdx_path
         self.is_last_sibling = False
-        self.ancestor_is_last_flags = []
         self.has_children_in_html = False # New flag
+        self.stack_parent = None # Item beneath this one on the hierarchy stack (see determine_hierarchy_properties)
+        self.ancestor_flag_bits = 0
+        self.ancestor_flag_count = 0
+
+    @property
+    def ancestor_is_last_flags(self):
+        return tuple(bool(self.ancestor_flag_bits >> i & 1) for i in range(self.ancestor_flag_count))
+
+    @ancestor_is_last_flags.setter
+    def ancestor_is_last_flags(self, flags):
+        self.ancestor_flag_bits = sum(1 << i for i, is_last in enumerate(flags) if is_last)
+        self.ancestor_flag_count = len(flags)
 
     def __repr__(self):
         return (f"NavItem(key='{self.normalized_key}', lbl='{self.label}', abs_lvl={self.html_level}, "
@@ -168,236 +204,356 @@ def normalize_html_href_to_key(href, source_html_section_key, source_html_root_a
 
 
 # --- Core Parsing and Hierarchy Logic ---
-def parse_html_sidebar_nav(html_file_path, 
-                           source_html_section_key_for_norm, # e.g. "attributes", "ves" (for SES items), "intro"
-                           source_html_root_abs,
-                           children_absolute_base_level): # The absolute level for 0-indent items in this HTML
-    nav_items = []
+def model_ast_path(html_file_path, source_html_root_abs, model_dir):
+    rel_base = os.path.splitext(os.path.relpath(html_file_path, source_html_root_abs))[0]
+    return os.path.join(model_dir, rel_base + MODEL_AST_SUFFIX)
+
+def load_model_sidebar_links(html_file_path, source_html_root_abs, model_dir):
+    """
+    Returns the (href, label, local_indent_depth) sidebar links html_to_mdx_v2 recorded for html_file_path
+    in its model, or None when model_dir has no readable model for the page.
+    """
+    try:
+        with open(model_ast_path(html_file_path, source_html_root_abs, model_dir), 'r', encoding='utf-8') as f:
+            navigation = json.load(f)["navigation"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Ignoring unreadable model for {html_file_path}: {e}")
+        return None
+    # The converter numbers levels from 1 and already strips hrefs and normalizes labels
+    return [(entry["href"], normalize_text(entry["label"]), entry["level"] - 1) for entry in navigation]
+
+def parse_html_sidebar_links(html_file_path):
+    """Returns the (href, label, local_indent_depth) links of the page's sidebar, or None if the file is missing."""
     try:
         with open(html_file_path, 'r', encoding='utf-8') as f:
             soup = BeautifulSoup(f.read(), 'html.parser')
     except FileNotFoundError:
         logging.error(f"HTML file not found: {html_file_path}")
-        return nav_items
+        return None
 
     nav_container_candidates = soup.select('div.col-md-5 nav.navISBDMSection, div.col-md-6 nav.navISBDMSection, div.col-md-12 nav.navISBDMSection, nav.navISBDMSection')
-    
-    item_position_counter = 0
+    sidebar_links = []
     for nav_container in nav_container_candidates:
         link_divs = nav_container.find_all('div', class_='d-flex', recursive=False)
         for div in link_divs:
             link_tag = div.find('a', href=True)
             if link_tag:
-                item_position_counter += 1
-                href = link_tag.get('href', '').strip()
-                label = normalize_text(link_tag.get_text())
-                
                 indent_icons = div.find_all('i', class_='bi-arrow-return-right')
-                local_indent_depth = len(indent_icons) # 0 for no icons, 1 for one icon...
-                
-                # Absolute level combines base for this HTML's children + local indent
-                absolute_level = children_absolute_base_level + local_indent_depth
-
-                # If parsing ISBDM/docs/ves/ISBDMSES.html, the normalized key needs to point to "ses/..."
-                current_section_key_for_norm = SES_TARGET_MDX_SECTION_KEY if source_html_section_key_for_norm == SES_HTML_SOURCE_DIR_FROM_ROOT and "ISBDMSES" in html_file_path else source_html_section_key_for_norm
-                
-                normalized_key = normalize_html_href_to_key(href, current_section_key_for_norm, source_html_root_abs)
-                if not normalized_key:
-                    logging.warning(f"Could not normalize href '{href}' in {html_file_path} for section key '{current_section_key_for_norm}'. Skipping item '{label}'.")
-                    continue
-                
-                nav_items.append(NavItem(
-                    original_href=href, normalized_key=normalized_key, label=label,
-                    html_level=absolute_level, # Store ABSOLUTE level
-                    html_position_in_section=item_position_counter,
-                    source_html_file_path=html_file_path
-                ))
+                # 0 for no icons, 1 for one icon...
+                sidebar_links.append((link_tag.get('href', '').strip(), normalize_text(link_tag.get_text()), len(indent_icons)))
+    return sidebar_links
+
+def parse_html_sidebar_nav(html_file_path, 
+                           source_html_section_key_for_norm, # e.g. "attributes", "ves" (for SES items), "intro"
+                           source_html_root_abs,
+                           children_absolute_base_level, # The absolute level for 0-indent items in this HTML
+                           model_dir=None): # html_to_mdx_v2 output holding the page's model, used instead of parsing
+    nav_items = []
+    sidebar_links = load_model_sidebar_links(html_file_path, source_html_root_abs, model_dir) if model_dir else None
+    if sidebar_links is None:
+        sidebar_links = parse_html_sidebar_links(html_file_path)
+        if sidebar_links is None: return nav_items
+
+    item_position_counter = 0
+    for href, label, local_indent_depth in sidebar_links:
+        item_position_counter += 1
+        # Absolute level combines base for this HTML's children + local indent
+        absolute_level = children_absolute_base_level + local_indent_depth
+
+        # If parsing ISBDM/docs/ves/ISBDMSES.html, the normalized key needs to point to "ses/..."
+        current_section_key_for_norm = SES_TARGET_MDX_SECTION_KEY if source_html_section_key_for_norm == SES_HTML_SOURCE_DIR_FROM_ROOT and "ISBDMSES" in html_file_path else source_html_section_key_for_norm
+        
+        normalized_key = normalize_html_href_to_key(href, current_section_key_for_norm, source_html_root_abs)
+        if not normalized_key:
+            logging.warning(f"Could not normalize href '{href}' in {html_file_path} for section key '{current_section_key_for_norm}'. Skipping item '{label}'.")
+            continue
+        
+        nav_items.append(NavItem(
+            original_href=href, normalized_key=normalized_key, label=label,
+            html_level=absolute_level, # Store ABSOLUTE level
+            html_position_in_section=item_position_counter,
+            source_html_file_path=html_file_path
+        ))
     return nav_items
 
 def determine_hierarchy_properties(section_nav_items: list[NavItem]):
-    # ... (This function remains largely the same as in the previous complete Python script)
-    # It operates on the .html_level which is now absolute.
+    """
+    Sets is_last_sibling, has_children_in_html and ancestor_is_last_flags in one pass over the section.
+    Items form a tree through stack_parent: the item beneath each one on the hierarchy stack, which is
+    popped while its depth is >= the new item's absolute level. ancestor_is_last_flags are the
+    is_last_sibling values along that chain, read once every sibling has been seen.
+    """
     if not section_nav_items: return
 
-    # Pass 1: Determine is_last_sibling for all items
-    for i, current_item in enumerate(section_nav_items):
-        current_item.is_last_sibling = True 
-        for j in range(i + 1, len(section_nav_items)):
-            next_item = section_nav_items[j]
-            if next_item.html_level == current_item.html_level:
-                current_item.is_last_sibling = False; break
-            if next_item.html_level < current_item.html_level:
-                break
-    
-    # Pass 2: Determine ancestor_is_last_flags and has_children_in_html
-    parent_is_last_at_level_stack = [] 
-    for i, item in enumerate(section_nav_items):
-        while len(parent_is_last_at_level_stack) >= item.html_level:
-            parent_is_last_at_level_stack.pop()
-        item.ancestor_is_last_flags = list(parent_is_last_at_level_stack)
-        if len(parent_is_last_at_level_stack) < item.html_level :
-             parent_is_last_at_level_stack.append(item.is_last_sibling)
-        else: 
-             parent_is_last_at_level_stack[item.html_level -1] = item.is_last_sibling
-        
-        # Determine if item has children in this HTML structure
-        if i + 1 < len(section_nav_items) and section_nav_items[i+1].html_level > item.html_level:
-            item.has_children_in_html = True
+    open_items = []  # Items that may still get a later sibling; html_level strictly increasing
+    stack_top, stack_depth = None, 0
+    previous_item = None
+    for item in section_nav_items:
+        item.is_last_sibling = True
+        item.has_children_in_html = False
+        # A lower-level item closes every deeper open item; an equal-level one ends its predecessor's run
+        while open_items and open_items[-1].html_level > item.html_level: open_items.pop()
+        if open_items and open_items[-1].html_level == item.html_level: open_items.pop().is_last_sibling = False
+        open_items.append(item)
+
+        if previous_item is not None and item.html_level > previous_item.html_level:
+            previous_item.has_children_in_html = True
+        previous_item = item
+
+        while stack_depth >= item.html_level:
+            stack_top, stack_depth = stack_top.stack_parent, stack_depth - 1
+        item.stack_parent = stack_top
+        stack_top, stack_depth = item, stack_depth + 1
+
+    # Parents precede their children, so each item extends an already finished parent's flags by one bit
+    for item in section_nav_items:
+        parent = item.stack_parent
+        if parent is None:
+            item.ancestor_flag_bits, item.ancestor_flag_count = 0, 0
+        else:
+            item.ancestor_flag_bits = parent.ancestor_flag_bits | (parent.is_last_sibling << parent.ancestor_flag_count)
+            item.ancestor_flag_count = parent.ancestor_flag_count + 1
 
 def generate_sidebar_prefix(nav_item: NavItem):
-    # ... (This function remains the same, uses absolute nav_item.html_level)
+    # Uses absolute nav_item.html_level; siblings share prefixes, so strings come from a cache.
     if nav_item.html_level < 2: return None
+    return _sidebar_prefix(nav_item.html_level, nav_item.is_last_sibling, nav_item.ancestor_flag_bits,
+                           nav_item.ancestor_flag_count)
+
+@lru_cache(maxsize=None)
+def _sidebar_prefix(html_level, is_last_sibling, ancestor_flag_bits, ancestor_flag_count):
     prefix_parts = []
-    for i in range(nav_item.html_level - 1):
-        is_ancestor_last = nav_item.ancestor_is_last_flags[i] if i < len(nav_item.ancestor_is_last_flags) else True
+    for i in range(html_level - 1):
+        is_ancestor_last = ancestor_flag_bits >> i & 1 if i < ancestor_flag_count else True
         prefix_parts.append("   " if is_ancestor_last else "│  ")
-    prefix_parts.append("└─ " if nav_item.is_last_sibling else "├─ ")
+    prefix_parts.append("└─ " if is_last_sibling else "├─ ")
     return "".join(prefix_parts)
 
-def cache_all_html_sidebar_structures(source_html_root_abs):
-    cached_structures = {} # Key: target_mdx_section_key (e.g., "attributes", "ses"), Value: list[NavItem]
+def parse_section_sidebar(mdx_section_key_target, config, source_html_root_abs, model_dir=None):
+    """
+    Parses one SECTION_CONFIG section's sidebar HTML into NavItems in sidebar order (no hierarchy yet).
+    With model_dir, pages html_to_mdx_v2 already parsed are read from their model instead.
+    """
+    children_base_abs_level = config["children_absolute_base_level"]
+    source_html_dir_rel = config["source_html_dir"] # Relative to source_html_root_abs
+
+    current_section_items = []
+
+    if "source_html_files" in config: # Special case like 'relationships'
+        logging.info(f"Parsing combined HTMLs for: {mdx_section_key_target}")
+        pos_counter = 0
+        temp_items_combined = []
+        for html_file_rel_to_source_root in config["source_html_files"]:
+            html_file_abs_path = os.path.join(source_html_root_abs, html_file_rel_to_source_root)
+            # The section key for normalization is the directory of these files (e.g. "relationships")
+            section_key_for_norm = os.path.dirname(html_file_rel_to_source_root)
+
+            items_from_html = parse_html_sidebar_nav(html_file_abs_path,
+                                                     section_key_for_norm,
+                                                     source_html_root_abs,
+                                                     children_base_abs_level,
+                                                     model_dir)
+            for item in items_from_html:
+                pos_counter += 1
+                item.html_position_in_section = pos_counter
+            temp_items_combined.extend(items_from_html)
+
+        unique_items_dict = {} # Deduplicate based on normalized_key
+        for item in temp_items_combined:
+            if item.normalized_key not in unique_items_dict:
+                unique_items_dict[item.normalized_key] = item
+        current_section_items = list(unique_items_dict.values())
+
+    else: # General case for single source_html_file
+        html_file_abs_path = os.path.join(source_html_root_abs, source_html_dir_rel, config["source_html_file"])
+        # The section key for normalization within parse_html_sidebar_nav should be the target mdx section key
+        # especially for SES where source dir is 'ves' but target is 'ses'.
+        norm_key_context = mdx_section_key_target
+        if os.path.exists(html_file_abs_path):
+            logging.info(f"Parsing HTML: {html_file_abs_path} for MDX section '{mdx_section_key_target}' with children_base_abs_level {children_base_abs_level}")
+            current_section_items = parse_html_sidebar_nav(
+               html_file_abs_path,
+               norm_key_context, # Use target section key for context, esp. for SES mapping
+               source_html_root_abs,
+               children_base_abs_level,
+               model_dir
+            )
+        else:
+            logging.warning(f"HTML source {html_file_abs_path} not found for section {mdx_section_key_target}")
+
+    current_section_items.sort(key=lambda x: x.html_position_in_section)
+    return current_section_items
+
+def section_source_html_files(config, source_html_root_abs):
+    if "source_html_files" in config:
+        return [os.path.join(source_html_root_abs, rel_path) for rel_path in config["source_html_files"]]
+    return [os.path.join(source_html_root_abs, config["source_html_dir"], config["source_html_file"])]
+
+def compute_section_cache_key(mdx_section_key_target, config, source_html_root_abs, section_config_hash, model_dir=None):
+    # Changes whenever a source HTML file's bytes (or its model's), the section config or the cache format change
+    file_paths = section_source_html_files(config, source_html_root_abs)
+    if model_dir:
+        file_paths += [model_ast_path(html_file_abs_path, source_html_root_abs, model_dir) for html_file_abs_path in file_paths]
+    file_hashes = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f: file_hashes.append(hashlib.sha256(f.read()).hexdigest())
+        except FileNotFoundError:
+            file_hashes.append(None)
+    key_material = [SIDEBAR_CACHE_VERSION, section_config_hash, mdx_section_key_target, source_html_root_abs, file_hashes]
+    return hashlib.sha256(json.dumps(key_material).encode('utf-8')).hexdigest()
+
+def load_sidebar_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f: sidebar_cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable sidebar cache {cache_file}: {e}")
+        return {}
+    return sidebar_cache.get("sections", {}) if sidebar_cache.get("version") == SIDEBAR_CACHE_VERSION else {}
+
+def save_sidebar_cache(cache_file, cache_sections):
+    tmp_path = cache_file + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": SIDEBAR_CACHE_VERSION, "sections": cache_sections}, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_file)
+
+def _parse_section_sidebar_task(task):
+    return parse_section_sidebar(*task)
+
+def cache_all_html_sidebar_structures(source_html_root_abs, workers=1, cache_file=None, update_cache=True, model_dir=None):
+    """
+    Parses every SECTION_CONFIG sidebar. Returns (cached_structures, nav_item_index): the ordered
+    NavItem list per section key, and build_nav_item_index's lookup table over it.
+    With cache_file, sections whose source HTML and config are unchanged since the last run are loaded
+    from it instead of parsed; the rest are parsed in a pool of `workers` processes. With update_cache
+    False the cache is only read, never (re)written. With model_dir (an html_to_mdx_v2 output directory
+    written with --formats json), sidebars come from the converter's page models where there is one.
+    """
+    section_config_hash = hashlib.sha256(json.dumps(SECTION_CONFIG, sort_keys=True).encode('utf-8')).hexdigest()
+    cache_sections = load_sidebar_cache(cache_file) if cache_file else {}
+    section_cache_keys, parsed_sections, sections_to_parse = {}, {}, []
 
     for mdx_section_key_target, config in SECTION_CONFIG.items():
         logging.info(f"Configuring section: {mdx_section_key_target}")
-        
-        children_base_abs_level = config["children_absolute_base_level"]
-        source_html_dir_rel = config["source_html_dir"] # Relative to source_html_root_abs
-
-        current_section_items = []
-
-        if "source_html_files" in config: # Special case like 'relationships'
-            logging.info(f"Parsing combined HTMLs for: {mdx_section_key_target}")
-            pos_counter = 0
-            temp_items_combined = []
-            for html_file_rel_to_source_root in config["source_html_files"]:
-                html_file_abs_path = os.path.join(source_html_root_abs, html_file_rel_to_source_root)
-                # The section key for normalization is the directory of these files (e.g. "relationships")
-                section_key_for_norm = os.path.dirname(html_file_rel_to_source_root)
-                
-                items_from_html = parse_html_sidebar_nav(html_file_abs_path, 
-                                                         section_key_for_norm, 
-                                                         source_html_root_abs, 
-                                                         children_base_abs_level)
-                for item in items_from_html:
-                    pos_counter += 1
-                    item.html_position_in_section = pos_counter
-                temp_items_combined.extend(items_from_html)
-            
-            unique_items_dict = {} # Deduplicate based on normalized_key
-            for item in temp_items_combined:
-                if item.normalized_key not in unique_items_dict:
-                    unique_items_dict[item.normalized_key] = item
-            current_section_items = list(unique_items_dict.values())
-
-        else: # General case for single source_html_file
-            html_file_abs_path = os.path.join(source_html_root_abs, source_html_dir_rel, config["source_html_file"])
-            # The section key for normalization within parse_html_sidebar_nav should be the target mdx section key
-            # especially for SES where source dir is 'ves' but target is 'ses'.
-            norm_key_context = mdx_section_key_target 
-            if os.path.exists(html_file_abs_path):
-                logging.info(f"Parsing HTML: {html_file_abs_path} for MDX section '{mdx_section_key_target}' with children_base_abs_level {children_base_abs_level}")
-                current_section_items = parse_html_sidebar_nav(
-                   html_file_abs_path, 
-                   norm_key_context, # Use target section key for context, esp. for SES mapping
-                   source_html_root_abs,
-                   children_base_abs_level
-                )
-            else:
-                logging.warning(f"HTML source {html_file_abs_path} not found for section {mdx_section_key_target}")
-        
+        section_cache_keys[mdx_section_key_target] = compute_section_cache_key(
+            mdx_section_key_target, config, source_html_root_abs, section_config_hash, model_dir)
+        cached_section = cache_sections.get(mdx_section_key_target)
+        if cached_section and cached_section["key"] == section_cache_keys[mdx_section_key_target]:
+            parsed_sections[mdx_section_key_target] = [NavItem(*row) for row in cached_section["items"]]
+        else:
+            sections_to_parse.append(mdx_section_key_target)
+    logging.info(f"Sidebar sections from cache: {len(parsed_sections)}; to parse: {len(sections_to_parse)}")
+
+    tasks = [(mdx_section_key_target, SECTION_CONFIG[mdx_section_key_target], source_html_root_abs, model_dir)
+             for mdx_section_key_target in sections_to_parse]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+            parsed_items = list(pool.map(_parse_section_sidebar_task, tasks))
+    else:
+        parsed_items = [_parse_section_sidebar_task(task) for task in tasks]
+    for mdx_section_key_target, current_section_items in zip(sections_to_parse, parsed_items):
+        parsed_sections[mdx_section_key_target] = current_section_items
+        cache_sections[mdx_section_key_target] = {
+            "key": section_cache_keys[mdx_section_key_target],
+            "items": [[item.original_href, item.normalized_key, item.label, item.html_level,
+                       item.html_position_in_section, item.source_html_file_path] for item in current_section_items]}
+
+    if cache_file and update_cache and sections_to_parse:
+        cache_sections = {key: value for key, value in cache_sections.items() if key in SECTION_CONFIG}
+        try:
+            save_sidebar_cache(cache_file, cache_sections)
+        except OSError as e:
+            logging.warning(f"Could not write sidebar cache {cache_file}: {e}")
+
+    cached_structures = {} # Key: target_mdx_section_key (e.g., "attributes", "ses"), Value: list[NavItem]
+    for mdx_section_key_target in SECTION_CONFIG:
+        current_section_items = parsed_sections[mdx_section_key_target]
         if current_section_items:
-            current_section_items.sort(key=lambda x: x.html_position_in_section)
             determine_hierarchy_properties(current_section_items)
             cached_structures[mdx_section_key_target] = current_section_items
             logging.debug(f"Cached {len(current_section_items)} items for section '{mdx_section_key_target}'. First: {current_section_items[0] if current_section_items else 'N/A'}")
         else:
             logging.info(f"No items parsed for section '{mdx_section_key_target}'.")
 
-    return cached_structures
-
-def get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, cached_structures):
-    # ... (same as before, but ensure mdx_key_full correctly identifies section for lookup)
-    mdx_key_full = normalize_mdx_path_to_key(mdx_file_path_abs, target_mdx_root_abs)
+    return cached_structures, build_nav_item_index(cached_structures)
+
+def build_nav_item_index(cached_structures):
+    # Section key -> {normalized_key: NavItem}. The first item wins, matching the old in-order scan.
+    nav_item_index = {}
+    for section_key, nav_items in cached_structures.items():
+        section_index = nav_item_index[section_key] = {}
+        for nav_item in nav_items:
+            section_index.setdefault(nav_item.normalized_key, nav_item)
+    return nav_item_index
+
+def resolve_section_key(mdx_key_full, nav_item_index):
+    # "index" -> "root_index"; otherwise the longest directory prefix of the key that is a cached section
+    # (e.g. "elements/statements" before "elements"), falling back to the top-level directory name.
+    if mdx_key_full == "index": return "root_index"
     parts = mdx_key_full.split('/')
-    
-    # Determine section_key from mdx_key_full
-    # If mdx_key_full is "elements/statements/index", section_key should be "statements"
-    # If mdx_key_full is "elements/index", section_key should be "elements"
-    # If mdx_key_full is "intro/index", section_key should be "intro"
-    # If mdx_key_full is "index", section_key should be "root_index" (as defined in SECTION_CONFIG)
-
-    section_key_from_mdx = ""
-    if mdx_key_full == "index":
-        section_key_from_mdx = "root_index"
-    elif len(parts) == 1: # e.g. "somefile" (if docs/somefile.mdx exists, unlikely for sections)
-        section_key_from_mdx = parts[0] # This would need its own SECTION_CONFIG entry
-    elif len(parts) > 1:
-        # Is docs/elements/index.mdx (key "elements/index") part of "elements" section NavItems
-        # or is docs/elements/statements/index.mdx (key "elements/statements/index") part of "statements"?
-        # The NavItems are cached under their final MDX section key.
-        # So, if MDX is docs/attributes/1022.mdx -> key "attributes/1022" -> lookup in cached_structures["attributes"]
-        # If MDX is docs/ses/index.mdx -> key "ses/index" -> lookup in cached_structures["ses"]
-        section_key_from_mdx = parts[0] # General assumption, might need refinement if sub-sub-sections exist as keys
-        if section_key_from_mdx in cached_structures:
-            pass # Good
-        elif len(parts) > 1 and "/".join(parts[:2]) in cached_structures: # e.g. "elements/statements"
-            section_key_from_mdx = "/".join(parts[:2])
-        # This needs to be robust: map MDX path to the key used in SECTION_CONFIG and thus cached_structures.
-        # For now, assume simple top-level directory name matches section_key
-        if section_key_from_mdx == "docs": # should not happen with relpath
-             section_key_from_mdx = "root_index"
-
-
-    nav_item_list = cached_structures.get(section_key_from_mdx)
-    if not nav_item_list:
-        logging.debug(f"No cached HTML structure for inferred section key '{section_key_from_mdx}' (from MDX: {mdx_file_path_abs}). Keys available: {list(cached_structures.keys())}")
-        return None
+    for prefix_length in range(len(parts) - 1, 0, -1):
+        candidate = "/".join(parts[:prefix_length])
+        if candidate in nav_item_index: return candidate
+    return "root_index" if parts[0] == "docs" else parts[0]
+
+def get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, nav_item_index):
+    # NavItems are cached under their final MDX section key, so docs/attributes/1022.mdx (key
+    # "attributes/1022") is looked up in nav_item_index["attributes"] and docs/index.mdx in "root_index".
+    mdx_key_full = normalize_mdx_path_to_key(mdx_file_path_abs, target_mdx_root_abs)
+    section_key_from_mdx = resolve_section_key(mdx_key_full, nav_item_index)
 
-    for nav_item in nav_item_list:
-        if nav_item.normalized_key == mdx_key_full:
-            nav_item.mdx_path = mdx_file_path_abs 
-            return nav_item
-            
-    logging.debug(f"No NavItem for MDX key '{mdx_key_full}' in section '{section_key_from_mdx}' structure after checking {len(nav_item_list)} items.")
-    return None
+    section_index = nav_item_index.get(section_key_from_mdx)
+    if not section_index:
+        logging.debug(f"No cached HTML structure for inferred section key '{section_key_from_mdx}' (from MDX: {mdx_file_path_abs}). Keys available: {list(nav_item_index.keys())}")
+        return None
 
-# --- Front Matter Read/Write (same as before) ---
-def read_front_matter(mdx_file_path): # ... (same)
-    try:
-        with open(mdx_file_path, 'r', encoding='utf-8') as f: content = f.read()
-    except FileNotFoundError: return {}, ""
-    fm_match = re.match(r'^---\s*?\n(.*?\n)---\s*?\n?(.*)', content, re.DOTALL)
-    if fm_match:
-        fm_str, body_content = fm_match.group(1), fm_match.group(2) if fm_match.group(2) is not None else ""
-        try:
-            fm_dict = yaml.safe_load(fm_str)
-            return (fm_dict if isinstance(fm_dict, dict) else {}), body_content
-        except yaml.YAMLError as e: logging.error(f"YAML err in {mdx_file_path}: {e}"); return {}, content
-    return {}, content
+    nav_item = section_index.get(mdx_key_full)
+    if nav_item is None:
+        logging.debug(f"No NavItem for MDX key '{mdx_key_full}' in section '{section_key_from_mdx}' structure ({len(section_index)} items).")
+        return None
+    nav_item.mdx_path = mdx_file_path_abs
+    return nav_item
 
-def write_front_matter(mdx_file_path, front_matter_dict, body_content, dry_run=False, dry_run_output_dir=None, target_mdx_root_abs=None): # ... (same, but added target_mdx_root_abs for dry_run pathing)
+# --- Front Matter Read/Write (head-only reads, body spliced through; see front_matter_io) ---
+def write_front_matter(front_matter_head, front_matter_dict, dry_run=False, dry_run_output_dir=None, target_mdx_root_abs=None):
+    mdx_file_path = front_matter_head.path
     if "customProps" in front_matter_dict and not front_matter_dict["customProps"]: del front_matter_dict["customProps"]
-    final_content = body_content.lstrip() if not front_matter_dict else f"---\n{yaml.dump(front_matter_dict, sort_keys=False, allow_unicode=True, default_flow_style=False, width=1000)}---\n{body_content}"
     if dry_run:
         logging.info(f"[DRY RUN] Would write to {mdx_file_path} (FM keys: {list(front_matter_dict.keys())})")
         if dry_run_output_dir and target_mdx_root_abs: # Ensure target_mdx_root_abs is available
             rel_path = os.path.relpath(mdx_file_path, target_mdx_root_abs)
             dry_run_file_path = os.path.join(dry_run_output_dir, rel_path)
             os.makedirs(os.path.dirname(dry_run_file_path), exist_ok=True)
-            with open(dry_run_file_path, 'w', encoding='utf-8') as f_dry: f_dry.write(final_content)
+            front_matter_io.write_front_matter(front_matter_head, front_matter_dict, dry_run_file_path)
         return
-    try:
-        with open(mdx_file_path, 'w', encoding='utf-8') as f: f.write(final_content)
-    except Exception as e: logging.error(f"Error writing FM to {mdx_file_path}: {e}")
+    front_matter_io.write_front_matter(front_matter_head, front_matter_dict)
+
 
+def front_matter_is_unchanged(existing_fm, updated_fm):
+    # write_front_matter drops an empty customProps, so a missing and an empty one write the same file
+    def comparable(fm): return {key: value for key, value in fm.items() if key != "customProps" or value}
+    return comparable(existing_fm) == comparable(updated_fm)
 
-def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, cached_structures, dry_run, dry_run_output_dir):
-    # ... (main logic as before, but use absolute levels from NavItem.html_level for decisions)
+def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index, dry_run, dry_run_output_dir, check=False):
+    """
+    Updates one MDX file's sidebar front matter. Returns "changed", "unchanged" or "error" (the write failed);
+    files whose front matter would be semantically the same are not rewritten, and with check nothing is
+    written at all.
+    """
     logging.info(f"Processing MDX: {mdx_file_path_abs}")
-    nav_item = get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, cached_structures)
-    existing_fm, body_content = read_front_matter(mdx_file_path_abs)
-    
-    updated_fm = dict(existing_fm) # Start with existing FM
+    front_matter_head = front_matter_io.read_front_matter_head(mdx_file_path_abs)
+    updated_fm = compute_updated_front_matter(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized,
+                                              nav_item_index, front_matter_head.data)
+    return _write_if_changed(front_matter_head, updated_fm, dry_run, dry_run_output_dir, target_mdx_root_abs, check)
+
+def compute_updated_front_matter(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index, existing_fm):
+    """Returns the sidebar front matter the file should have; existing_fm is left untouched."""
+    nav_item = get_mdx_nav_item_from_cache(mdx_file_path_abs, target_mdx_root_abs, nav_item_index)
+    updated_fm = copy.deepcopy(existing_fm) # Start with existing FM (deep: customProps is edited in place)
 
     if not nav_item:
         logging.debug(f"No HTML NavItem for {mdx_file_path_abs}. Cleaning up potentially stale sidebar FM.")
@@ -406,8 +562,7 @@ def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_categor
             if key_to_remove in updated_fm: del updated_fm[key_to_remove]
         if "customProps" in updated_fm and isinstance(updated_fm["customProps"], dict) and "sidebar_prefix" in updated_fm["customProps"]:
             del updated_fm["customProps"]["sidebar_prefix"]
-        write_front_matter(mdx_file_path_abs, updated_fm, body_content, dry_run, dry_run_output_dir, target_mdx_root_abs)
-        return True
+        return updated_fm
 
     # 1. Core FM fields from NavItem (html_level is now absolute)
     updated_fm["sidebar_label"] = nav_item.label
@@ -452,8 +607,165 @@ def process_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_categor
     elif "sidebar_prefix" in updated_fm["customProps"]:
         del updated_fm["customProps"]["sidebar_prefix"]
             
-    write_front_matter(mdx_file_path_abs, updated_fm, body_content, dry_run, dry_run_output_dir, target_mdx_root_abs)
-    return True
+    return updated_fm
+
+def _write_if_changed(front_matter_head, updated_fm, dry_run, dry_run_output_dir, target_mdx_root_abs, check):
+    if front_matter_is_unchanged(front_matter_head.data, updated_fm):
+        logging.debug(f"Front matter unchanged: {front_matter_head.path}")
+        return "unchanged"
+    if check:
+        logging.info(f"[CHECK] Front matter would change: {front_matter_head.path}")
+    else:
+        try:
+            write_front_matter(front_matter_head, updated_fm, dry_run, dry_run_output_dir, target_mdx_root_abs)
+        except OSError as e:
+            logging.error(f"Error writing FM to {front_matter_head.path}: {e}")
+            return "error"
+    return "changed"
+
+# --- Front matter diff report (review mode: nothing under the docs root is written) ---
+_DIFF_WORKER_STATE = None # (target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index) in pool workers
+
+def diff_single_mdx_file(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index):
+    """Returns (path relative to the docs root, unified diff of the front matter block or "", error or None)."""
+    rel_path = os.path.relpath(mdx_file_path_abs, target_mdx_root_abs).replace(os.sep, '/')
+    try:
+        front_matter_head = front_matter_io.read_front_matter_head(mdx_file_path_abs)
+        updated_fm = compute_updated_front_matter(mdx_file_path_abs, target_mdx_root_abs, main_category_files_abs_normalized,
+                                                  nav_item_index, front_matter_head.data)
+        if front_matter_is_unchanged(front_matter_head.data, updated_fm): return rel_path, "", None
+        if "customProps" in updated_fm and not updated_fm["customProps"]: del updated_fm["customProps"]
+        old_head = f"---\n{front_matter_head.raw}---\n" if front_matter_head.raw is not None else ""
+        new_head = front_matter_io.render_front_matter(front_matter_head, updated_fm)
+        diff_lines = difflib.unified_diff(old_head.splitlines(keepends=True), new_head.splitlines(keepends=True),
+                                          f"a/{rel_path}", f"b/{rel_path}")
+        return rel_path, "".join(diff_lines), None
+    except Exception as e:
+        return rel_path, "", f"{type(e).__name__}: {e}"
+
+def _init_diff_worker(target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index):
+    global _DIFF_WORKER_STATE
+    _DIFF_WORKER_STATE = (target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index)
+
+def _diff_worker_task(mdx_file_path_abs):
+    return diff_single_mdx_file(mdx_file_path_abs, *_DIFF_WORKER_STATE)
+
+def diff_mdx_files(mdx_file_paths, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index, workers=1):
+    """Diffs every file's front matter (in a pool when workers > 1); returns the results in input order."""
+    if workers > 1 and len(mdx_file_paths) > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_diff_worker,
+                                 initargs=(target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index)) as pool:
+            return list(pool.map(_diff_worker_task, mdx_file_paths, chunksize=32))
+    return [diff_single_mdx_file(path, target_mdx_root_abs, main_category_files_abs_normalized, nav_item_index)
+            for path in mdx_file_paths]
+
+def write_diff_report(report_path, diff_results):
+    """Writes a .json summary or, for any other extension, one patch of all front matter changes. Returns counts."""
+    counts = Counter()
+    for _, diff_text, error in diff_results:
+        counts["error" if error else "changed" if diff_text else "unchanged"] += 1
+    if report_path.endswith(".json"):
+        report = {"counts": {"files": len(diff_results), **counts},
+                  "changed": [{"path": rel_path, "diff": diff_text} for rel_path, diff_text, error in diff_results if diff_text],
+                  "errors": [{"path": rel_path, "error": error} for rel_path, _, error in diff_results if error]}
+        with open(report_path, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.writelines(diff_text for _, diff_text, _ in diff_results if diff_text)
+    return counts
+
+# --- Consolidated sidebars file (alternative to per-page front matter) ---
+def resolve_doc_id(nav_item, target_mdx_root_abs):
+    """The Docusaurus doc id of nav_item's MDX file (honouring a front matter id), or None if it has no file."""
+    for extension in (".mdx", ".md"):
+        mdx_file_path = os.path.join(target_mdx_root_abs, *nav_item.normalized_key.split('/')) + extension
+        if os.path.isfile(mdx_file_path): break
+    else:
+        return None
+    front_matter_id = front_matter_io.read_front_matter_head(mdx_file_path).data.get("id")
+    if front_matter_id is None: return nav_item.normalized_key
+    doc_dir = os.path.dirname(nav_item.normalized_key)
+    return f"{doc_dir}/{front_matter_id}" if doc_dir else str(front_matter_id)
+
+def build_sidebar_entry(nav_item, doc_id, is_main_category, child_entries):
+    # Carries what the per-page mode writes to front matter: label, class name, level and prefix
+    custom_props = {"sidebar_level": nav_item.html_level}
+    prefix = None if is_main_category else generate_sidebar_prefix(nav_item)
+    if prefix: custom_props["sidebar_prefix"] = prefix
+    if child_entries:
+        entry = {"type": "category", "label": nav_item.label, "link": {"type": "doc", "id": doc_id}, "items": child_entries}
+    else:
+        entry = {"type": "doc", "id": doc_id, "label": nav_item.label}
+    if is_main_category: entry["className"] = CLASS_MAIN_CATEGORY_PAGE
+    entry["customProps"] = custom_props
+    return entry
+
+def build_section_sidebar_entries(section_key, cached_structures, target_mdx_root_abs, main_category_files_abs_normalized, visited_sections):
+    """
+    Nests a section's NavItems by html_level into sidebar entries. A childless "<section>/index" item for
+    another, not yet placed section gets that section's entries as its children.
+    """
+    tree = []
+    open_children = [(0, tree)] # (html_level, child list) of the items the next one may nest under
+    for nav_item in cached_structures[section_key]:
+        while open_children[-1][0] >= nav_item.html_level: open_children.pop()
+        children = []
+        open_children[-1][1].append((nav_item, children))
+        open_children.append((nav_item.html_level, children))
+
+    def to_entries(nodes):
+        entries = []
+        for nav_item, children in nodes:
+            child_entries = to_entries(children)
+            linked_section, _, leaf = nav_item.normalized_key.rpartition('/')
+            if (not child_entries and leaf == "index" and linked_section in cached_structures
+                    and linked_section not in visited_sections):
+                visited_sections.add(linked_section)
+                child_entries = build_section_sidebar_entries(linked_section, cached_structures, target_mdx_root_abs,
+                                                              main_category_files_abs_normalized, visited_sections)
+            doc_id = resolve_doc_id(nav_item, target_mdx_root_abs)
+            if doc_id is None:
+                logging.warning(f"No MDX file for sidebar item '{nav_item.normalized_key}' ({nav_item.label}); its children move up a level.")
+                entries.extend(child_entries)
+                continue
+            entries.append(build_sidebar_entry(nav_item, doc_id, nav_item.normalized_key in main_category_files_abs_normalized,
+                                               child_entries))
+        return entries
+
+    return to_entries(tree)
+
+def generate_sidebars(cached_structures, target_mdx_root_abs, main_category_files_abs_normalized, sidebar_name=DEFAULT_SIDEBAR_NAME):
+    """Builds a Docusaurus sidebars object from the cached hierarchy, starting at the root_index section."""
+    visited_sections = {"root_index"}
+    items = []
+    if "root_index" in cached_structures:
+        items = build_section_sidebar_entries("root_index", cached_structures, target_mdx_root_abs,
+                                              main_category_files_abs_normalized, visited_sections)
+    for section_key in cached_structures: # Sections no index item linked to go last, in SECTION_CONFIG order
+        if section_key in visited_sections: continue
+        visited_sections.add(section_key)
+        logging.warning(f"Section '{section_key}' is not linked from the root sidebar; appending it at the end.")
+        section_entries = build_section_sidebar_entries(section_key, cached_structures, target_mdx_root_abs,
+                                                        main_category_files_abs_normalized, visited_sections)
+        if section_entries:
+            items.append({"type": "category", "label": section_key.capitalize(), "items": section_entries})
+    return {sidebar_name: items}
+
+def write_sidebars_file(sidebars_path, sidebars, check=False):
+    """Writes sidebars as JSON (or a CommonJS module for .js paths) unless unchanged. Returns "changed"/"unchanged"."""
+    content = json.dumps(sidebars, ensure_ascii=False, indent=2) + "\n"
+    if sidebars_path.endswith(".js"):
+        content = f"// Generated by html_to_mdx_v10.py --sidebars_output; do not edit.\nmodule.exports = {content.rstrip()};\n"
+    try:
+        with open(sidebars_path, 'r', encoding='utf-8') as f:
+            if f.read() == content: return "unchanged"
+    except FileNotFoundError:
+        pass
+    if not check:
+        tmp_path = sidebars_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f: f.write(content)
+        os.replace(tmp_path, sidebars_path)
+    return "changed"
 
 def main():
     # ... (argparse setup same as before) ...
@@ -465,6 +777,14 @@ def main():
     parser.add_argument("--log_level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Logging level.")
     parser.add_argument("--dry_run", action="store_true", help="Perform a dry run without writing to MDX files.")
     parser.add_argument("--dry_run_output", help="Directory to write modified files during a dry run. (e.g. 'dry_run_output')")
+    parser.add_argument("--diff_report", help="Write nothing under the MDX root; save the front matter changes as one patch (or a .json summary) here.")
+    parser.add_argument("--sidebars_output", help="Write one sidebars .json (or .js) file from the HTML hierarchy instead of editing MDX front matter.")
+    parser.add_argument("--check", action="store_true", help="Write nothing; exit 1 if any MDX file's front matter (or the --sidebars_output file) would change.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes used to parse section sidebars and build --diff_report; 1 works in this process.")
+    parser.add_argument("--sidebar_cache", default=DEFAULT_SIDEBAR_CACHE_FILE, help="File caching parsed sidebars between runs; only read, never written, with --check, --dry_run or --diff_report.")
+    parser.add_argument("--no_sidebar_cache", action="store_true", help="Parse every sidebar and leave the sidebar cache untouched.")
+    parser.add_argument("--model_dir", help="html_to_mdx_v2 output directory written with --formats json; sidebars are read from its "
+                                            "page models (.ast.json) instead of re-parsing the HTML, where a model exists.")
     args = parser.parse_args()
     setup_logging(args.log_level, args.log_file)
     
@@ -489,9 +809,24 @@ def main():
     logging.info(f"Target MDX Root: {abs_target_mdx_root}")
 
     # Pass abs_source_html_root to cache_all_html_sidebar_structures for its internal path joining
-    cached_sidebar_data = cache_all_html_sidebar_structures(abs_source_html_root)
+    sidebar_cache_file = None if args.no_sidebar_cache else os.path.abspath(args.sidebar_cache)
+    # Modes that promise not to write anything may use the cache but leave it as it is
+    read_only = args.check or args.dry_run or bool(args.diff_report)
+    cached_structures, nav_item_index = cache_all_html_sidebar_structures(abs_source_html_root, args.workers, sidebar_cache_file,
+                                                                          update_cache=not read_only,
+                                                                          model_dir=args.model_dir and os.path.abspath(args.model_dir))
+
+    if args.sidebars_output:
+        sidebars = generate_sidebars(cached_structures, abs_target_mdx_root, main_category_files_abs_normalized)
+        status = write_sidebars_file(os.path.abspath(args.sidebars_output), sidebars, args.check or args.dry_run)
+        logging.info(f"Sidebars file {args.sidebars_output}: {'would change' if args.check and status == 'changed' else status}")
+        if args.check and status == "changed":
+            sys.exit(1)
+        return
+
     # ... (rest of main loop processing MDX files, same as before, passing target_mdx_root_abs to write_front_matter for dry_run) ...
     num_processed, num_skipped = 0, 0
+    status_counts = Counter()
     paths_to_walk = []
     if args.single_dir:
         single_dir_path = os.path.join(abs_target_mdx_root, args.single_dir)
@@ -508,22 +843,41 @@ def main():
                 paths_to_walk.append(full_path)
         logging.info(f"Processing all MDX files under {abs_target_mdx_root}")
 
+    mdx_file_paths = {} # Ordered set: the root walk already reaches the subdirectories walked after it
     for path_to_process in paths_to_walk:
         for dirpath, _, filenames in os.walk(path_to_process):
             for filename in filenames:
                 if filename.endswith(".mdx"):
-                    mdx_file_path = os.path.join(dirpath, filename)
-                    if args.dry_run and dry_run_output_abs is None: # Minimal dry run if no output dir
-                        logging.info(f"[DRY RUN] Would process: {mdx_file_path}")
-                        num_processed +=1
-                        continue
-                    try:
-                        if process_single_mdx_file(mdx_file_path, abs_target_mdx_root, main_category_files_abs_normalized, cached_sidebar_data, args.dry_run, dry_run_output_abs):
-                            num_processed += 1
-                    except Exception as e:
-                        logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
-                        num_skipped += 1
+                    mdx_file_paths[os.path.join(dirpath, filename)] = True
+
+    if args.diff_report:
+        diff_results = diff_mdx_files(list(mdx_file_paths), abs_target_mdx_root, main_category_files_abs_normalized, nav_item_index, args.workers)
+        for rel_path, _, error in diff_results:
+            if error: logging.error(f"Error diffing {rel_path}: {error}")
+        diff_counts = write_diff_report(os.path.abspath(args.diff_report), diff_results)
+        logging.info(f"Diff report {args.diff_report}: {len(diff_results)} files, {diff_counts['changed']} would change, "
+                     f"{diff_counts['unchanged']} unchanged, {diff_counts['error']} errors")
+        if args.check and (diff_counts["changed"] or diff_counts["error"]):
+            sys.exit(1)
+        return
+
+    for mdx_file_path in mdx_file_paths:
+        if args.dry_run and dry_run_output_abs is None and not args.check: # Minimal dry run if no output dir
+            logging.info(f"[DRY RUN] Would process: {mdx_file_path}")
+            num_processed +=1
+            continue
+        try:
+            status = process_single_mdx_file(mdx_file_path, abs_target_mdx_root, main_category_files_abs_normalized, nav_item_index, args.dry_run, dry_run_output_abs, args.check)
+            status_counts[status] += 1
+            num_processed += 1
+        except Exception as e:
+            logging.error(f"Unhandled error processing {mdx_file_path}: {e}", exc_info=True)
+            num_skipped += 1
     logging.info(f"Processing complete. MDX files processed/attempted: {num_processed}. Errors/Skipped: {num_skipped}")
+    logging.info(f"Front matter {'would change' if args.check else 'changed'}: {status_counts['changed']}. Unchanged: {status_counts['unchanged']}. "
+                 f"Write errors: {status_counts['error']}")
+    if status_counts["error"] or num_skipped or (args.check and status_counts["changed"]):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,26 @@
+import io
 import os
 import re
+import sys
+import json
+import hashlib
+import functools
 import argparse
 import logging
+import logging.handlers
+import queue
+import tracemalloc
+import multiprocessing
+from collections import Counter
+from contextlib import nullcontext
 from bs4 import BeautifulSoup, NavigableString, Tag
 
 
+# BeautifulSoup tree builder for whole pages. The golden fixtures are generated with 'html.parser';
+# 'lxml' is faster where installed but is not guaranteed to build an identical tree.
+DEFAULT_PARSER_BACKEND = 'html.parser'
+
+
 # --- Helper Functions ---
 def normalize_text(text_string):
     if not text_string: return ""
@@ -28,7 +44,15 @@ def get_decode_contents_or_empty(element):
 
 def process_html_fragment_for_mdx(html_fragment_str, logger, html_filename, is_for_seealso_context=False):
     if not html_fragment_str or not html_fragment_str.strip(): return ""
-    frag_soup = BeautifulSoup(f"<body>{html_fragment_str}</body>", 'html.parser').body
+    frag_document = BeautifulSoup(f"<body>{html_fragment_str}</body>", 'html.parser')
+    try:
+        return render_html_fragment(frag_document.body, html_fragment_str, logger, html_filename, is_for_seealso_context)
+    finally:
+        # Soup nodes reference each other in cycles; decomposing frees the fragment now instead of at the next GC pass.
+        frag_document.decompose()
+
+
+def render_html_fragment(frag_soup, html_fragment_str, logger, html_filename, is_for_seealso_context):
     if not frag_soup:
         logger.warning(
             f"{html_filename}: Failed to parse HTML fragment for internal processing: {html_fragment_str[:100]}")
@@ -92,13 +116,18 @@ def format_rdf_sub_elements(element_divs, base_url_prefix):
     return sub_elements
 
 
-def process_example_content_row(ex_part_row_tag, current_table_header_needed_state, logger, html_filename):
+def process_example_content_row(ex_part_row_tag, current_table_header_needed_state, logger, html_filename,
+                                row_parts=None):
+    # row_parts: optional precomputed (label, value, comment) tags, as collected by collect_owned_example_rows
     lines_to_add = [];
     new_table_header_needed_state = current_table_header_needed_state
     unrecognized_elements_found = False
-    label_tag = ex_part_row_tag.find(class_='xampleLabel');
-    value_tag = ex_part_row_tag.find(class_='xampleValue')
-    comment_div_tag = ex_part_row_tag.find(class_='editComment')
+    if row_parts is not None:
+        label_tag, value_tag, comment_div_tag = row_parts
+    else:
+        label_tag = ex_part_row_tag.find(class_='xampleLabel');
+        value_tag = ex_part_row_tag.find(class_='xampleValue')
+        comment_div_tag = ex_part_row_tag.find(class_='editComment')
     if label_tag and value_tag:
         if new_table_header_needed_state: lines_to_add.extend(["    | Property | Value |", "    |:---------|:------|"])
         prop = normalize_text(get_text_or_empty(label_tag));
@@ -134,16 +163,556 @@ def process_example_content_row(ex_part_row_tag, current_table_header_needed_sta
         if final_comment_line: lines_to_add.append(f"    {final_comment_line}")
         new_table_header_needed_state = True
     else:
-        logger.warning(
+        # The caller reports this as an 'example-row-unrecognized' diagnostic; keep the full row at debug level.
+        logger.debug(
             f"{html_filename}: Unrecognized row structure inside example (div.row.px-2): {str(ex_part_row_tag)[:200]}")
         unrecognized_elements_found = True
     return lines_to_add, new_table_header_needed_state, unrecognized_elements_found
 
 
-def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=None):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    mdx_parts = [];
-    unrecognized_elements_log = []
+# --- Element Handler Registry ---
+EMPTY_CLASS_SET = frozenset()
+
+
+def get_class_set(element):
+    # bs4 stores 'class' as a list; build the set once per node so handlers can test membership cheaply.
+    classes = element.attrs.get('class') if isinstance(element, Tag) else None
+    return frozenset(classes) if classes else EMPTY_CLASS_SET
+
+
+# --- Diagnostics ---
+# rule_id -> (severity, description). Every structural problem the converter notices maps to one rule.
+DIAGNOSTIC_RULES = {
+    "sidebar-link-missing": ("warning", "The page's own link was not found in the section sidebar."),
+    "element-reference-row": ("warning", "An Element Reference row has no div.elref/div.eltext pair."),
+    "element-reference-container-missing": ("warning", "'Element reference' h4 found without its div.px-4 container."),
+    "content-start-fallback": ("warning", "Main content start node found only through the broad fallback."),
+    "content-start-missing": ("warning", "No starting node found for the main content iteration."),
+    "content-blocks-missing": ("warning", "No top-level content blocks identified for iteration."),
+    "content-block-without-tags": ("info", "A content block has text but no processable child tags."),
+    "content-block-empty": ("info", "A direct content block node is empty."),
+    "main-element-unrecognized": ("warning", "Unrecognized element type in the main content."),
+    "see-also-add-without-p": ("warning", "div.seeAlsoAdd without a <p> tag."),
+    "see-also-without-p": ("warning", "div.seeAlso without any <p> tags."),
+    "stip-see-also-without-p": ("warning", "div.seeAlso inside div.stip without any <p> tags."),
+    "stip-child-unrecognized": ("warning", "Unrecognized node inside div.stip."),
+    "xamples-child-unrecognized": ("warning", "Unrecognized tag directly inside div.xamples."),
+    "example-row-unrecognized": ("warning", "Example row with neither a label/value pair nor an editComment."),
+    "memory-limit-exceeded": ("warning", "Converting the page peaked above --memory_limit_mb."),
+}
+DEFAULT_MAX_SAMPLES_PER_RULE = 5
+
+
+def describe_node_location(node):
+    """Short 'tag.class (line L:C)' description of a node; strings are located through their parent tag."""
+    if node is None: return None
+    tag = node if isinstance(node, Tag) else node.parent
+    if tag is None: return None
+    classes = tag.get('class') or []
+    location = tag.name + "".join(f".{class_name}" for class_name in classes)
+    if tag.sourceline is not None: location += f" (line {tag.sourceline}:{tag.sourcepos})"
+    return location if tag is node else f"text in {location}"
+
+
+class DiagnosticsCollector:
+    """
+    Aggregates typed converter diagnostics across a run: a counter per rule, the set of affected files and
+    a capped number of samples (file, node location, message) per rule.
+    """
+
+    def __init__(self, max_samples_per_rule=DEFAULT_MAX_SAMPLES_PER_RULE):
+        self.max_samples_per_rule = max_samples_per_rule
+        self.counts = Counter()
+        self.files_by_rule = {}
+        self.samples_by_rule = {}
+        self.pages_analyzed = 0
+
+    def report(self, rule_id, html_filename, node=None, message=""):
+        if rule_id not in DIAGNOSTIC_RULES: raise KeyError(f"Unknown diagnostic rule '{rule_id}'")
+        self.counts[rule_id] += 1
+        self.files_by_rule.setdefault(rule_id, set()).add(html_filename)
+        samples = self.samples_by_rule.setdefault(rule_id, [])
+        if len(samples) < self.max_samples_per_rule:
+            samples.append({"file": html_filename, "node": describe_node_location(node), "message": message})
+
+    def merge(self, other):
+        self.pages_analyzed += other.pages_analyzed
+        self.counts.update(other.counts)
+        for rule_id, files in other.files_by_rule.items(): self.files_by_rule.setdefault(rule_id, set()).update(files)
+        for rule_id, samples in other.samples_by_rule.items():
+            own_samples = self.samples_by_rule.setdefault(rule_id, [])
+            own_samples.extend(samples[:max(0, self.max_samples_per_rule - len(own_samples))])
+
+    def to_report(self):
+        rules = {}
+        for rule_id, count in sorted(self.counts.items(), key=lambda item: (-item[1], item[0])):
+            severity, description = DIAGNOSTIC_RULES[rule_id]
+            rules[rule_id] = {"severity": severity, "description": description, "count": count,
+                              "files": len(self.files_by_rule[rule_id]), "samples": self.samples_by_rule[rule_id]}
+        return {"pages_analyzed": self.pages_analyzed, "total": sum(self.counts.values()), "rules": rules}
+
+    def write_json_report(self, report_path):
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_report(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+class ConversionContext:
+    """Per-page state shared by the element handlers of convert_html_to_mdx."""
+
+    def __init__(self, html_filename, logger, diagnostics=None):
+        self.html_filename = html_filename
+        self.logger = logger
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticsCollector()
+        self.page_messages = Counter()  # Insertion-ordered, so the page log keeps first-seen order and counts
+        self.is_last_content_element = False
+
+    def report(self, rule_id, node=None, message=""):
+        self.diagnostics.report(rule_id, self.html_filename, node, message)
+        self.page_messages[(rule_id, message)] += 1
+
+    def flush_page_messages(self):
+        for (rule_id, message), count in self.page_messages.items():
+            severity = DIAGNOSTIC_RULES[rule_id][0]
+            log_message = f"{self.html_filename}: {message} [{rule_id}]" + (f" (x{count})" if count > 1 else "")
+            if severity == "info":
+                self.logger.info(log_message)
+            else:
+                self.logger.warning(log_message)
+        self.page_messages.clear()
+
+
+class MdxWriter:
+    """
+    Streams MDX output lines to a file-like sink, collapsing runs of blank lines as they are emitted, so the
+    document never has to be held in memory. A part may span several lines; it counts as blank when it is only
+    whitespace. A leading blank part is kept only when the next part has content.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.parts_seen = 0
+        self.lines_written = 0
+        self.last_written_blank = False
+        self.pending_leading_blank = None
+
+    def append(self, part):
+        is_blank = part.strip() == ""
+        self.parts_seen += 1
+        if self.parts_seen == 1 and is_blank:
+            self.pending_leading_blank = part
+            return
+        if self.pending_leading_blank is not None:
+            if not is_blank: self.write_line(self.pending_leading_blank, True)
+            self.pending_leading_blank = None
+        if is_blank and (self.lines_written == 0 or self.last_written_blank): return
+        self.write_line(part, is_blank)
+
+    def extend(self, parts):
+        for part in parts: self.append(part)
+
+    def blank_line(self):
+        self.append("")
+
+    def write_line(self, line, is_blank):
+        self.sink.write(line)
+        self.sink.write("\n")
+        self.lines_written += 1
+        self.last_written_blank = is_blank
+
+
+class MdxDocument:
+    """
+    Intermediate model of one converted page: structured front matter, the ordered MDX blocks, sidebar
+    navigation entries, links and the source text of the main content column. MDX, verification text,
+    the JSON AST and the link list are all emitted from this model, so each page is parsed only once.
+    """
+
+    def __init__(self, html_filename):
+        self.html_filename = html_filename
+        self.frontmatter = None
+        self.blocks = []  # [{"type": str, "parts": [str, ...]}], parts are fed to MdxWriter in order
+        self.navigation = []
+        self.links = []
+        self.source_text = ""
+
+    # Handlers write into the most recently started block through the same API as MdxWriter.
+    def begin_block(self, block_type=None):
+        self.blocks.append({"type": block_type, "parts": []})
+
+    def finish_block(self, block_type):
+        if block_type is None and not self.blocks[-1]["parts"]:
+            self.blocks.pop()
+        else:
+            self.blocks[-1]["type"] = block_type or "unrecognized"
+
+    def append(self, part):
+        self.blocks[-1]["parts"].append(part)
+
+    def extend(self, parts):
+        self.blocks[-1]["parts"].extend(parts)
+
+    def blank_line(self):
+        self.blocks[-1]["parts"].append("")
+
+    def write_mdx(self, sink):
+        mdx_writer = MdxWriter(sink)
+        for block in self.blocks: mdx_writer.extend(block["parts"])
+
+    def to_mdx(self):
+        buffer = io.StringIO()
+        self.write_mdx(buffer)
+        return buffer.getvalue()
+
+    def to_text(self):
+        return self.source_text
+
+    def to_ast(self):
+        sections = [{"heading": None, "blocks": []}]
+        for block in self.blocks:
+            if block["type"] == "heading": sections.append({"heading": block["parts"][0][3:], "blocks": []})
+            sections[-1]["blocks"].append(block)
+        return {"file": self.html_filename, "frontmatter": self.frontmatter, "sections": sections,
+                "navigation": self.navigation, "links": self.links}
+
+    def to_dict(self):
+        return {"html_filename": self.html_filename, "frontmatter": self.frontmatter, "blocks": self.blocks,
+                "navigation": self.navigation, "links": self.links, "source_text": self.source_text}
+
+    @classmethod
+    def from_dict(cls, data):
+        mdx_doc = cls(data["html_filename"])
+        mdx_doc.frontmatter = data["frontmatter"]
+        mdx_doc.blocks = data["blocks"]
+        mdx_doc.navigation = data["navigation"]
+        mdx_doc.links = data["links"]
+        mdx_doc.source_text = data["source_text"]
+        return mdx_doc
+
+
+class HandlerRegistry:
+    """
+    Maps tag names and class names to element handlers.
+
+    Handlers are called as handler(element, classes, ctx, out) and return True when they converted the
+    element, False to let dispatch fall through to the next candidate. Tag handlers are tried before class
+    handlers; when a node carries several registered classes, the one registered first wins.
+    """
+
+    def __init__(self):
+        self.by_tag = {}
+        self.by_class = {}
+
+    def tag(self, *tag_names, block_type=None):
+        def decorator(handler):
+            for tag_name in tag_names: self.by_tag[tag_name] = (len(self.by_tag), handler, block_type)
+            return handler
+        return decorator
+
+    def css_class(self, class_name, block_type=None):
+        def decorator(handler):
+            self.by_class[class_name] = (len(self.by_class), handler, block_type)
+            return handler
+        return decorator
+
+    def resolve(self, element, classes):
+        """Returns the (tag_entry, class_entry) candidates for a node; either may be None."""
+        class_entry = None
+        if classes:
+            by_class = self.by_class
+            for class_name in classes:
+                entry = by_class.get(class_name)
+                if entry is not None and (class_entry is None or entry[0] < class_entry[0]): class_entry = entry
+        return self.by_tag.get(element.name), class_entry
+
+    def dispatch(self, element, classes, ctx, out):
+        """Returns the block type of the handler that converted the element, or None if none did."""
+        tag_entry, class_entry = self.resolve(element, classes)
+        if tag_entry is not None and tag_entry[1](element, classes, ctx, out): return tag_entry[2]
+        if class_entry is not None and class_entry[1](element, classes, ctx, out): return class_entry[2]
+        return None
+
+
+MAIN_CONTENT_HANDLERS = HandlerRegistry()
+STIP_CHILD_HANDLERS = HandlerRegistry()
+# Block types that are always separated from the preceding stip content by a blank line.
+STIP_ALWAYS_SEPARATED_BLOCK_TYPES = frozenset(['details', 'seeAlso_in_stip'])
+PARAGRAPH_WRAPPER_CLASSES = frozenset(['guid', 'seeAlsoAdd', 'seeAlso'])
+
+
+@MAIN_CONTENT_HANDLERS.tag('h4', block_type='heading')
+def handle_heading(element, classes, ctx, out):
+    out.append(f"## {normalize_text(get_text_or_empty(element))}")
+    out.blank_line()
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.tag('p', block_type='paragraph')
+def handle_paragraph(element, classes, ctx, out):
+    # Paragraphs wrapped in guid/seeAlso containers belong to those blocks, not to the main flow.
+    if element.parent is not None and not PARAGRAPH_WRAPPER_CLASSES.isdisjoint(get_class_set(element.parent)):
+        return False
+    processed_p_text = process_html_fragment_for_mdx(element.decode_contents(), ctx.logger, ctx.html_filename)
+    normalized_p_text = normalize_text(processed_p_text)
+    if normalized_p_text: out.append(normalized_p_text)
+    out.blank_line()
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.tag('hr', block_type='rule')
+def handle_rule(element, classes, ctx, out):
+    out.append("---"); out.blank_line()
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.css_class('guid', block_type='guid')
+def handle_guid(element, classes, ctx, out):
+    p_tag_guid = element.find('p')
+    raw_html_guid = p_tag_guid.decode_contents() if p_tag_guid else element.decode_contents()
+    processed_guid_content = process_html_fragment_for_mdx(raw_html_guid, ctx.logger, ctx.html_filename)
+    out.append(f'<div className="guid">{normalize_text(processed_guid_content)}</div>')
+    out.blank_line()
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.css_class('seeAlsoAdd', block_type='seeAlso')
+def handle_see_also_add(element, classes, ctx, out):
+    p_tag_seealsoadd = element.find('p')
+    if p_tag_seealsoadd:
+        processed_seealsoadd_content = process_html_fragment_for_mdx(p_tag_seealsoadd.decode_contents(), ctx.logger,
+                                                                     ctx.html_filename, is_for_seealso_context=True)
+        final_text = normalize_text(processed_seealsoadd_content)
+        if final_text: out.append(f"<SeeAlso>{final_text}</SeeAlso>")
+    else:
+        ctx.report("see-also-add-without-p", element, f"div.seeAlsoAdd '{str(element)[:50]}' found without a <p> tag.")
+    out.blank_line()
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.css_class('seeAlso', block_type='seeAlso')
+def handle_see_also(element, classes, ctx, out):
+    all_see_also_p_tags = element.find_all('p')
+    if all_see_also_p_tags:
+        out.blank_line()
+        for idx_sa, p_sa in enumerate(all_see_also_p_tags):
+            processed_sa_content = process_html_fragment_for_mdx(p_sa.decode_contents(), ctx.logger, ctx.html_filename,
+                                                                 is_for_seealso_context=True)
+            final_text = normalize_text(processed_sa_content)
+            if final_text: out.append(f"<SeeAlso>{final_text}</SeeAlso>")
+            if idx_sa < len(all_see_also_p_tags) - 1 and final_text: out.blank_line()
+        out.blank_line()
+    else:
+        ctx.report("see-also-without-p", element, f"div.seeAlso '{str(element)[:50]}' found without any <p> tags.")
+    return True
+
+
+@MAIN_CONTENT_HANDLERS.css_class('stip', block_type='stip')
+def handle_stip(element, classes, ctx, out):
+    mdx_stip_lines = [];
+    if element.find('div', class_='mandatory'): mdx_stip_lines.append("<Mandatory />"); mdx_stip_lines.append("")
+    last_block_type_in_stip = None;
+    stip_children = element.contents
+    last_child_idx = len(stip_children) - 1
+    for idx_stip_child, stip_child in enumerate(stip_children):
+        current_block_type_in_stip = None
+        processed_stip_child_flag = False
+        if isinstance(stip_child, Tag):
+            child_classes = get_class_set(stip_child)
+            tag_entry, class_entry = STIP_CHILD_HANDLERS.resolve(stip_child, child_classes)
+            entry = tag_entry or class_entry
+            # Blank line between different kinds of stip blocks (paragraph -> list, anything -> details, ...)
+            if entry is not None and mdx_stip_lines and mdx_stip_lines[-1].strip() != "":
+                block_type = entry[2]
+                if block_type in STIP_ALWAYS_SEPARATED_BLOCK_TYPES or \
+                        (block_type is not None and last_block_type_in_stip not in (None, block_type)):
+                    mdx_stip_lines.append("")
+            for candidate in (tag_entry, class_entry):
+                if candidate is not None and candidate[1](stip_child, child_classes, ctx, mdx_stip_lines):
+                    current_block_type_in_stip = candidate[2]
+                    processed_stip_child_flag = True
+                    break
+        else:  # Floating text directly inside the stip starts a paragraph block
+            text = normalize_text(str(stip_child))
+            if text:
+                if mdx_stip_lines and mdx_stip_lines[-1].strip() != "" and last_block_type_in_stip not in (None, 'p'):
+                    mdx_stip_lines.append("")
+                mdx_stip_lines.append(text)
+                current_block_type_in_stip = 'p'
+                processed_stip_child_flag = True
+
+        # Whitespace between tags is layout, not content; only real nodes are worth a diagnostic.
+        if not processed_stip_child_flag and (isinstance(stip_child, Tag) or stip_child.strip()): ctx.report(
+            "stip-child-unrecognized", stip_child, f"Unrecognized tag '{stip_child.name}' inside div.stip: {str(stip_child)[:100]}")
+        if current_block_type_in_stip:
+            last_block_type_in_stip = current_block_type_in_stip
+            if idx_stip_child < last_child_idx and mdx_stip_lines and mdx_stip_lines[-1].strip() != "":
+                mdx_stip_lines.append("")
+    clean_stip_lines = []
+    for line in mdx_stip_lines:  # Drop leading blanks and collapse runs of blank lines
+        if line.strip() != "" or (clean_stip_lines and clean_stip_lines[-1].strip() != ""):
+            clean_stip_lines.append(line)
+    stip_body = "\n  ".join(clean_stip_lines).rstrip()
+    out.append(f'<div className="stip">\n  {stip_body}\n</div>')
+    if not ctx.is_last_content_element: out.blank_line()
+    return True
+
+
+@STIP_CHILD_HANDLERS.tag('p', block_type='p')
+def handle_stip_paragraph(stip_child, classes, ctx, out):
+    processed_p_content = process_html_fragment_for_mdx(stip_child.decode_contents(), ctx.logger, ctx.html_filename)
+    out.append(normalize_text(processed_p_content))
+    return True
+
+
+@STIP_CHILD_HANDLERS.tag('ol', 'ul', block_type='list')
+def handle_stip_list(stip_child, classes, ctx, out):
+    is_ordered = stip_child.name == 'ol'
+    handled = False
+    for i, li in enumerate(stip_child.find_all('li', recursive=False), 1):
+        prefix = f"  {i}." if is_ordered else "  -"
+        out.append(f"{prefix} {normalize_text(get_text_or_empty(li))}")
+        handled = True
+    return handled
+
+
+@STIP_CHILD_HANDLERS.css_class('xampleBlockStip', block_type='details')
+def handle_stip_examples(stip_child, classes, ctx, out):
+    out.append("<details>");
+    out.append("  <summary>Examples</summary>");
+    out.append("  ")
+    examples_div = stip_child.find('div', class_='xamples')
+    if examples_div:
+        out.extend(build_example_details_lines(examples_div, ctx))
+    out.append("</details>");
+    return True
+
+
+@STIP_CHILD_HANDLERS.css_class('seeAlso', block_type='seeAlso_in_stip')
+def handle_stip_see_also(stip_child, classes, ctx, out):
+    if 'seeAlsoAdd' in classes: return False
+    all_see_also_p_tags_stip = stip_child.find_all('p')
+    if all_see_also_p_tags_stip:
+        for idx_sa_stip, p_sa_stip in enumerate(all_see_also_p_tags_stip):
+            processed_sa_stip_content = process_html_fragment_for_mdx(p_sa_stip.decode_contents(), ctx.logger,
+                                                                      ctx.html_filename, is_for_seealso_context=True)
+            out.append(f"<SeeAlso>{normalize_text(processed_sa_stip_content)}</SeeAlso>")
+            if idx_sa_stip < len(all_see_also_p_tags_stip) - 1 and out[-1].strip() != "": out.append("")
+    else:
+        ctx.report("stip-see-also-without-p", stip_child, f"div.seeAlso in stip '{str(stip_child)[:50]}' found no <p> tags.")
+    return True
+
+
+@STIP_CHILD_HANDLERS.css_class('flexrow')
+def handle_stip_mandatory_row(stip_child, classes, ctx, out):
+    # The <Mandatory /> marker is emitted up front by handle_stip; the flag row itself produces no output.
+    return stip_child.name == 'div' and 'd-flex' in classes and stip_child.find('div', class_='mandatory') is not None
+
+
+EXAMPLE_ROW_PART_CLASSES = ('xampleLabel', 'xampleValue', 'editComment')
+
+
+def collect_owned_example_rows(container, rows, open_rows, collect_rows):
+    """
+    Single walk over an example container. Appends [row, label, value, comment] records to rows for every
+    div.row owned by the enclosing div.xamples (rows under a nested div.xamples belong to that block instead),
+    and fills each open row record with its first label/value/comment descendant, in document order.
+    """
+    for child in container.contents:
+        if not isinstance(child, Tag): continue
+        classes = get_class_set(child)
+        child_collects_rows = collect_rows
+        if classes:
+            for part_idx, part_class in enumerate(EXAMPLE_ROW_PART_CLASSES, 1):
+                if part_class in classes:
+                    for record in open_rows:
+                        if record[part_idx] is None: record[part_idx] = child
+            if child.name == 'div':
+                if 'xamples' in classes:
+                    child_collects_rows = False
+                elif collect_rows and 'row' in classes:
+                    record = [child, None, None, None]
+                    rows.append(record)
+                    open_rows.append(record)
+                    collect_owned_example_rows(child, rows, open_rows, collect_rows)
+                    open_rows.pop()
+                    continue
+        if child.contents: collect_owned_example_rows(child, rows, open_rows, child_collects_rows)
+
+
+def build_example_details_lines(examples_div, ctx):
+    logger, html_filename = ctx.logger, ctx.html_filename
+    details_content_lines = [];
+    example_elements = [node for node in examples_div.children if isinstance(node, Tag)];
+    last_example_idx = len(example_elements) - 1
+    table_header_needed = True
+    for element_node_idx, element_node in enumerate(example_elements):
+        next_is_hr = element_node_idx < last_example_idx and example_elements[element_node_idx + 1].name == 'hr'
+        if element_node.name == 'hr':
+            details_content_lines.append("    <hr />"); table_header_needed = True
+            if element_node_idx < last_example_idx and not next_is_hr: details_content_lines.append("    ")
+        elif element_node.name == 'div':
+            node_classes = get_class_set(element_node)
+            row_records = []
+            if 'row' in node_classes and 'px-2' in node_classes:  # A direct content row is processed on its own
+                row_records.append([element_node, None, None, None])
+                collect_owned_example_rows(element_node, row_records, row_records[:], False)
+            else:
+                collect_owned_example_rows(element_node, row_records, [], 'xamples' not in node_classes)
+            if not row_records: continue
+            if table_header_needed and any(record[1] is not None for record in row_records):
+                if details_content_lines and details_content_lines[-1].strip() != "" and not \
+                        details_content_lines[-1].strip().endswith("|:---------|:------|"):
+                    details_content_lines.append("    ")
+                details_content_lines.append("    | Property | Value |");
+                details_content_lines.append("    |:---------|:------|");
+                table_header_needed = False
+            for ex_part_row, label_tag, value_tag, comment_tag in row_records:
+                # Add blank line before a Full Example comment if it follows the table
+                if comment_tag is not None and details_content_lines and \
+                        details_content_lines[-1].strip().endswith("|") and \
+                        "[Full example:" in comment_tag.get_text(strip=True):
+                    details_content_lines.append("    ")
+
+                new_lines, table_header_needed, unrec_ex = process_example_content_row(
+                    ex_part_row, table_header_needed, logger, html_filename, (label_tag, value_tag, comment_tag))
+                if unrec_ex: ctx.report("example-row-unrecognized", ex_part_row, "Unrecognized structure in example row.")
+                details_content_lines.extend(new_lines)
+            if details_content_lines and details_content_lines[-1].strip() != "":
+                if element_node_idx == last_example_idx or not next_is_hr:
+                    details_content_lines.append("    ")
+        else:
+            ctx.report("xamples-child-unrecognized", element_node,
+                       f"Unrecognized tag '{element_node.name}' directly inside div.xamples: {str(element_node)[:100]}")
+    return details_content_lines
+
+
+def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=None, parser_backend=None):
+    buffer = io.StringIO()
+    write_html_as_mdx(html_content, html_filename, logger, buffer, html_subdirectory, parser_backend)
+    return buffer.getvalue()
+
+
+def write_html_as_mdx(html_content, html_filename, logger, sink, html_subdirectory=None, parser_backend=None):
+    """Converts one ISBDM HTML page and streams the MDX to sink (any object with a write(str) method)."""
+    build_mdx_document(html_content, html_filename, logger, html_subdirectory,
+                       parser_backend=parser_backend).write_mdx(sink)
+
+
+def build_mdx_document(html_content, html_filename, logger, html_subdirectory=None, diagnostics=None,
+                       parser_backend=None):
+    """Parses one ISBDM HTML page into an MdxDocument, reporting structural problems to diagnostics."""
+    soup = BeautifulSoup(html_content, parser_backend or DEFAULT_PARSER_BACKEND)
+    try:
+        return extract_mdx_document(soup, html_filename, logger, html_subdirectory, diagnostics)
+    finally:
+        # The MdxDocument holds only plain strings, so the tree can be torn down as soon as it has been read.
+        soup.decompose()
+
+
+def extract_mdx_document(soup, html_filename, logger, html_subdirectory=None, diagnostics=None):
+    ctx = ConversionContext(html_filename, logger, diagnostics)
+    ctx.diagnostics.pages_analyzed += 1
+    mdx_doc = MdxDocument(html_filename)
 
     if html_subdirectory and html_subdirectory != '.':
         target_href_in_html = f"/ISBDM/docs/{html_subdirectory}/{html_filename}"
@@ -156,17 +725,20 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
     if sidebar_nav:
         sidebar_items = sidebar_nav.find_all('div', class_='d-flex', recursive=False);
         item_found_in_sidebar = False
+        target_href_stripped = target_href_in_html.strip()
         for idx, item_row in enumerate(sidebar_items):
             link_tag = item_row.find('a', href=True)
-            if link_tag and link_tag.get('href',
-                                         '').strip() == target_href_in_html.strip():  # Ensure comparison is stripped
+            if not link_tag: continue
+            nav_href = link_tag.get('href', '').strip()  # Ensure comparison is stripped
+            nav_level = len(item_row.find_all('i', class_='bi-arrow-return-right')) + 1
+            mdx_doc.navigation.append({"href": nav_href, "label": normalize_text(link_tag.get_text()),
+                                       "position": idx + 1, "level": nav_level})
+            if not item_found_in_sidebar and nav_href == target_href_stripped:
                 calculated_sidebar_position = idx + 1;
-                arrow_icons_count = len(item_row.find_all('i', class_='bi-arrow-return-right'))
-                calculated_sidebar_level = arrow_icons_count + 1;
-                item_found_in_sidebar = True;
-                break
-        if not item_found_in_sidebar: unrecognized_elements_log.append(
-            f"Warning: Active link '{target_href_in_html}' for {html_filename} not found in sidebar.")
+                calculated_sidebar_level = nav_level;
+                item_found_in_sidebar = True
+        if not item_found_in_sidebar: ctx.report(
+            "sidebar-link-missing", sidebar_nav, f"Active link '{target_href_in_html}' not found in sidebar.")
 
     element_ref_section_h4 = soup.select_one('div.col-md-7 h4:-soup-contains("Element reference")')
     has_element_reference = bool(element_ref_section_h4)
@@ -209,12 +781,13 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
                         super_type_links = format_rdf_sub_elements(text_div, "/ISBDM"); frontmatter["RDF"][
                             "elementSuperType"] = super_type_links[0] if super_type_links else None
                 else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: Unexpected structure in Element Reference row: {str(row)[:100]}")
+                    ctx.report("element-reference-row", row, f"Unexpected structure in Element Reference row: {str(row)[:100]}")
         elif element_ref_section_h4:
-            unrecognized_elements_log.append(
-                f"{html_filename}: Warning: 'Element reference' h4 found, but not its 'div.px-4' container.")
-        mdx_parts.extend(
+            ctx.report("element-reference-container-missing", element_ref_section_h4,
+                       "'Element reference' h4 found, but not its 'div.px-4' container.")
+        mdx_doc.frontmatter = frontmatter
+        mdx_doc.begin_block('frontmatter')
+        mdx_doc.extend(
             ["---", "# Docusaurus-specific fields", f"id: {frontmatter['id']}", f"title: {frontmatter['title']}",
              f"sidebar_position: {frontmatter['sidebar_position']}  # ...",
              f"sidebar_level: {frontmatter['sidebar_level']}  # ...", "aliases:"] + [f"  - {alias} # ..." for alias in
@@ -239,11 +812,12 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
                                                                        f"willBeRemovedInVersion: \"\" # ...", "---",
                                                                        ""])
 
-    mdx_parts.append(f"# {main_page_title}");
-    if mdx_parts[-1].strip(): mdx_parts.append("")  # Ensure blank line after title
+    mdx_doc.begin_block('title')
+    mdx_doc.append(f"# {main_page_title}")
+    mdx_doc.blank_line()  # Ensure blank line after title
 
-    if has_element_reference: mdx_parts.append("## Element Reference"); mdx_parts.append(
-        "<ElementReference frontMatter={frontMatter} />"); mdx_parts.append("")
+    if has_element_reference: mdx_doc.begin_block('elementReference'); mdx_doc.append("## Element Reference"); mdx_doc.append(
+        "<ElementReference frontMatter={frontMatter} />"); mdx_doc.blank_line()
 
     # --- Main Content Iteration - REVISED ---
     content_nodes_to_iterate = []
@@ -268,11 +842,11 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
             start_node_for_body_content = main_content_column.findChild(
                 recursive=False) if main_content_column else None
             if start_node_for_body_content:
-                unrecognized_elements_log.append(
-                    f"{html_filename}: Warning: Using broad fallback for main content start node.")
+                ctx.report("content-start-fallback", start_node_for_body_content,
+                           "Using broad fallback for main content start node.")
             else:
-                unrecognized_elements_log.append(
-                    f"{html_filename}: Warning: Could not find any starting node for main content iteration.")
+                ctx.report("content-start-missing", main_content_column,
+                           "Could not find any starting node for main content iteration.")
 
         current_node_for_collection = start_node_for_body_content
         while current_node_for_collection:
@@ -283,271 +857,173 @@ def convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory=N
     if not content_nodes_to_iterate and main_content_column and \
             not (not has_element_reference and main_title_tag and not list(
                 main_title_tag.find_next_siblings(Tag))):  # Check if it was truly an empty page after title
-        unrecognized_elements_log.append(
-            f"{html_filename}: Warning: No top-level content blocks identified for iteration.")
+        ctx.report("content-blocks-missing", main_content_column, "No top-level content blocks identified for iteration.")
 
     for content_block_node_idx, content_block_node in enumerate(content_nodes_to_iterate):
         elements_to_process_this_block = []
         is_direct_block = False
-        if content_block_node.name == 'div' and 'row' in content_block_node.get('class',
-                                                                                []) and 'm-1' in content_block_node.get(
-                'class', []):
+        block_classes = get_class_set(content_block_node)
+        if content_block_node.name == 'div' and 'row' in block_classes and 'm-1' in block_classes:
             elements_to_process_this_block = [child for child in content_block_node.children if isinstance(child, Tag)]
         elif content_block_node.name:
             elements_to_process_this_block = [content_block_node];
             is_direct_block = True
 
         if not elements_to_process_this_block and content_block_node.get_text(strip=True) and not is_direct_block:
-            unrecognized_elements_log.append(
-                f"{html_filename}: Info: Content block node '{content_block_node.name}' had text but no processable child tags: '{content_block_node.get_text(strip=True)[:50]}'")
+            ctx.report("content-block-without-tags", content_block_node,
+                       f"Content block node '{content_block_node.name}' had text but no processable child tags: '{content_block_node.get_text(strip=True)[:50]}'")
         elif not elements_to_process_this_block and is_direct_block and not content_block_node.get_text(strip=True):
-            unrecognized_elements_log.append(
-                f"{html_filename}: Info: Direct content block node '{content_block_node.name}' was empty.")
+            ctx.report("content-block-empty", content_block_node,
+                       f"Direct content block node '{content_block_node.name}' was empty.")
 
+        last_element_idx = len(elements_to_process_this_block) - 1
+        is_last_content_block = content_block_node_idx == len(content_nodes_to_iterate) - 1
         for element_idx, element in enumerate(elements_to_process_this_block):
-            processed_element_in_section = False
             # Skip main title h3 if it's part of the elements_to_process_this_block
             if element == main_title_tag and main_page_title == normalize_text(get_text_or_empty(element)):
-                processed_element_in_section = True;
                 continue
+            ctx.is_last_content_element = is_last_content_block and element_idx == last_element_idx
+            mdx_doc.begin_block()
+            block_type = MAIN_CONTENT_HANDLERS.dispatch(element, get_class_set(element), ctx, mdx_doc)
+            mdx_doc.finish_block(block_type)
+            if block_type is None and element.name not in ['script', 'style', 'meta', 'link', 'title', 'h3']:
+                ctx.report("main-element-unrecognized", element,
+                           f"Unrecognized element type '{element.name}' in main content: {str(element)[:100]}")
+
+    if main_content_column:
+        mdx_doc.source_text = main_content_column.get_text()
+        for link_tag in main_content_column.find_all('a', href=True):
+            mdx_doc.links.append({"href": link_tag['href'], "text": normalize_text(link_tag.get_text()),
+                                  "class": " ".join(link_tag.get('class', []))})
+
+    ctx.flush_page_messages()
+    return mdx_doc
+
+
+# --- Incremental Conversion Manifest ---
+MANIFEST_FILENAME = ".html_to_mdx_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def compute_converter_hash():
+    # Any change to this script invalidates every manifest entry, forcing a full reconversion.
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-            if element.name == 'h4':
-                mdx_parts.append(f"## {normalize_text(get_text_or_empty(element))}");
-                if mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.name == 'p' and not (element.parent and element.parent.has_attr('class') and \
-                                              ('guid' in element.parent.get('class', []) or \
-                                               'seeAlsoAdd' in element.parent.get('class', []) or \
-                                               'seeAlso' in element.parent.get('class',
-                                                                               []))):  # Handle direct <p> not in specific divs
-                raw_p_content = element.decode_contents() if element else ""
-                processed_p_text = process_html_fragment_for_mdx(raw_p_content, logger, html_filename)
-                normalized_p_text = normalize_text(processed_p_text)
-                if normalized_p_text: mdx_parts.append(normalized_p_text)
-                if mdx_parts and mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'guid' in element.get('class', []):
-                p_tag_guid = element.find('p');
-                content_source_guid = p_tag_guid if p_tag_guid else element
-                raw_html_guid = get_decode_contents_or_empty(content_source_guid) if content_source_guid else ""
-                if p_tag_guid and content_source_guid == p_tag_guid:
-                    raw_html_guid = p_tag_guid.decode_contents() if p_tag_guid else ""
-                else:
-                    raw_html_guid = element.decode_contents() if element else ""
-                processed_guid_content = process_html_fragment_for_mdx(raw_html_guid, logger, html_filename)
-                normalized_content = normalize_text(processed_guid_content)
-                mdx_parts.append(f'<div className="guid">{normalized_content}</div>');
-                if mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'seeAlsoAdd' in element.get('class', []):
-                p_tag_seealsoadd = element.find('p')
-                if p_tag_seealsoadd:
-                    raw_seealsoadd_content = p_tag_seealsoadd.decode_contents() if p_tag_seealsoadd else ""
-                    processed_seealsoadd_content = process_html_fragment_for_mdx(raw_seealsoadd_content, logger,
-                                                                                 html_filename,
-                                                                                 is_for_seealso_context=True)
-                    final_text = normalize_text(processed_seealsoadd_content)
-                    if final_text: mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlsoAdd '{str(element)[:50]}' found without a <p> tag.")
-                if mdx_parts and mdx_parts[-1].strip(): mdx_parts.append("")
-                processed_element_in_section = True
-            elif element.has_attr('class') and 'seeAlso' in element.get('class',
-                                                                        []) and 'seeAlsoAdd' not in element.get('class',
-                                                                                                                []):
-                all_see_also_p_tags = element.find_all('p')
-                if all_see_also_p_tags:
-                    if mdx_parts and mdx_parts[-1].strip() != "": mdx_parts.append("")
-                    for idx_sa, p_sa in enumerate(all_see_also_p_tags):
-                        raw_sa_content = p_sa.decode_contents() if p_sa else ""
-                        processed_sa_content = process_html_fragment_for_mdx(raw_sa_content, logger, html_filename,
-                                                                             is_for_seealso_context=True)
-                        final_text = normalize_text(processed_sa_content)
-                        if final_text: mdx_parts.append(f"<SeeAlso>{final_text}</SeeAlso>")
-                        if idx_sa < len(all_see_also_p_tags) - 1 and final_text and mdx_parts and mdx_parts[
-                            -1].strip() != "": mdx_parts.append("")
-                    if mdx_parts and mdx_parts[-1].strip() != "": mdx_parts.append("")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlso '{str(element)[:50]}' found without any <p> tags.")
-                processed_element_in_section = True
-            elif element.name == 'hr':
-                mdx_parts.append("---"); mdx_parts.append(""); processed_element_in_section = True
-            elif element.has_attr('class') and 'stip' in element.get('class', []):  # div.stip
-                mdx_stip_lines = [];
-                if element.find('div', class_='mandatory'): mdx_stip_lines.append(
-                    "<Mandatory />"); mdx_stip_lines.append("")
-                last_block_type_in_stip = None;
-                stip_children_tags = [child for child in element.children if isinstance(child, (NavigableString, Tag))]
-                for idx_stip_child, stip_child in enumerate(stip_children_tags):
-                    current_block_type_in_stip = None;
-                    if mdx_stip_lines and mdx_stip_lines[-1].strip() != "":
-                        is_new_block_type = False;
-                        if isinstance(stip_child, Tag):
-                            if stip_child.name == 'p' and last_block_type_in_stip not in [None, 'p']:
-                                is_new_block_type = True
-                            elif stip_child.name in ['ol', 'ul'] and last_block_type_in_stip != 'list':
-                                is_new_block_type = True
-                            elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):
-                                is_new_block_type = True
-                            elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class', []):
-                                is_new_block_type = True
-                        elif isinstance(stip_child,
-                                        NavigableString) and stip_child.strip() and last_block_type_in_stip not in [
-                            None, 'p']:
-                            is_new_block_type = True
-                        if is_new_block_type: mdx_stip_lines.append("")
-                    processed_stip_child_flag = False
-                    if isinstance(stip_child, NavigableString):
-                        text = normalize_text(str(stip_child))  # Process it
-                        if text:  # Check if there's any text left after normalization
-                            mdx_stip_lines.append(text)
-                            current_block_type_in_stip = 'p'  # Assuming any significant floating text starts a paragraph block
-                            processed_stip_child_flag = True
-                    elif isinstance(stip_child, Tag):
-                if stip_child.name == 'p':
-                    current_block_type_in_stip = 'p'; raw_p_html_content = stip_child.decode_contents() if stip_child else ""; processed_p_content = process_html_fragment_for_mdx(
-                        raw_p_html_content, logger, html_filename); mdx_stip_lines.append(
-                        normalize_text(processed_p_content)); processed_stip_child_flag = True
-                elif stip_child.name in ['ol', 'ul']:
-                    current_block_type_in_stip = 'list';
-                for i, li in enumerate(stip_child.find_all('li', recursive=False),
-                                       1): prefix = f"  {i}." if stip_child.name == 'ol' else "  -"; mdx_stip_lines.append(
-                    f"{prefix} {normalize_text(get_text_or_empty(li))}"); processed_stip_child_flag = True
-            elif stip_child.has_attr('class') and 'seeAlso' in stip_child.get('class',
-                                                                              []) and 'seeAlsoAdd' not in stip_child.get(
-                    'class', []):  # FIX: div.seeAlso in stip
-                current_block_type_in_stip = 'seeAlso_in_stip'
-                all_see_also_p_tags_stip = stip_child.find_all('p')
-                if all_see_also_p_tags_stip:
-                    for idx_sa_stip, p_sa_stip in enumerate(all_see_also_p_tags_stip):
-                        raw_sa_stip_content = p_sa_stip.decode_contents() if p_sa_stip else ""
-                        processed_sa_stip_content = process_html_fragment_for_mdx(raw_sa_stip_content, logger,
-                                                                                  html_filename,
-                                                                                  is_for_seealso_context=True)
-                        mdx_stip_lines.append(f"<SeeAlso>{normalize_text(processed_sa_stip_content)}</SeeAlso>")
-                        if idx_sa_stip < len(all_see_also_p_tags_stip) - 1 and mdx_stip_lines[
-                            -1].strip() != "": mdx_stip_lines.append("")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: div.seeAlso in stip '{str(stip_child)[:50]}' found no <p> tags.")
-                processed_stip_child_flag = True
-            elif stip_child.has_attr('class') and 'xampleBlockStip' in stip_child.get('class', []):  # <details>
-                current_block_type_in_stip = 'details';
-                mdx_stip_lines.append("<details>");
-                mdx_stip_lines.append("  <summary>Examples</summary>");
-                mdx_stip_lines.append("  ")
-                examples_div = stip_child.find('div', class_='xamples')
-                if examples_div:
-                    details_content_lines = [];
-                    example_elements = [node for node in examples_div.children if isinstance(node, Tag)];
-                    table_header_needed = True
-                    for element_node_idx, element_node in enumerate(example_elements):
-                        is_direct_content_row_block = element_node.name == 'div' and 'row' in element_node.get('class',
-                                                                                                               []) and 'px-2' in element_node.get(
-                            'class', [])
-                        if element_node.name == 'hr': details_content_lines.append(
-                            "    <hr />"); table_header_needed = True
-                        if element_node_idx < len(example_elements) - 1 and example_elements[
-                            element_node_idx + 1].name != 'hr': details_content_lines.append("    ")
-                    elif element_node.name == 'div':
-                    rows_to_process_this_pass = [element_node] if is_direct_content_row_block else \
-                        [r for r in element_node.find_all('div', class_='row', recursive=True) if
-                         r.find_parent('div', class_='xamples') == examples_div]
-                    if not rows_to_process_this_pass: continue
-                    if any(r.find(class_='xampleLabel') for r in rows_to_process_this_pass) and table_header_needed:
-                        if details_content_lines and details_content_lines[-1].strip() != "" and not \
-                        details_content_lines[-1].strip().endswith(
-                            "|:---------|:------|"): details_content_lines.append("    ")
-                        details_content_lines.append("    | Property | Value |");
-                        details_content_lines.append("    |:---------|:------|");
-                        table_header_needed = False
-                    for ex_part_row in rows_to_process_this_pass:
-                        is_comment_row = bool(ex_part_row.find(class_='editComment'))
-                        is_full_example_comment = False
-                        if is_comment_row:
-                            comment_text_check = ex_part_row.find(class_='editComment').get_text(strip=True)
-                            if "[Full example:" in comment_text_check: is_full_example_comment = True
-
-                        if is_comment_row and is_full_example_comment and details_content_lines and \
-                                details_content_lines[-1].strip().endswith("|"):
-                            details_content_lines.append(
-                                "    ")  # Add blank line before Full Example comment if after table
-
-                        new_lines, table_header_needed, unrec_ex = process_example_content_row(ex_part_row,
-                                                                                               table_header_needed,
-                                                                                               logger, html_filename)
-                        if unrec_ex: unrecognized_elements_log.append(
-                            f"{html_filename}: Warning: Unrecognized structure in example row.")
-                        details_content_lines.extend(new_lines)
-                    if details_content_lines and details_content_lines[-1].strip() != "":
-                        if element_node_idx < len(example_elements) - 1 and example_elements[
-                            element_node_idx + 1].name != 'hr':
-                            details_content_lines.append("    ")
-                        elif element_node_idx == len(example_elements) - 1:
-                            details_content_lines.append("    ")
-                else:
-                    unrecognized_elements_log.append(
-                        f"{html_filename}: Warning: Unrecognized tag '{element_node.name}' directly inside div.xamples: {str(element_node)[:100]}")
-            mdx_stip_lines.extend(details_content_lines)
-        mdx_stip_lines.append("</details>");
-        processed_stip_child_flag = True
-    elif stip_child.name == 'div' and 'd-flex' in stip_child.get('class', []) and 'flexrow' in stip_child.get('class',
-                                                                                                              []):
-    if stip_child.find('div', class_='mandatory'): processed_stip_child_flag = True
-
-
-if not processed_stip_child_flag: unrecognized_elements_log.append(
-    f"{html_filename}: Warning: Unrecognized tag '{stip_child.name}' inside div.stip: {str(stip_child)[:100]}")
-if current_block_type_in_stip: last_block_type_in_stip = current_block_type_in_stip
-if idx_stip_child < len(stip_children_tags) - 1 and current_block_type_in_stip:
-    if mdx_stip_lines and mdx_stip_lines[-1].strip() != "": mdx_stip_lines.append("")
-clean_stip_lines = [];
-if mdx_stip_lines:  # ... (stip body assembly) ...
-    first_line_idx = 0
-    while first_line_idx < len(mdx_stip_lines) and mdx_stip_lines[first_line_idx].strip() == "": first_line_idx += 1
-    if first_line_idx < len(mdx_stip_lines): clean_stip_lines.append(mdx_stip_lines[first_line_idx])
-    for i_line in range(first_line_idx + 1, len(mdx_stip_lines)):
-        if not (mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() == ""):
-            clean_stip_lines.append(mdx_stip_lines[i_line])
-        elif mdx_stip_lines[i_line].strip() == "" and clean_stip_lines and clean_stip_lines[-1].strip() != "":
-            clean_stip_lines.append(mdx_stip_lines[i_line])
-stip_body_parts = []
-for line_idx, line_content in enumerate(clean_stip_lines):
-    if line_content.startswith("  ") or line_content.startswith("<details>") or line_content.startswith(
-        "</details>") or line_content.startswith("<Mandatory />") or line_content.strip().startswith(
-        "|") or line_content.strip().startswith("*") or line_content.startswith("<SeeAlso"):
-        stip_body_parts.append(line_content)
-    elif line_content == "":
-        stip_body_parts.append("")
-    else:
-        stip_body_parts.append(line_content)
-stip_body = "\n  ".join(stip_body_parts).rstrip()
-mdx_parts.append(f'<div className="stip">\n  {stip_body}\n</div>');
-if not (content_block_node_idx == len(content_nodes_to_iterate) - 1 and element_idx == len(
-    elements_to_process_this_block) - 1) and mdx_parts[-1].strip() != "": mdx_parts.append("")
-processed_element_in_section = True
-if not processed_element_in_section and isinstance(element, Tag) and element.name not in ['script', 'style', 'meta',
-                                                                                          'link', 'title', 'h3']:
-    unrecognized_elements_log.append(
-        f"{html_filename}: Warning: Unrecognized element type '{element.name}' in main content: {str(element)[:100]}")
-
-for log_msg in set(unrecognized_elements_log): logger.warning(f"{log_msg}")
-final_mdx_output_lines = []
-if mdx_parts:  # ... (final output filter) ...
-    if mdx_parts[0].strip() != "" or (len(mdx_parts) > 1 and mdx_parts[1].strip() != ""): final_mdx_output_lines.append(
-        mdx_parts[0])
-    for i in range(1, len(mdx_parts)):
-        if mdx_parts[i].strip() != "" or (
-                mdx_parts[i].strip() == "" and final_mdx_output_lines and final_mdx_output_lines[
-            -1].strip() != ""): final_mdx_output_lines.append(mdx_parts[i])
-# Remove multiple trailing blank lines, but keep one if content ends with an intentional blank
-while len(final_mdx_output_lines) > 1 and final_mdx_output_lines[-1].strip() == "" and final_mdx_output_lines[
-    -2].strip() == "": final_mdx_output_lines.pop()
-if not final_mdx_output_lines or (len(final_mdx_output_lines) == 1 and final_mdx_output_lines[
-    0].strip() == ""): return ""  # Return empty string for empty/whitespace-only output
-return "\n".join(final_mdx_output_lines) + "\n"
+
+def load_manifest(dest_dir, logger):
+    manifest_path = os.path.join(dest_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "converter_hash": None, "files": {}}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        return {"version": MANIFEST_VERSION, "converter_hash": None, "files": {}}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION or \
+            not isinstance(manifest.get("files"), dict):
+        logger.warning(f"Ignoring manifest {manifest_path} with unexpected format.")
+        return {"version": MANIFEST_VERSION, "converter_hash": None, "files": {}}
+    return manifest
+
+
+def save_manifest(dest_dir, manifest):
+    manifest_path = os.path.join(dest_dir, MANIFEST_FILENAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, manifest_path)
+
+
+def is_source_unchanged(manifest_entry, html_file_path, source_stat, dest_dir, converter_hash, manifest_converter_hash,
+                        output_formats, parser_backend):
+    """
+    Returns (unchanged, source_hash). source_hash is only populated when the file had to be read and
+    hashed, so the caller can pass it on to convert_html_file instead of hashing the file a second time.
+    """
+    if not manifest_entry or manifest_converter_hash != converter_hash:
+        return False, None
+    if manifest_entry.get("formats") != output_formats or manifest_entry.get("parser") != parser_backend or \
+            not all(os.path.exists(os.path.join(dest_dir, rel_output)) for rel_output in manifest_entry.get("outputs", [])):
+        return False, None
+    # Cheap check first: identical size and mtime means we never need to read the source.
+    if manifest_entry.get("size") == source_stat.st_size and manifest_entry.get("mtime_ns") == source_stat.st_mtime_ns:
+        return True, None
+    with open(html_file_path, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    return source_hash == manifest_entry.get("source_hash"), source_hash
+
+
+def prune_deleted_outputs(manifest, seen_sources, dest_dir, logger, prune):
+    stale_sources = sorted(set(manifest["files"]) - seen_sources)
+    for rel_source in stale_sources:
+        for rel_output in manifest["files"][rel_source].get("outputs", []):
+            output_path = os.path.join(dest_dir, rel_output)
+            if prune:
+                if os.path.isfile(output_path):
+                    os.remove(output_path)
+                    logger.info(f"Pruned output of deleted source '{rel_source}': {output_path}")
+            else:
+                logger.warning(f"Source '{rel_source}' was deleted; stale output remains at {output_path} (use --prune to remove).")
+        if prune: del manifest["files"][rel_source]
+    return stale_sources
+
+
+# --- Document Cache and Output Formats ---
+DOCUMENT_CACHE_SUFFIX = ".mdxdoc.json"
+# Output format name -> (file suffix replacing '.html', writer taking (MdxDocument, text sink))
+OUTPUT_FORMATS = {
+    "mdx": (".mdx", lambda mdx_doc, f: mdx_doc.write_mdx(f)),
+    "text": (".txt", lambda mdx_doc, f: f.write(mdx_doc.to_text())),
+    "json": (".ast.json", lambda mdx_doc, f: json.dump(mdx_doc.to_ast(), f, ensure_ascii=False, indent=2)),
+    "links": (".links.json", lambda mdx_doc, f: json.dump(mdx_doc.links, f, ensure_ascii=False, indent=2)),
+}
+
+
+def load_cached_document(cache_dir, rel_source, source_hash, converter_hash, parser_backend):
+    cache_path = os.path.join(cache_dir, rel_source + DOCUMENT_CACHE_SUFFIX)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("source_hash") != source_hash or cached.get("converter_hash") != converter_hash or \
+            cached.get("parser") != parser_backend:
+        return None
+    return MdxDocument.from_dict(cached["document"])
+
+
+def save_cached_document(cache_dir, rel_source, source_hash, converter_hash, parser_backend, mdx_doc):
+    cache_path = os.path.join(cache_dir, rel_source + DOCUMENT_CACHE_SUFFIX)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    write_file_atomically(cache_path, lambda f: json.dump(
+        {"source_hash": source_hash, "converter_hash": converter_hash, "parser": parser_backend,
+         "document": mdx_doc.to_dict()},
+        f, ensure_ascii=False, separators=(',', ':')))
+
+
+def write_file_atomically(file_path, write_contents):
+    # Writing through a temporary file keeps a failed conversion from leaving a partial output behind.
+    tmp_file_path = file_path + ".tmp"
+    try:
+        with open(tmp_file_path, 'w', encoding='utf-8') as f:
+            write_contents(f)
+        os.replace(tmp_file_path, file_path)
+    finally:
+        if os.path.exists(tmp_file_path): os.remove(tmp_file_path)
+
+
+def write_document_outputs(mdx_doc, dest_dir, rel_output_base, output_formats):
+    """Writes every requested format for one document; returns the output paths relative to dest_dir."""
+    rel_outputs = []
+    for format_name in output_formats:
+        suffix, write_format = OUTPUT_FORMATS[format_name]
+        rel_output = rel_output_base + suffix
+        write_file_atomically(os.path.join(dest_dir, rel_output), lambda f: write_format(mdx_doc, f))
+        rel_outputs.append(rel_output)
+    return rel_outputs
 
 
 # --- Main Execution Logic ---
@@ -556,17 +1032,155 @@ def main():
     parser.add_argument("source_dir", help="Source directory containing HTML files.")
     parser.add_argument("dest_dir", help="Destination directory for converted MDX files.")
     parser.add_argument("--log_file", default="conversion_log.txt", help="File to store conversion logs.")
+    parser.add_argument("--diagnostics_report", default="conversion_diagnostics.json",
+                        help="JSON file summarising converter diagnostics per rule at the end of the run.")
+    parser.add_argument("--max_samples_per_rule", type=int, default=DEFAULT_MAX_SAMPLES_PER_RULE,
+                        help="Number of example occurrences kept per diagnostic rule in the report.")
     parser.add_argument("--recursive", action="store_true", help="Process HTML files in subdirectories recursively.")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Skip HTML files unchanged since the last run, as recorded in {MANIFEST_FILENAME} in dest_dir.")
+    parser.add_argument("--prune", action="store_true",
+                        help="With --incremental, delete MDX outputs whose HTML source no longer exists.")
+    parser.add_argument("--parser", default=DEFAULT_PARSER_BACKEND,
+                        help="BeautifulSoup parser backend for whole pages (e.g. 'html.parser', 'lxml').")
+    parser.add_argument("--formats", default="mdx",
+                        help=f"Comma-separated output formats to emit from each parsed page: {', '.join(OUTPUT_FORMATS)}.")
+    parser.add_argument("--cache_dir",
+                        help="Directory for the serialized document model of each page; unchanged pages are then never re-parsed.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes; 1 converts in this process.")
+    parser.add_argument("--max_tasks_per_child", type=int, default=DEFAULT_MAX_TASKS_PER_CHILD,
+                        help="Pages a worker process converts before it is replaced, returning its memory to the OS.")
+    parser.add_argument("--memory_limit_mb", type=float,
+                        help="Memory ceiling per page, checked against each conversion's peak (measured with tracemalloc). "
+                             "Pages over it are reported as memory-limit-exceeded diagnostics and the run exits with "
+                             "status 1; their outputs are still written. Tracing slows conversion, so it is off unless set.")
     args = parser.parse_args()
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
-                        handlers=[logging.FileHandler(args.log_file, mode='w', encoding='utf-8'),
-                                  logging.StreamHandler()])
+    log_listener = setup_queue_logging(args.log_file, multiprocessing.Queue() if args.workers > 1 else None)
+    try:
+        exit_status = run_conversion(args, parser, log_listener.queue)
+    finally:
+        log_listener.stop()
+    sys.exit(exit_status)
+
+
+def setup_queue_logging(log_file, log_queue=None):
+    """
+    Routes all logging through a QueueHandler; a QueueListener thread does the file and console I/O,
+    so emitting a record on the conversion path is only a queue put. Pass a multiprocessing queue when
+    worker processes will log into it as well (see init_conversion_worker).
+    """
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    output_handlers = [logging.FileHandler(log_file, mode='w', encoding='utf-8'), logging.StreamHandler()]
+    for handler in output_handlers: handler.setFormatter(formatter)
+    if log_queue is None: log_queue = queue.SimpleQueue()
+    route_logging_to_queue(log_queue)
+    log_listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    log_listener.start()
+    return log_listener
+
+
+def route_logging_to_queue(log_queue):
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+
+# --- Per-File Conversion (main process or pool worker) ---
+DEFAULT_MAX_TASKS_PER_CHILD = 200
+MEMORY_REPORT_TOP_SITES = 5
+
+
+def init_conversion_worker(log_queue, memory_limit_bytes):
+    route_logging_to_queue(log_queue)
+    if memory_limit_bytes: tracemalloc.start()
+
+
+def convert_html_file(task, options):
+    """
+    Converts one HTML file and writes its outputs. task is (html_file_path, rel_source, html_subdirectory,
+    rel_output_base, source_hash), where source_hash is the file's hash if the caller already computed it
+    (else None); with a document cache hit the source is then never read. options is the run-wide settings dict built by run_conversion. Everything returned is
+    plain data so the result can come back from a pool worker. Returns a dict with the manifest entry (None on
+    failure), this page's DiagnosticsCollector and its tracemalloc peak in bytes (None when not traced).
+    """
+    html_file_path, rel_source, html_subdirectory, rel_output_base, source_hash = task
+    logger = logging.getLogger(__name__)
+    diagnostics = DiagnosticsCollector(options["max_samples_per_rule"])
+    result = {"rel_source": rel_source, "manifest_entry": None, "diagnostics": diagnostics, "peak_bytes": None}
+    memory_limit_bytes = options["memory_limit_bytes"]
+    if memory_limit_bytes:
+        if not tracemalloc.is_tracing(): tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+    try:
+        logger.info(f"Processing: {html_file_path}")
+        output_dir = os.path.dirname(os.path.join(options["dest_dir"], rel_output_base))
+        if not os.path.exists(output_dir): os.makedirs(output_dir, exist_ok=True)
+        source_stat = os.stat(html_file_path)
+        source_bytes = None
+        if source_hash is None:
+            with open(html_file_path, 'rb') as f:
+                source_bytes = f.read()
+            source_hash = hashlib.sha256(source_bytes).hexdigest()
+        cache_dir = options["cache_dir"]
+        mdx_doc = load_cached_document(cache_dir, rel_source, source_hash, options["converter_hash"],
+                                       options["parser"]) if cache_dir else None
+        if mdx_doc is None:
+            if source_bytes is None:
+                with open(html_file_path, 'rb') as f:
+                    source_bytes = f.read()
+            mdx_doc = build_mdx_document(source_bytes.decode('utf-8'), os.path.basename(html_file_path), logger,
+                                         html_subdirectory, diagnostics, options["parser"])
+            if cache_dir: save_cached_document(cache_dir, rel_source, source_hash, options["converter_hash"],
+                                               options["parser"], mdx_doc)
+        else:
+            logger.debug(f"Using cached document model for {html_file_path}")
+        del source_bytes
+        if memory_limit_bytes:
+            peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+            result["peak_bytes"] = peak_bytes
+            if peak_bytes > memory_limit_bytes:
+                # The conversion succeeded, so its outputs are still written; dropping them would only make every
+                # later --incremental run convert the page again.
+                message = (f"conversion peaked at {peak_bytes / 2 ** 20:.1f} MiB, "
+                           f"over the {memory_limit_bytes / 2 ** 20:.1f} MiB limit")
+                diagnostics.report("memory-limit-exceeded", os.path.basename(html_file_path), message=message)
+                top_sites = tracemalloc.take_snapshot().statistics('lineno')[:MEMORY_REPORT_TOP_SITES]
+                logger.warning(f"{html_file_path}: {message}. Largest live allocations:\n"
+                               + "\n".join(f"  {stat}" for stat in top_sites))
+        output_formats = options["output_formats"]
+        rel_outputs = write_document_outputs(mdx_doc, options["dest_dir"], rel_output_base, output_formats)
+        logger.info(f"Successfully converted: {html_file_path} -> {', '.join(rel_outputs)}")
+        result["manifest_entry"] = {"source_hash": source_hash,
+                                    "size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns,
+                                    "formats": output_formats, "parser": options["parser"], "outputs": rel_outputs}
+        if result["peak_bytes"] is not None: result["manifest_entry"]["peak_bytes"] = result["peak_bytes"]
+    except Exception as e:
+        logger.error(f"Failed to convert {html_file_path}: {e}", exc_info=True)
+    return result
+
+
+def run_conversion(args, parser, log_queue=None):
     logger = logging.getLogger(__name__)
     logger.info(f"Starting conversion from '{os.path.abspath(args.source_dir)}' to '{os.path.abspath(args.dest_dir)}'");
     logger.info(f"Logging to: {os.path.abspath(args.log_file)}")
+    output_formats = [format_name.strip() for format_name in args.formats.split(",") if format_name.strip()]
+    unknown_formats = [format_name for format_name in output_formats if format_name not in OUTPUT_FORMATS]
+    if unknown_formats or not output_formats:
+        parser.error(f"Unknown output format(s) {unknown_formats}; choose from {', '.join(OUTPUT_FORMATS)}.")
     os.makedirs(args.dest_dir, exist_ok=True)
     files_processed_count = 0;
     conversion_errors = 0
+    files_skipped_count = 0
+    converter_hash = compute_converter_hash()
+    manifest = load_manifest(args.dest_dir, logger) if args.incremental else \
+        {"version": MANIFEST_VERSION, "converter_hash": None, "files": {}}
+    if args.workers < 1: parser.error("--workers must be at least 1.")
+    if args.incremental and manifest["converter_hash"] not in (None, converter_hash):
+        logger.info("Converter changed since the last run; all files will be reconverted.")
+    diagnostics = DiagnosticsCollector(args.max_samples_per_rule)
+    seen_sources = set()
     items_to_scan = []
     abs_source_dir_for_main = os.path.abspath(args.source_dir)
 
@@ -580,9 +1194,29 @@ def main():
                 html_file_path = os.path.join(abs_source_dir_for_main, filename)
                 if os.path.isfile(html_file_path): items_to_scan.append(html_file_path)
 
+    memory_limit_bytes = int(args.memory_limit_mb * 2 ** 20) if args.memory_limit_mb else None
+    over_limit_sources = []
+    tasks = []
     for html_file_path in items_to_scan:
         try:
-            logger.info(f"Processing: {html_file_path}")
+            rel_source = os.path.relpath(html_file_path, abs_source_dir_for_main).replace(os.sep, '/')
+            seen_sources.add(rel_source)
+            source_hash = None
+            if args.incremental:
+                source_stat = os.stat(html_file_path)
+                unchanged, source_hash = is_source_unchanged(manifest["files"].get(rel_source), html_file_path,
+                                                   source_stat, args.dest_dir, converter_hash,
+                                                   manifest["converter_hash"], output_formats, args.parser)
+                if unchanged:
+                    manifest["files"][rel_source].update(size=source_stat.st_size, mtime_ns=source_stat.st_mtime_ns)
+                    # A skipped page still counts against the ceiling if its recorded peak exceeds it
+                    if memory_limit_bytes and manifest["files"][rel_source].get("peak_bytes", 0) > memory_limit_bytes:
+                        logger.warning(f"{html_file_path}: unchanged, but its last conversion peaked at "
+                                       f"{manifest['files'][rel_source]['peak_bytes'] / 2 ** 20:.1f} MiB, over the limit")
+                        over_limit_sources.append(rel_source)
+                    logger.debug(f"Unchanged, skipping: {html_file_path}")
+                    files_skipped_count += 1
+                    continue
             abs_html_file_dir = os.path.abspath(os.path.dirname(html_file_path))
             html_subdirectory = ""
             # Ensure relpath is calculated from the true root of the docs content passed in source_dir
@@ -592,23 +1226,59 @@ def main():
                 html_subdirectory = html_subdirectory.replace(os.sep, '/')
 
             relative_path_for_output = os.path.relpath(html_file_path, abs_source_dir_for_main)
-            mdx_filename_part = os.path.splitext(relative_path_for_output)[0] + ".mdx"
-            mdx_file_path = os.path.join(args.dest_dir, mdx_filename_part)
-            mdx_file_dir = os.path.dirname(mdx_file_path)
-            if not os.path.exists(mdx_file_dir): os.makedirs(mdx_file_dir, exist_ok=True)
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            mdx_output = convert_html_to_mdx(html_content, os.path.basename(html_file_path), logger, html_subdirectory)
-            with open(mdx_file_path, 'w', encoding='utf-8') as f:
-                f.write(mdx_output)
-            logger.info(f"Successfully converted: {html_file_path} -> {mdx_file_path}")
-            files_processed_count += 1
+            rel_output_base = os.path.splitext(relative_path_for_output)[0].replace(os.sep, '/')
+            tasks.append((html_file_path, rel_source, html_subdirectory, rel_output_base, source_hash))
         except Exception as e:
             logger.error(f"Failed to convert {html_file_path}: {e}", exc_info=True)
             conversion_errors += 1
 
-    logger.info(f"Conversion process finished. {files_processed_count} file(s) processed.")
+    options = {"dest_dir": args.dest_dir, "cache_dir": args.cache_dir, "parser": args.parser,
+               "output_formats": output_formats, "converter_hash": converter_hash,
+               "max_samples_per_rule": args.max_samples_per_rule, "memory_limit_bytes": memory_limit_bytes}
+    page_peaks = []
+    # multiprocessing.Pool rather than ProcessPoolExecutor: its maxtasksperchild recycling works on every
+    # supported Python and start method.
+    with multiprocessing.Pool(args.workers, init_conversion_worker, (log_queue, memory_limit_bytes),
+                              args.max_tasks_per_child) if args.workers > 1 else nullcontext() as pool:
+        convert_task = functools.partial(convert_html_file, options=options)
+        results = pool.imap(convert_task, tasks) if pool else map(convert_task, tasks)
+        for result in results:
+            diagnostics.merge(result["diagnostics"])
+            if result["peak_bytes"] is not None:
+                page_peaks.append((result["peak_bytes"], result["rel_source"]))
+                if result["peak_bytes"] > memory_limit_bytes: over_limit_sources.append(result["rel_source"])
+            if result["manifest_entry"] is None:
+                conversion_errors += 1
+                continue
+            manifest["files"][result["rel_source"]] = result["manifest_entry"]
+            files_processed_count += 1
+    if memory_limit_bytes and tracemalloc.is_tracing(): tracemalloc.stop()
+
+    if args.incremental:
+        stale_sources = prune_deleted_outputs(manifest, seen_sources, args.dest_dir, logger, args.prune)
+        if stale_sources:
+            logger.info(f"{len(stale_sources)} deleted source file(s) {'pruned' if args.prune else 'reported'}.")
+    else:
+        # A full run rebuilds the manifest from scratch so a later --incremental run has a baseline.
+        manifest["files"] = {k: v for k, v in manifest["files"].items() if k in seen_sources}
+    manifest["converter_hash"] = converter_hash
+    save_manifest(args.dest_dir, manifest)
+
+    diagnostics.write_json_report(args.diagnostics_report)
+    logger.info(f"Diagnostics: {diagnostics.to_report()['total']} issue(s) across {diagnostics.pages_analyzed} parsed page(s); "
+                f"report written to {os.path.abspath(args.diagnostics_report)}")
+    if page_peaks:
+        page_peaks.sort(reverse=True)
+        logger.info(f"Memory: {len(page_peaks)} page(s) traced; median peak {page_peaks[len(page_peaks) // 2][0] / 2 ** 20:.1f} MiB, "
+                    f"largest {page_peaks[0][0] / 2 ** 20:.1f} MiB ({page_peaks[0][1]}).")
+    logger.info(f"Conversion process finished. {files_processed_count} file(s) processed, "
+                f"{files_skipped_count} unchanged file(s) skipped.")
     if conversion_errors > 0: logger.warning(f"{conversion_errors} file(s) encountered errors during conversion.")
+    if over_limit_sources:
+        logger.error(f"{len(over_limit_sources)} page(s) exceeded the {args.memory_limit_mb} MiB memory limit: "
+                     f"{', '.join(sorted(over_limit_sources)[:10])}{' ...' if len(over_limit_sources) > 10 else ''}")
+        return 1
+    return 0
 
 
 if __name__ == '__main__':
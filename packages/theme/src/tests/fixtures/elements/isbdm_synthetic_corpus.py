@@ -0,0 +1,219 @@
+import os
+import random
+import argparse
+from html import escape
+
+# Generates ISBDM-shaped element pages (same sidebar, element reference, guidance, stipulation and
+# example markup as the published statements pages) for benchmarking html_to_mdx_v2.
+# Output is deterministic for a given seed so timings and outputs can be compared across runs.
+
+WORDS = ("manifestation statement title responsibility publication production distribution edition "
+         "issue iteration identifier availability category script transcription cataloguing agency "
+         "record element value note volume sheet printed content text unit super-unit sub-unit "
+         "order preference language symbol abbreviation initialism expansion").split()
+
+SECTIONS = ("statements", "notes", "attributes", "relationships")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <title>ISBD for Manifestation</title>
+  </head>
+  <body>
+    <main class="container">
+      <div class="row my-2">
+        <div class="col-md-5">
+          <div class="row gx-0 me-4">
+            <div class="col-md-12">
+              <nav class="d-flex flex-column navISBDMSection">
+{sidebar}
+              </nav>
+            </div>
+          </div>
+        </div>
+        <div class="col-md-7 border rounded">
+          <div class="row m-1">
+            <h3>{title}</h3>
+            <h4>Element reference</h4>
+            <div class="px-4">
+{element_reference}
+            </div>
+          </div>
+{sections}
+        </div>
+      </div>
+    </main>
+  </body>
+</html>
+"""
+
+
+def _sentence(rng, min_words=6, max_words=24):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return escape(" ".join(words).capitalize() + ".")
+
+
+def _element_title(rng):
+    return "has " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+
+
+def _element_link(section, element_id, label, css_class="linkMenuElement"):
+    return f'<a class="{css_class}" href="/ISBDM/docs/{section}/{element_id}.html">{escape(label)}</a>'
+
+
+def _build_sidebar(rng, section, element_id, title, sibling_ids):
+    lines = ['                <div class="d-flex align-items-center">',
+             f'                  <a href="/ISBDM/docs/{section}/general.html" class="linkMenuEntry">[General stipulations]</a>',
+             '                </div>']
+    current_index = rng.randint(0, len(sibling_ids))
+    ids = list(sibling_ids)
+    ids.insert(current_index, element_id)
+    for position, sidebar_id in enumerate(ids):
+        if sidebar_id == element_id:
+            lines.append('                <div class="d-flex align-items-center" aria-current="true">')
+            lines.append('                  <i class="bi bi-asterisk navISBDMSectionActive px-1"></i>')
+            label = title
+        else:
+            lines.append('                <div class="d-flex align-items-center">')
+            if position > 0: lines.append('                  <i class="bi bi-arrow-return-right px-1"></i>')
+            label = _element_title(rng)
+        lines.append("                  " + _element_link(section, sidebar_id, label))
+        lines.append('                </div>')
+    return "\n".join(lines)
+
+
+def _build_element_reference(rng, section, sibling_ids):
+    rows = []
+    for label, value in (("Definition", _sentence(rng)), ("Scope note", ""), ("Domain", "Manifestation"),
+                         ("Range", "Literal")):
+        rows.append(f'              <div class="row">\n'
+                    f'                <div class="col-md-3 border elref">{label}</div>\n'
+                    f'                <div class="col-md-9 border eltext">{value}</div>\n'
+                    f'              </div>')
+    sub_types = "".join(_element_link(section, sub_id, _element_title(rng)) for sub_id in sibling_ids[:3])
+    rows.append('              <div class="row">\n'
+                '                <div class="col-md-3 border elref">Element sub-type</div>\n'
+                '                <div class="col-md-9 border eltext">\n'
+                f'                  <div class="d-flex flex-column navISBDMRef">{sub_types}</div>\n'
+                '                </div>\n'
+                '              </div>')
+    return "\n".join(rows)
+
+
+def _build_guidance_section(rng, heading, section, guid_count):
+    parts = ['          <div class="row m-1">', f'            <h4>{heading}</h4>']
+    for _ in range(guid_count):
+        parts.append(f'            <div class="guid">\n              <p>{_sentence(rng, 12, 48)}</p>\n            </div>')
+    if rng.random() < 0.5:
+        see_also = _element_link(section, rng.randint(1000, 1999), _element_title(rng))
+        parts.append(f'            <div class="seeAlsoAdd">\n'
+                     f'              <p><i>See also</i>: {see_also}</p>\n'
+                     f'            </div>')
+    parts.append('          </div>')
+    return "\n".join(parts)
+
+
+def _build_example_rows(rng, section, indent):
+    pad = " " * indent
+    label = escape(_element_title(rng))
+    rows = [f'{pad}<div class="row px-2">\n'
+            f'{pad}  <div class="col-6 xampleLabel">{label}</div>\n'
+            f'{pad}  <div class="col-6 xampleValue">&quot;{_sentence(rng, 3, 16)}&quot;</div>\n'
+            f'{pad}</div>']
+    if rng.random() < 0.6:
+        full_example = _element_link("fullex", f"fx{rng.randint(1, 99):03d}", _sentence(rng, 3, 8), "linkInline")
+        rows.append(f'{pad}<div class="row px-2">\n'
+                    f'{pad}  <div class="col editComment">[Full example: {full_example}.]</div>\n'
+                    f'{pad}</div>')
+    return "\n".join(rows)
+
+
+def _build_examples_block(rng, section, example_id, group_count):
+    groups = []
+    for _ in range(group_count):
+        if rng.random() < 0.3:
+            nested = "\n".join(f'                    <div>\n{_build_example_rows(rng, section, 22)}\n                    </div>'
+                               for _ in range(rng.randint(2, 4)))
+            groups.append(f'                  <div>\n{nested}\n                  </div>')
+        else:
+            groups.append(f'                  <div>\n{_build_example_rows(rng, section, 20)}\n                  </div>')
+    body = "\n                  <hr />\n".join(groups)
+    return (f'              <div class="xampleBlockStip">\n'
+            f'                <p><a class="linkEx" href="#isbdmex{example_id}" data-bs-toggle="collapse" role="button"\n'
+            f'                    aria-expanded="false" aria-controls="isbdmex{example_id}">Examples</a></p>\n'
+            f'                <div class="collapse xamples" id="isbdmex{example_id}">\n'
+            f'{body}\n'
+            f'                </div>\n'
+            f'              </div>')
+
+
+def _build_stipulation_section(rng, section, stip_count, max_example_groups):
+    parts = ['          <div class="row m-1">', '            <h4>Stipulations</h4>']
+    for stip_index in range(stip_count):
+        stip = ['            <div class="stip">']
+        if stip_index == 0:
+            stip.append('              <div class="d-flex flexrow">\n'
+                        '                <div class="mandatory mx-1 px-2" title="Mandatory"><a\n'
+                        '                    href="/ISBDM/docs/intro#i022.html">&#10045;</a></div>\n'
+                        '              </div>')
+        stip.append(f'              <p>{_sentence(rng, 10, 40)}</p>')
+        if rng.random() < 0.4:
+            list_tag = rng.choice(("ol", "ul"))
+            items = "\n".join(f'                <li>{_sentence(rng, 4, 14)}</li>' for _ in range(rng.randint(2, 6)))
+            stip.append(f'              <{list_tag} class="num">\n{items}\n              </{list_tag}>')
+        if max_example_groups and rng.random() < 0.8:
+            stip.append(_build_examples_block(rng, section, stip_index + 1, rng.randint(1, max_example_groups)))
+        stip.append('            </div>')
+        parts.append("\n".join(stip))
+    parts.append('          </div>')
+    return "\n".join(parts)
+
+
+def generate_isbdm_page(seed, section="statements", element_id=None, max_guids=10, max_stips=4,
+                        max_example_groups=4):
+    """Returns (html_filename, html_content) for one synthetic ISBDM element page."""
+    rng = random.Random(seed)
+    element_id = element_id if element_id is not None else 1000 + seed
+    title = _element_title(rng)
+    sibling_ids = rng.sample(range(1000, 1999), rng.randint(3, 12))
+    sibling_ids = [sibling_id for sibling_id in sibling_ids if sibling_id != element_id]
+    sections = [_build_guidance_section(rng, "Additional information", section, rng.randint(1, max_guids)),
+                _build_guidance_section(rng, "Element values", section, 1),
+                _build_stipulation_section(rng, section, rng.randint(1, max_stips), max_example_groups)]
+    html_content = PAGE_TEMPLATE.format(sidebar=_build_sidebar(rng, section, element_id, title, sibling_ids),
+                                        title=escape(title),
+                                        element_reference=_build_element_reference(rng, section, sibling_ids),
+                                        sections="\n".join(sections))
+    return f"{element_id}.html", html_content
+
+
+def generate_isbdm_corpus(page_count, seed=0, **page_options):
+    """Yields (html_subdirectory, html_filename, html_content) for page_count synthetic pages."""
+    for page_index in range(page_count):
+        section = SECTIONS[page_index % len(SECTIONS)]
+        html_filename, html_content = generate_isbdm_page(seed * 1_000_003 + page_index, section,
+                                                          element_id=1000 + page_index, **page_options)
+        yield section, html_filename, html_content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic ISBDM HTML corpus for benchmarking html_to_mdx_v2.")
+    parser.add_argument("dest_dir", help="Directory to write the section subdirectories into.")
+    parser.add_argument("--pages", type=int, default=2000, help="Number of pages to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the page generator.")
+    parser.add_argument("--max_example_groups", type=int, default=4,
+                        help="Upper bound on example groups per stipulation (raise for full-example-sized pages).")
+    args = parser.parse_args()
+
+    for html_subdirectory, html_filename, html_content in generate_isbdm_corpus(
+            args.pages, args.seed, max_example_groups=args.max_example_groups):
+        section_dir = os.path.join(args.dest_dir, html_subdirectory)
+        os.makedirs(section_dir, exist_ok=True)
+        with open(os.path.join(section_dir, html_filename), 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    print(f"Wrote {args.pages} synthetic ISBDM pages to {args.dest_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import os
+import re
+import glob
+import time
+
+import pytest
+
+yaml = pytest.importorskip("yaml")
+
+import front_matter_io
+from front_matter_io import read_front_matter, read_front_matter_head, render_front_matter, write_front_matter
+
+# Front matter I/O checks.
+#   pytest test_front_matter_io.py                                   -> behaviour + benchmark (2000 files)
+#   FRONT_MATTER_BENCH_FILES=10000 pytest -k benchmark -s            -> larger benchmark
+#   FRONT_MATTER_CORPUS=/path/to/docs pytest -k legacy               -> compare against the old reader on real MDX
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *[".."] * 6))
+FRONT_MATTER_CORPUS = os.environ.get("FRONT_MATTER_CORPUS", os.path.join(REPO_ROOT, "standards"))
+BENCH_FILES = int(os.environ.get("FRONT_MATTER_BENCH_FILES", "2000"))
+
+SAMPLE_MDX = """---
+# Generated from the ISBDM sidebar; edit the HTML, not this block
+title: has title proper
+tags:
+- statements
+- manifestation
+customProps:
+  sidebar_prefix: '│  ├─ '  # keep aligned with the HTML tree
+sidebar_position: 4
+---
+
+import { InLink } from '@site/src/components/global/InLink';
+
+# has title proper
+"""
+
+
+def _legacy_read_front_matter(mdx_file_path):
+    # The whole-file reader html_to_mdx_v10 used before front_matter_io
+    with open(mdx_file_path, 'r', encoding='utf-8') as f: content = f.read()
+    fm_match = re.match(r'^---\s*?\n(.*?\n)---\s*?\n?(.*)', content, re.DOTALL)
+    if fm_match:
+        try:
+            fm_dict = yaml.safe_load(fm_match.group(1))
+            return (fm_dict if isinstance(fm_dict, dict) else {}), fm_match.group(2)
+        except yaml.YAMLError:
+            return {}, content
+    return {}, content
+
+
+def _legacy_write_front_matter(mdx_file_path, front_matter_dict, body_content):
+    final_content = body_content.lstrip() if not front_matter_dict else f"---\n{yaml.dump(front_matter_dict, sort_keys=False, allow_unicode=True, default_flow_style=False, width=1000)}---\n{body_content}"
+    with open(mdx_file_path, 'w', encoding='utf-8') as f: f.write(final_content)
+
+
+def _write(path, content, newline=None):
+    with open(path, 'w', encoding='utf-8', newline=newline) as f: f.write(content)
+    return str(path)
+
+
+@pytest.mark.parametrize("content", [
+    SAMPLE_MDX,
+    "No front matter.\n",
+    "---\ntitle: unclosed\n",
+    "---\n---\ntitle: x\n---\nbody starts here",
+    "---\n- a list\n---\nBody\n",
+    "---\ntitle: [broken\n---\nBody\n",
+    "---   \r\ntitle: Windows\r\n---\r\nBody\r\nline\r\n",
+    "---\ntitle: no newline after close\n---",
+])
+def test_reader_matches_legacy_reader(tmp_path, content):
+    mdx_path = _write(tmp_path / "page.mdx", content, newline="")
+    assert read_front_matter(mdx_path) == _legacy_read_front_matter(mdx_path)
+
+
+def test_reader_matches_legacy_reader_on_corpus():
+    mdx_paths = glob.glob(os.path.join(FRONT_MATTER_CORPUS, "**", "*.mdx"), recursive=True)
+    if not mdx_paths: pytest.skip(f"no MDX files under {FRONT_MATTER_CORPUS}")
+    for mdx_path in mdx_paths:
+        assert read_front_matter(mdx_path) == _legacy_read_front_matter(mdx_path), mdx_path
+        front_matter_head = read_front_matter_head(mdx_path)
+        if front_matter_head.raw:
+            # Unchanged front matter renders back to its original text
+            assert render_front_matter(front_matter_head, dict(front_matter_head.data)) == f"---\n{front_matter_head.raw}---\n"
+
+
+def test_update_keeps_comments_order_and_body(tmp_path):
+    mdx_path = _write(tmp_path / "page.mdx", SAMPLE_MDX)
+    front_matter_head = read_front_matter_head(mdx_path)
+    updated = dict(front_matter_head.data, sidebar_position=5, sidebar_label="has title proper")
+    del updated["tags"]
+    write_front_matter(front_matter_head, updated)
+
+    with open(mdx_path, encoding='utf-8') as f: written = f.read()
+    assert written == SAMPLE_MDX.replace("tags:\n- statements\n- manifestation\n", "").replace(
+        "sidebar_position: 4\n", "sidebar_position: 5\nsidebar_label: has title proper\n")
+    assert read_front_matter(mdx_path)[0] == updated
+
+
+def test_body_is_spliced_byte_for_byte(tmp_path):
+    body = "\r\nBody with CRLF\r\nand │ box drawing\r\n" * 1000
+    mdx_path = _write(tmp_path / "page.mdx", "---\r\ntitle: x\r\n---\r\n" + body, newline="")
+    write_front_matter(read_front_matter_head(mdx_path), {"title": "y"})
+    with open(mdx_path, 'rb') as f:
+        assert f.read() == ("---\ntitle: y\n---\n" + body).encode('utf-8')
+
+
+def test_empty_front_matter_writes_stripped_body(tmp_path):
+    mdx_path = _write(tmp_path / "page.mdx", "---\ntitle: x\n---\n\n\n  Body\n")
+    output_path = str(tmp_path / "out.mdx")
+    write_front_matter(read_front_matter_head(mdx_path), {}, output_path)
+    with open(output_path, encoding='utf-8') as f: assert f.read() == "Body\n"
+
+
+def _bench_front_matter(index):
+    return {"title": f"has element {index}", "sidebar_label": f"has element {index}", "sidebar_level": 3,
+            "sidebar_position": index, "customProps": {"sidebar_prefix": "│  ├─ ", "id": f"1{index:03d}"}}
+
+
+def test_benchmark_read_and_update(tmp_path):
+    body = "\n".join(f"Paragraph {i} of the element page, with <InLink>links</InLink>." for i in range(400)) + "\n"
+    mdx_paths = [_write(tmp_path / f"{index}.mdx", f"---\n{yaml.dump(_bench_front_matter(index), sort_keys=False, allow_unicode=True)}---\n{body}")
+                 for index in range(BENCH_FILES)]
+
+    started = time.perf_counter()
+    for mdx_path in mdx_paths:
+        front_matter_dict, body_content = _legacy_read_front_matter(mdx_path)
+        front_matter_dict["sidebar_position"] += 1
+        _legacy_write_front_matter(mdx_path, front_matter_dict, body_content)
+    legacy_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for mdx_path in mdx_paths:
+        front_matter_head = read_front_matter_head(mdx_path)
+        write_front_matter(front_matter_head, dict(front_matter_head.data, sidebar_position=front_matter_head.data["sidebar_position"] + 1))
+    elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for mdx_path in mdx_paths: read_front_matter_head(mdx_path)
+    read_elapsed = time.perf_counter() - started
+
+    print(f"\n{BENCH_FILES} files (libyaml: {front_matter_io.YAML_LOADER is not yaml.SafeLoader}): "
+          f"read+update {elapsed:.2f}s vs legacy {legacy_elapsed:.2f}s; head-only read {read_elapsed:.2f}s")
+    assert read_front_matter(mdx_paths[0]) == (dict(_bench_front_matter(0), sidebar_position=2), body)
+
+
+def test_rewrite_keeps_permissions_and_cleans_up_on_failure(tmp_path, monkeypatch):
+    mdx_path = _write(tmp_path / "page.mdx", SAMPLE_MDX)
+    os.chmod(mdx_path, 0o664)
+    previous_umask = os.umask(0o077)
+    try:
+        write_front_matter(read_front_matter_head(mdx_path), {"title": "y"})
+    finally:
+        os.umask(previous_umask)
+    assert os.stat(mdx_path).st_mode & 0o777 == 0o664
+
+    def failing_copy(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(front_matter_io.shutil, "copyfileobj", failing_copy)
+    with pytest.raises(OSError):
+        write_front_matter(read_front_matter_head(mdx_path), {"title": "z"})
+    assert os.listdir(tmp_path) == ["page.mdx"]
+    assert read_front_matter(mdx_path)[0] == {"title": "y"}
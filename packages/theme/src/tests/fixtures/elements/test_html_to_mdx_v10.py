@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import random
+import logging
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("yaml")
+
+import html_to_mdx_v10
+import html_to_mdx_v2
+from html_to_mdx_v10 import (NavItem, build_nav_item_index, cache_all_html_sidebar_structures,
+                             determine_hierarchy_properties, diff_mdx_files, generate_sidebar_prefix, generate_sidebars,
+                             get_mdx_nav_item_from_cache, process_single_mdx_file, write_diff_report, write_sidebars_file)
+from isbdm_synthetic_corpus import generate_isbdm_page
+
+# Sidebar hierarchy checks for html_to_mdx_v10.
+#   pytest test_html_to_mdx_v10.py                                -> equivalence + benchmark (50k items)
+#   SIDEBAR_BENCH_ITEMS=200000 pytest -k benchmark -s              -> larger benchmark
+
+BENCH_ITEMS = int(os.environ.get("SIDEBAR_BENCH_ITEMS", "50000"))
+
+
+def _legacy_determine_hierarchy_properties(section_nav_items):
+    # The two-pass builder determine_hierarchy_properties replaced; kept as the reference output.
+    for i, current_item in enumerate(section_nav_items):
+        current_item.is_last_sibling = True
+        for j in range(i + 1, len(section_nav_items)):
+            next_item = section_nav_items[j]
+            if next_item.html_level == current_item.html_level:
+                current_item.is_last_sibling = False
+                break
+            if next_item.html_level < current_item.html_level: break
+    ancestor_last_status_stack = []
+    for i, item in enumerate(section_nav_items):
+        while len(ancestor_last_status_stack) >= item.html_level: ancestor_last_status_stack.pop()
+        item.ancestor_is_last_flags = list(ancestor_last_status_stack)
+        ancestor_last_status_stack.append(item.is_last_sibling)
+        item.has_children_in_html = (i + 1 < len(section_nav_items)
+                                     and section_nav_items[i + 1].html_level > item.html_level)
+
+
+def _synthetic_levels(rng, item_count, base_level=1, max_depth=6):
+    levels, level = [], base_level
+    for _ in range(item_count):
+        level = max(base_level, min(base_level + max_depth - 1, level + rng.choice((-2, -1, 0, 0, 1, 1, 2))))
+        levels.append(level)
+    return levels
+
+
+def _nav_items(levels):
+    return [NavItem(f"/docs/section/{i}.html", f"section/{i}", f"Item {i}", level, i + 1, "section.html")
+            for i, level in enumerate(levels)]
+
+
+def _hierarchy(section_nav_items):
+    return [(item.is_last_sibling, item.ancestor_is_last_flags, item.has_children_in_html,
+             generate_sidebar_prefix(item)) for item in section_nav_items]
+
+
+@pytest.mark.parametrize("base_level", [1, 2, 3])
+def test_hierarchy_matches_legacy_builder(base_level):
+    rng = random.Random(base_level)
+    for _ in range(500):
+        levels = _synthetic_levels(rng, rng.randint(0, 40), base_level, max_depth=5)
+        legacy_items, items = _nav_items(levels), _nav_items(levels)
+        _legacy_determine_hierarchy_properties(legacy_items)
+        determine_hierarchy_properties(items)
+        assert _hierarchy(items) == _hierarchy(legacy_items), levels
+
+
+def test_hierarchy_prefixes_for_nested_section():
+    items = _nav_items([1, 2, 2, 3, 3, 1])
+    determine_hierarchy_properties(items)
+    assert [generate_sidebar_prefix(item) for item in items] == [None, "│  ├─ ", "│  └─ ", "│     ├─ ",
+                                                                 "│     └─ ", None]
+    assert [item.has_children_in_html for item in items] == [True, False, True, False, False, False]
+
+
+def test_nav_item_index_lookup(tmp_path):
+    def item(key, position):
+        return NavItem(f"/ISBDM/docs/{key}.html", key, key, 3, position, "index.html")
+    first_statement, duplicate_statement = item("statements/1025", 1), item("statements/1025", 2)
+    cached_structures = {"root_index": [item("index", 1), item("intro/index", 2)],
+                         "statements": [first_statement, duplicate_statement, item("statements/1026", 3)],
+                         "elements/statements": [item("elements/statements/index", 1)]}
+    nav_item_index = build_nav_item_index(cached_structures)
+
+    def lookup(mdx_relpath):
+        return get_mdx_nav_item_from_cache(str(tmp_path / mdx_relpath), str(tmp_path), nav_item_index)
+
+    # Duplicate keys resolve to the first item in sidebar order, as the linear scan did
+    assert lookup("statements/1025.mdx") is first_statement
+    assert first_statement.mdx_path == str(tmp_path / "statements/1025.mdx")
+    assert lookup("index.mdx").normalized_key == "index"
+    assert lookup("elements/statements/index.mdx").normalized_key == "elements/statements/index"
+    assert lookup("intro/index.mdx") is None  # Only docs/index.mdx belongs to root_index
+    assert lookup("statements/9999.mdx") is None
+    assert lookup("glossary/index.mdx") is None
+
+
+def _write_sidebar_sources(source_root):
+    section_config = {}
+    for seed, section in enumerate(("statements", "notes", "attributes")):
+        _, html_content = generate_isbdm_page(seed, section)
+        (source_root / section).mkdir(parents=True)
+        (source_root / section / "index.html").write_text(html_content, encoding="utf-8")
+        section_config[section] = {"source_html_dir": section, "source_html_file": "index.html",
+                                   "index_doc_absolute_level": 2, "children_absolute_base_level": 3}
+    return section_config
+
+
+def _structure_summary(cached_structures):
+    return {section_key: [(item.normalized_key, item.label, item.html_level, item.html_position_in_section,
+                           generate_sidebar_prefix(item)) for item in nav_items]
+            for section_key, nav_items in cached_structures.items()}
+
+
+def test_sidebar_cache_skips_unchanged_sections(tmp_path, monkeypatch):
+    source_root = tmp_path / "docs"
+    monkeypatch.setattr(html_to_mdx_v10, "SECTION_CONFIG", _write_sidebar_sources(source_root))
+    cache_file = str(tmp_path / "sidebar_cache.json")
+
+    parsed, _ = cache_all_html_sidebar_structures(str(source_root), workers=2, cache_file=cache_file)
+    assert set(parsed) == {"statements", "notes", "attributes"}
+    uncached, _ = cache_all_html_sidebar_structures(str(source_root), workers=1)
+    assert _structure_summary(parsed) == _structure_summary(uncached)
+
+    parse_calls = []
+    original_parse = html_to_mdx_v10.parse_html_sidebar_nav
+    monkeypatch.setattr(html_to_mdx_v10, "parse_html_sidebar_nav",
+                        lambda path, *args: parse_calls.append(path) or original_parse(path, *args))
+    cached, _ = cache_all_html_sidebar_structures(str(source_root), workers=1, cache_file=cache_file)
+    assert parse_calls == []
+    assert _structure_summary(cached) == _structure_summary(parsed)
+
+    changed_page = source_root / "notes" / "index.html"
+    changed_page.write_text(changed_page.read_text(encoding="utf-8").replace("</nav>", """
+                <div class="d-flex align-items-center">
+                  <a class="linkMenuElement" href="/ISBDM/docs/notes/1999.html">has late addition</a>
+                </div>
+              </nav>"""), encoding="utf-8")
+    refreshed, _ = cache_all_html_sidebar_structures(str(source_root), workers=1, cache_file=cache_file)
+    assert parse_calls == [str(changed_page)]
+    assert refreshed["notes"][-1].normalized_key == "notes/1999"
+    assert _structure_summary(refreshed)["statements"] == _structure_summary(parsed)["statements"]
+
+
+def test_sidebars_are_read_from_converter_models(tmp_path, monkeypatch):
+    source_root, model_dir = tmp_path / "docs", tmp_path / "mdx"
+    section_config = _write_sidebar_sources(source_root)
+    monkeypatch.setattr(html_to_mdx_v10, "SECTION_CONFIG", section_config)
+    parsed, _ = cache_all_html_sidebar_structures(str(source_root), workers=1)
+
+    logger = logging.getLogger("html_to_mdx_v10.tests")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    for section in section_config:
+        (model_dir / section).mkdir(parents=True)
+        html_content = (source_root / section / "index.html").read_text(encoding="utf-8")
+        mdx_doc = html_to_mdx_v2.build_mdx_document(html_content, "index.html", logger, section)
+        html_to_mdx_v2.write_document_outputs(mdx_doc, str(model_dir), f"{section}/index", ["json"])
+    monkeypatch.setattr(html_to_mdx_v10, "parse_html_sidebar_links", lambda path: pytest.fail(f"{path} parsed"))
+    from_models, _ = cache_all_html_sidebar_structures(str(source_root), workers=1, model_dir=str(model_dir))
+    assert _structure_summary(from_models) == _structure_summary(parsed)
+
+
+@pytest.mark.parametrize("mode_options", [["--check"], ["--dry_run"], ["--diff_report", "changes.patch"]])
+def test_read_only_modes_do_not_write_the_sidebar_cache(tmp_path, monkeypatch, mode_options):
+    source_root, mdx_root = tmp_path / "docs", tmp_path / "mdx"
+    monkeypatch.setattr(html_to_mdx_v10, "SECTION_CONFIG", _write_sidebar_sources(source_root))
+    mdx_root.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.argv", ["html_to_mdx_v10.py", "--source_html_root", str(source_root), "--target_mdx_root",
+                                     str(mdx_root), "--log_file", str(tmp_path / "sidebar.log"), "--workers", "1",
+                                     *mode_options])
+    try:
+        html_to_mdx_v10.main()
+    except SystemExit:
+        pass
+    assert not (tmp_path / html_to_mdx_v10.DEFAULT_SIDEBAR_CACHE_FILE).exists()
+
+    cache_file = str(tmp_path / "sidebar_cache.json")
+    cache_all_html_sidebar_structures(str(source_root), workers=1, cache_file=cache_file, update_cache=False)
+    assert not os.path.exists(cache_file)
+
+
+def test_unchanged_front_matter_is_not_rewritten(tmp_path):
+    items = [NavItem(f"/ISBDM/docs/statements/{i}.html", f"statements/{i}", f"has element {i}", 3, i, "index.html")
+             for i in (1, 2)]
+    determine_hierarchy_properties(items)
+    nav_item_index = build_nav_item_index({"statements": items})
+    mdx_path = tmp_path / "statements" / "1.mdx"
+    mdx_path.parent.mkdir()
+    mdx_path.write_text("---\ntitle: Element\ncustomProps:\n  sidebar_prefix: 'old '\n---\n\nBody text.\n",
+                        encoding="utf-8")
+
+    def process(check=False):
+        return process_single_mdx_file(str(mdx_path), str(tmp_path), {}, nav_item_index, False, None, check)
+
+    assert process(check=True) == "changed"
+    assert "sidebar_prefix: 'old '" in mdx_path.read_text(encoding="utf-8")
+    assert process() == "changed"
+    written = mdx_path.read_text(encoding="utf-8")
+    assert "sidebar_label: has element 1" in written and written.endswith("\nBody text.\n")
+
+    os.utime(mdx_path, ns=(0, 0))
+    assert process() == "unchanged"
+    assert process(check=True) == "unchanged"
+    assert mdx_path.stat().st_mtime_ns == 0
+
+
+def test_failed_front_matter_write_is_an_error(tmp_path, monkeypatch):
+    items = [NavItem("/ISBDM/docs/statements/1.html", "statements/1", "has element 1", 3, 1, "index.html")]
+    determine_hierarchy_properties(items)
+    mdx_path = tmp_path / "statements" / "1.mdx"
+    mdx_path.parent.mkdir()
+    mdx_path.write_text("---\ntitle: Element\n---\n\nBody text.\n", encoding="utf-8")
+
+    def failing_write(*args):
+        raise PermissionError("read-only file system")
+    monkeypatch.setattr(html_to_mdx_v10.front_matter_io, "write_front_matter", failing_write)
+    assert process_single_mdx_file(str(mdx_path), str(tmp_path), {}, build_nav_item_index({"statements": items}),
+                                   False, None) == "error"
+
+
+def test_generate_sidebars_nests_sections(tmp_path):
+    def section(*entries):
+        items = [NavItem(f"/ISBDM/docs/{key}.html", key, label, level, position, "index.html")
+                 for position, (key, label, level) in enumerate(entries, 1)]
+        determine_hierarchy_properties(items)
+        return items
+    cached_structures = {
+        "root_index": section(("intro/index", "Introduction", 1), ("elements/index", "Elements", 1)),
+        "elements": section(("statements/index", "Statements", 2), ("notes/index", "Notes", 2)),
+        "statements": section(("statements/1025", "has manifestation statement", 3),
+                              ("statements/1026", "has statement of edition", 4),
+                              ("statements/1027", "has missing page", 3)),
+    }
+    for key in ("intro/index", "elements/index", "statements/index", "notes/index", "statements/1026"):
+        (tmp_path / f"{key}.mdx").parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / f"{key}.mdx").write_text("---\ntitle: x\n---\n", encoding="utf-8")
+    (tmp_path / "statements" / "1025.mdx").write_text("---\nid: manifestation-statement\n---\n", encoding="utf-8")
+
+    sidebars = generate_sidebars(cached_structures, str(tmp_path), {"intro/index": True, "elements/index": True})
+    intro, elements = sidebars["docs"]
+    assert intro == {"type": "doc", "id": "intro/index", "label": "Introduction",
+                     "className": html_to_mdx_v10.CLASS_MAIN_CATEGORY_PAGE, "customProps": {"sidebar_level": 1}}
+    statements, notes = elements["items"]
+    assert elements["link"] == {"type": "doc", "id": "elements/index"}
+    assert notes["type"] == "doc" and statements["link"]["id"] == "statements/index"
+    (manifestation_statement,) = statements["items"] # statements/1027 has no MDX file
+    assert manifestation_statement["link"] == {"type": "doc", "id": "statements/manifestation-statement"}
+    assert manifestation_statement["customProps"] == {"sidebar_level": 3, "sidebar_prefix": "      ├─ "}
+    assert [item["id"] for item in manifestation_statement["items"]] == ["statements/1026"]
+
+    sidebars_path = str(tmp_path / "sidebars.generated.json")
+    assert write_sidebars_file(sidebars_path, sidebars, check=True) == "changed"
+    assert write_sidebars_file(sidebars_path, sidebars) == "changed"
+    assert write_sidebars_file(sidebars_path, sidebars) == "unchanged"
+
+
+def test_diff_report_leaves_files_untouched(tmp_path):
+    items = [NavItem(f"/ISBDM/docs/notes/{i}.html", f"notes/{i}", f"has note {i}", 3, i, "index.html") for i in (1, 2)]
+    determine_hierarchy_properties(items)
+    nav_item_index = build_nav_item_index({"notes": items})
+    (tmp_path / "notes").mkdir()
+    mdx_paths = []
+    for name, content in (("1", "---\ntitle: Note\n---\nBody\n"),
+                          ("2", "---\n# generated\ntitle: Note 2\nsidebar_label: has note 2\nsidebar_level: 3\n"
+                                "sidebar_position: 2\ncustomProps:\n  sidebar_prefix: '│     └─ '\n---\nBody\n"),
+                          ("orphan", "No front matter\n")):
+        (tmp_path / "notes" / f"{name}.mdx").write_text(content, encoding="utf-8")
+        mdx_paths.append(str(tmp_path / "notes" / f"{name}.mdx"))
+
+    results = diff_mdx_files(mdx_paths, str(tmp_path), {}, nav_item_index, workers=1)
+    assert diff_mdx_files(mdx_paths, str(tmp_path), {}, nav_item_index, workers=2) == results
+    (rel_path, diff_text, error), unchanged, orphan = results
+    assert (rel_path, error) == ("notes/1.mdx", None)
+    assert diff_text.startswith("--- a/notes/1.mdx\n+++ b/notes/1.mdx\n")
+    assert "+sidebar_label: has note 1\n" in diff_text and "+  sidebar_prefix: '      ├─ '\n" in diff_text
+    assert unchanged == ("notes/2.mdx", "", None) and orphan == ("notes/orphan.mdx", "", None)
+
+    patch_path, json_path = str(tmp_path / "sidebar.patch"), str(tmp_path / "sidebar.json")
+    assert write_diff_report(patch_path, results)["changed"] == 1
+    with open(patch_path, encoding="utf-8") as f: assert f.read() == diff_text
+    write_diff_report(json_path, results)
+    with open(json_path, encoding="utf-8") as f: report = json.load(f)
+    assert report["counts"] == {"files": 3, "changed": 1, "unchanged": 2}
+    assert report["changed"] == [{"path": "notes/1.mdx", "diff": diff_text}]
+    assert (tmp_path / "notes" / "1.mdx").read_text(encoding="utf-8") == "---\ntitle: Note\n---\nBody\n"
+
+
+def test_benchmark_hierarchy_builder():
+    # Long runs of deeper items after a last sibling are the legacy builder's worst case.
+    levels = _synthetic_levels(random.Random(0), BENCH_ITEMS, max_depth=8)
+    items = _nav_items(levels)
+    started = time.perf_counter()
+    determine_hierarchy_properties(items)
+    elapsed = time.perf_counter() - started
+
+    legacy_items = _nav_items(levels)
+    started = time.perf_counter()
+    _legacy_determine_hierarchy_properties(legacy_items)
+    legacy_elapsed = time.perf_counter() - started
+
+    print(f"\n{BENCH_ITEMS} sidebar items: {elapsed:.3f}s (legacy two-pass builder {legacy_elapsed:.3f}s)")
+    assert _hierarchy(items) == _hierarchy(legacy_items)
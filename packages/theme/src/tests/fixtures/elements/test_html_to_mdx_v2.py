@@ -0,0 +1,388 @@
+import io
+import sys
+import os
+import gc
+import json
+import time
+import hashlib
+import logging
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("bs4")
+
+import html_to_mdx_v2
+from html_to_mdx_v2 import MdxWriter, convert_html_to_mdx, write_html_as_mdx
+from isbdm_synthetic_corpus import generate_isbdm_corpus
+from verify_mdx_conversion import build_report, get_text_from_div, get_text_from_mdx, normalize_text_flattened
+
+# Golden-output and throughput checks for html_to_mdx_v2.
+#   pytest test_html_to_mdx_v2.py                       -> golden + smoke tests
+#   UPDATE_GOLDEN=1 pytest ...                          -> rewrite golden/*.mdx from the current converter
+#   MDX_BENCH_PAGES=5000 MDX_BENCH_REPORT=bench.json pytest -k benchmark -s
+#                                                       -> larger benchmark, results written as JSON
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(FIXTURES_DIR, "golden")
+
+# (html path relative to this directory, html_subdirectory the page lives in on the ISBDM site)
+GOLDEN_FIXTURES = [
+    ("1025.html", "statements"),
+    (os.path.join("..", "1262.html"), "statements"),
+    (os.path.join("..", "1264.html"), "statements"),
+]
+
+# HTML text the goldens are known to drop, per page. The coverage test fails when anything else goes missing,
+# and when a gap listed here is fixed, so the list only ever shrinks with the converter.
+KNOWN_GOLDEN_GAPS = {
+    "1262.html": [
+        "✽ 1", # Mandatory and not-repeatable markers under the title
+        "has physical characteristic", # Single super-type written as a mapping, which ElementReference skips
+    ],
+    "1264.html": [
+        "✽",
+        "has category of manifestation",
+        # Shortcut paragraph
+        "has expression embodied in manifestation [Expression] has category of content The shortcut does not "
+        "identify the expression that is embodied in the manifestation.",
+        # Examples inside the additional information guidance (xampleBlockGuid)
+        'Examples has category of embodied content "three-dimensional form" [Full example: House at Pooh Corner '
+        '(1986; Methuen Children’s Books; volume) . The manifestation is a "pop-up book".]',
+        'Examples has note on expression associated with manifestation "Includes colour reproductions of '
+        'Magritte’s works and photographs mainly of the author and his works." [Full example: René Magritte '
+        '(2007; Taschen; volume) .] has note on expression associated with manifestation "Includes maps and '
+        'portraits." [Full example: Catalogue of shipwrecked books (2018; William Collins; volume; case binding) .]',
+        'Examples has extent of aggregated content "12 still images" [Full example: National parks (2015; Ziga '
+        'Media, LLC; flipchart) .] has extent of aggregated content "15 recorded songs" [Full example: Stax '
+        'uncovered! (2023; H Bauer Publishing Ltd; audio disc) .]',
+    ],
+}
+
+BENCH_PAGES = int(os.environ.get("MDX_BENCH_PAGES", "200"))
+BENCH_MEMORY_PAGES = int(os.environ.get("MDX_BENCH_MEMORY_PAGES", "25"))
+BENCH_REPORT = os.environ.get("MDX_BENCH_REPORT")
+
+
+def _available_parser_backends():
+    backends = ["html.parser"]
+    for module_name, backend in (("lxml", "lxml"), ("html5lib", "html5lib")):
+        try:
+            __import__(module_name)
+            backends.append(backend)
+        except ImportError:
+            pass
+    return backends
+
+
+PARSER_BACKENDS = _available_parser_backends()
+
+
+@pytest.fixture
+def quiet_logger():
+    logger = logging.getLogger("html_to_mdx_v2.tests")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("html_relpath,html_subdirectory", GOLDEN_FIXTURES,
+                         ids=[os.path.basename(p) for p, _ in GOLDEN_FIXTURES])
+def test_golden_output_is_byte_identical(html_relpath, html_subdirectory, quiet_logger):
+    html_path = os.path.join(FIXTURES_DIR, html_relpath)
+    html_filename = os.path.basename(html_path)
+    golden_path = os.path.join(GOLDEN_DIR, os.path.splitext(html_filename)[0] + ".mdx")
+
+    mdx_output = convert_html_to_mdx(_read(html_path), html_filename, quiet_logger, html_subdirectory)
+
+    if os.environ.get("UPDATE_GOLDEN"):
+        with open(golden_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(mdx_output)
+    with open(golden_path, 'r', encoding='utf-8', newline='') as f:
+        expected = f.read()
+    assert mdx_output == expected
+
+
+@pytest.mark.parametrize("html_relpath,html_subdirectory", GOLDEN_FIXTURES,
+                         ids=[os.path.basename(p) for p, _ in GOLDEN_FIXTURES])
+def test_golden_output_keeps_html_content(html_relpath, html_subdirectory):
+    html_path = os.path.join(FIXTURES_DIR, html_relpath)
+    html_filename = os.path.basename(html_path)
+    html_text = get_text_from_div(html_path, "selector", "div.col-md-7")
+    mdx_text = get_text_from_mdx(os.path.join(GOLDEN_DIR, os.path.splitext(html_filename)[0] + ".mdx"))
+
+    for gap in map(normalize_text_flattened, KNOWN_GOLDEN_GAPS.get(html_filename, [])):
+        assert gap in html_text and gap not in mdx_text, f"known gap no longer applies: {gap}"
+        html_text = html_text.replace(gap, "", 1)
+    ok, _, lines = build_report(html_text, mdx_text, html_filename, "golden MDX")
+    assert ok, "\n".join(lines)
+
+
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS[1:])
+def test_alternative_backends_match_golden(parser_backend, quiet_logger):
+    for html_relpath, html_subdirectory in GOLDEN_FIXTURES:
+        html_path = os.path.join(FIXTURES_DIR, html_relpath)
+        html_filename = os.path.basename(html_path)
+        expected = _read(os.path.join(GOLDEN_DIR, os.path.splitext(html_filename)[0] + ".mdx"))
+        assert convert_html_to_mdx(_read(html_path), html_filename, quiet_logger, html_subdirectory,
+                                   parser_backend=parser_backend) == expected, html_filename
+
+
+def test_streaming_sink_matches_string_api(quiet_logger):
+    html_content = _read(os.path.join(FIXTURES_DIR, "1025.html"))
+    sink = io.StringIO()
+    write_html_as_mdx(html_content, "1025.html", quiet_logger, sink, "statements")
+    assert sink.getvalue() == convert_html_to_mdx(html_content, "1025.html", quiet_logger, "statements")
+
+
+def test_mdx_writer_collapses_blank_lines():
+    sink = io.StringIO()
+    writer = MdxWriter(sink)
+    writer.extend(["", "# Title", "", "", "", "text", ""])
+    writer.blank_line()
+    writer.append("more")
+    assert sink.getvalue() == "\n# Title\n\ntext\n\nmore\n"
+
+
+def test_synthetic_corpus_is_deterministic():
+    first = [(sub, name, hashlib.sha256(html.encode()).hexdigest()) for sub, name, html in generate_isbdm_corpus(5, seed=7)]
+    second = [(sub, name, hashlib.sha256(html.encode()).hexdigest()) for sub, name, html in generate_isbdm_corpus(5, seed=7)]
+    assert first == second
+
+
+def test_synthetic_pages_convert_with_all_sections(quiet_logger):
+    for html_subdirectory, html_filename, html_content in generate_isbdm_corpus(20, seed=1):
+        mdx_output = convert_html_to_mdx(html_content, html_filename, quiet_logger, html_subdirectory)
+        assert mdx_output.startswith("---\n")
+        assert "## Element Reference" in mdx_output
+        assert "## Stipulations" in mdx_output
+        assert '<div className="guid">' in mdx_output
+
+
+def _convert_corpus(pages, parser_backend, logger):
+    digest = hashlib.sha256()
+    for html_subdirectory, html_filename, html_content in pages:
+        digest.update(convert_html_to_mdx(html_content, html_filename, logger, html_subdirectory,
+                                          parser_backend=parser_backend).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _run_backend_benchmark(pages, parser_backend, logger):
+    # Timing and memory are measured in separate passes: tracemalloc slows allocation-heavy parsing
+    # several times over, and peak memory per page does not need the whole corpus.
+    gc.collect()
+    started = time.perf_counter()
+    output_sha256 = _convert_corpus(pages, parser_backend, logger)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    _convert_corpus(pages[:BENCH_MEMORY_PAGES], parser_backend, logger)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"parser": parser_backend, "pages": len(pages), "seconds": round(elapsed, 3),
+            "pages_per_sec": round(len(pages) / elapsed, 1) if elapsed else None,
+            "peak_mib": round(peak_bytes / (1024 * 1024), 2), "output_sha256": output_sha256}
+
+
+def test_benchmark_throughput_and_peak_memory(quiet_logger):
+    pages = list(generate_isbdm_corpus(BENCH_PAGES, seed=0))
+    results = [_run_backend_benchmark(pages, parser_backend, quiet_logger) for parser_backend in PARSER_BACKENDS]
+
+    for result in results:
+        print(f"\n{result['parser']:>12}: {result['pages']} pages in {result['seconds']}s "
+              f"({result['pages_per_sec']} pages/sec, peak {result['peak_mib']} MiB)")
+    if BENCH_REPORT:
+        with open(BENCH_REPORT, 'w', encoding='utf-8') as f:
+            json.dump({"converter_hash": html_to_mdx_v2.compute_converter_hash(), "results": results}, f, indent=2)
+
+    # A faster backend is only useful if it produces the same MDX as the one the goldens were built with.
+    reference = next(r for r in results if r["parser"] == html_to_mdx_v2.DEFAULT_PARSER_BACKEND)
+    for result in results:
+        assert result["output_sha256"] == reference["output_sha256"], result["parser"]
+
+
+def _legacy_select_main_content_handler(element):
+    # The if/elif condition chain convert_html_to_mdx used before HandlerRegistry, without the handler bodies
+    element_classes = element.get('class', [])
+    if element.name == 'h4':
+        return html_to_mdx_v2.handle_heading
+    elif element.name == 'p' and not (element.parent and element.parent.has_attr('class') and
+                                      ('guid' in element.parent.get('class', []) or
+                                       'seeAlsoAdd' in element.parent.get('class', []) or
+                                       'seeAlso' in element.parent.get('class', []))):
+        return html_to_mdx_v2.handle_paragraph
+    elif element.has_attr('class') and 'guid' in element_classes:
+        return html_to_mdx_v2.handle_guid
+    elif element.has_attr('class') and 'seeAlsoAdd' in element_classes:
+        return html_to_mdx_v2.handle_see_also_add
+    elif element.has_attr('class') and 'seeAlso' in element_classes and 'seeAlsoAdd' not in element_classes:
+        return html_to_mdx_v2.handle_see_also
+    elif element.name == 'hr':
+        return html_to_mdx_v2.handle_rule
+    elif element.has_attr('class') and 'stip' in element_classes:
+        return html_to_mdx_v2.handle_stip
+    return None
+
+
+def _registry_candidates(element):
+    registry = html_to_mdx_v2.MAIN_CONTENT_HANDLERS
+    return registry.resolve(element, html_to_mdx_v2.get_class_set(element))
+
+
+def _best_per_node_seconds(select, nodes, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for node in nodes: select(node)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(nodes)
+
+
+def test_benchmark_handler_dispatch():
+    # Handler selection only: what the registry replaced is the per-node condition chain, not the handlers.
+    from bs4 import BeautifulSoup
+    html_contents = [_read(os.path.join(FIXTURES_DIR, "1025.html"))]
+    html_contents += [html_content for _, _, html_content in generate_isbdm_corpus(20, seed=0)]
+    nodes = []
+    for html_content in html_contents:
+        main_content_column = BeautifulSoup(html_content, html_to_mdx_v2.DEFAULT_PARSER_BACKEND).select_one("div.col-md-7")
+        # The nodes extract_mdx_document dispatches: the children of the div.row.m-1 content blocks
+        nodes.extend(main_content_column.select("div.row.m-1 > *"))
+
+    for node in nodes:
+        legacy_handler = _legacy_select_main_content_handler(node)
+        if legacy_handler is not None:
+            assert legacy_handler in [entry[1] for entry in _registry_candidates(node) if entry is not None]
+    legacy_seconds = _best_per_node_seconds(_legacy_select_main_content_handler, nodes)
+    registry_seconds = _best_per_node_seconds(_registry_candidates, nodes)
+    print(f"\nHandler dispatch over {len(nodes)} nodes: condition chain {legacy_seconds * 1e6:.2f} us/node, "
+          f"registry {registry_seconds * 1e6:.2f} us/node")
+
+
+def _write_source_tree(source_dir, page_count=2):
+    os.makedirs(source_dir, exist_ok=True)
+    for html_subdirectory, html_filename, html_content in generate_isbdm_corpus(page_count, seed=2):
+        with open(os.path.join(source_dir, html_filename), 'w', encoding='utf-8') as f: f.write(html_content)
+
+
+def _run_cli(tmp_path, monkeypatch, *options, expected_status=0):
+    root_logger = logging.getLogger()
+    saved_handlers, saved_level = root_logger.handlers[:], root_logger.level
+    monkeypatch.setattr(sys, 'argv', ["html_to_mdx_v2.py", str(tmp_path / "html"), str(tmp_path / "mdx"),
+                                      "--log_file", str(tmp_path / "conversion.log"),
+                                      "--diagnostics_report", str(tmp_path / "diagnostics.json"), *options])
+    try:
+        with pytest.raises(SystemExit) as exit_info:
+            html_to_mdx_v2.main()
+        assert exit_info.value.code == expected_status
+    finally:
+        root_logger.handlers[:], root_logger.level = saved_handlers, saved_level
+    with open(tmp_path / "mdx" / html_to_mdx_v2.MANIFEST_FILENAME, encoding='utf-8') as f:
+        return json.load(f)["files"]
+
+
+def _conversion_options(tmp_path, **overrides):
+    options = {"dest_dir": str(tmp_path / "mdx"), "cache_dir": str(tmp_path / "cache"),
+               "parser": html_to_mdx_v2.DEFAULT_PARSER_BACKEND, "output_formats": ["mdx"],
+               "converter_hash": html_to_mdx_v2.compute_converter_hash(), "max_samples_per_rule": 5,
+               "memory_limit_bytes": None}
+    options.update(overrides)
+    return options
+
+
+def test_known_source_hash_with_cached_document_never_reads_the_source(tmp_path, monkeypatch):
+    _write_source_tree(tmp_path / "html", 1)
+    (rel_source, entry), = _run_cli(tmp_path, monkeypatch, "--cache_dir", str(tmp_path / "cache")).items()
+    html_path = str(tmp_path / "html" / rel_source)
+
+    opened_paths = []
+    def recording_open(file, *args, **kwargs):
+        opened_paths.append(os.fspath(file))
+        return open(file, *args, **kwargs)
+    monkeypatch.setattr(html_to_mdx_v2, "open", recording_open, raising=False)
+    task = (html_path, rel_source, "", os.path.splitext(rel_source)[0], entry["source_hash"])
+    result = html_to_mdx_v2.convert_html_file(task, _conversion_options(tmp_path))
+    assert result["manifest_entry"]["source_hash"] == entry["source_hash"]
+    assert html_path not in opened_paths
+    result = html_to_mdx_v2.convert_html_file(task[:-1] + (None,), _conversion_options(tmp_path))
+    assert opened_paths.count(html_path) == 1 and result["manifest_entry"] == entry
+
+
+def test_switching_parser_backend_invalidates_manifest_and_cache(tmp_path, monkeypatch):
+    other_backends = [backend for backend in PARSER_BACKENDS if backend != html_to_mdx_v2.DEFAULT_PARSER_BACKEND]
+    if not other_backends: pytest.skip("only one parser backend installed")
+    _write_source_tree(tmp_path / "html", 1)
+    cache_options = ("--incremental", "--cache_dir", str(tmp_path / "cache"))
+    (rel_source, entry), = _run_cli(tmp_path, monkeypatch, *cache_options).items()
+    assert entry["parser"] == html_to_mdx_v2.DEFAULT_PARSER_BACKEND
+
+    manifest_files = _run_cli(tmp_path, monkeypatch, *cache_options, "--parser", other_backends[0])
+    assert manifest_files[rel_source]["parser"] == other_backends[0]
+    assert html_to_mdx_v2.load_cached_document(str(tmp_path / "cache"), rel_source, entry["source_hash"],
+                                               html_to_mdx_v2.compute_converter_hash(), other_backends[0]) is not None
+    with open(tmp_path / "diagnostics.json", encoding='utf-8') as f:
+        assert json.load(f)["pages_analyzed"] == 1 # Re-parsed, not served from the other backend's cache
+
+
+def test_page_over_memory_limit_is_written_and_fails_the_run(tmp_path, monkeypatch):
+    _write_source_tree(tmp_path / "html", 1)
+    (rel_source, entry), = _run_cli(tmp_path, monkeypatch, "--incremental", "--memory_limit_mb", "0.001",
+                                    expected_status=1).items()
+    assert os.path.exists(tmp_path / "mdx" / entry["outputs"][0])
+    with open(tmp_path / "diagnostics.json", encoding='utf-8') as f:
+        assert json.load(f)["rules"]["memory-limit-exceeded"]["files"] == 1
+
+    _run_cli(tmp_path, monkeypatch, "--incremental", "--memory_limit_mb", "0.001", expected_status=1)
+    with open(tmp_path / "diagnostics.json", encoding='utf-8') as f:
+        assert json.load(f)["pages_analyzed"] == 0 # Skipped as unchanged, but its recorded peak still fails the run
+    _run_cli(tmp_path, monkeypatch, "--incremental", "--memory_limit_mb", "1000")
+
+
+def test_output_formats_are_emitted_from_one_model(tmp_path, quiet_logger):
+    html_path = os.path.join(FIXTURES_DIR, "1025.html")
+    mdx_doc = html_to_mdx_v2.build_mdx_document(_read(html_path), "1025.html", quiet_logger, "statements")
+    output_dir = tmp_path / "statements"
+    output_dir.mkdir()
+    rel_outputs = html_to_mdx_v2.write_document_outputs(mdx_doc, str(tmp_path), "statements/1025",
+                                                        list(html_to_mdx_v2.OUTPUT_FORMATS))
+    assert rel_outputs == ["statements/1025.mdx", "statements/1025.txt", "statements/1025.ast.json",
+                           "statements/1025.links.json"]
+
+    assert _read(output_dir / "1025.mdx") == _read(os.path.join(GOLDEN_DIR, "1025.mdx"))
+    # The verifier can take this text instead of parsing the page again
+    assert normalize_text_flattened(_read(output_dir / "1025.txt")) == \
+        get_text_from_div(html_path, "selector", "div.col-md-7")
+    with open(output_dir / "1025.ast.json", encoding='utf-8') as f:
+        ast = json.load(f)
+    assert ast["frontmatter"]["title"] == "has manifestation statement"
+    assert [section["heading"] for section in ast["sections"]][1] == "Additional information"
+    assert sum(len(section["blocks"]) for section in ast["sections"]) == len(mdx_doc.blocks)
+    assert {"href": "/ISBDM/docs/statements/1025.html", "label": "has manifestation statement", "position": 4,
+            "level": 1} in ast["navigation"]
+    with open(output_dir / "1025.links.json", encoding='utf-8') as f:
+        links = json.load(f)
+    assert links == ast["links"] and links[0] == {"href": "/ISBDM/docs/statements/1029.html",
+                                                  "text": "has manifestation statement of edition",
+                                                  "class": "linkMenuElement"}
+
+
+def test_document_cache_round_trip(tmp_path, quiet_logger):
+    mdx_doc = html_to_mdx_v2.build_mdx_document(_read(os.path.join(FIXTURES_DIR, "1025.html")), "1025.html",
+                                                quiet_logger, "statements")
+    restored = html_to_mdx_v2.MdxDocument.from_dict(json.loads(json.dumps(mdx_doc.to_dict())))
+    assert restored.to_dict() == mdx_doc.to_dict() and restored.to_mdx() == mdx_doc.to_mdx()
+
+    cache_dir, keys = str(tmp_path / "cache"), ("source-hash", "converter-hash", "html.parser")
+    html_to_mdx_v2.save_cached_document(cache_dir, "statements/1025.html", *keys, mdx_doc)
+    cached = html_to_mdx_v2.load_cached_document(cache_dir, "statements/1025.html", *keys)
+    assert cached.to_dict() == mdx_doc.to_dict() and cached.to_ast() == mdx_doc.to_ast()
+    for stale_keys in (("other", *keys[1:]), (keys[0], "other", keys[2]), (*keys[:2], "lxml")):
+        assert html_to_mdx_v2.load_cached_document(cache_dir, "statements/1025.html", *stale_keys) is None
+    assert html_to_mdx_v2.load_cached_document(cache_dir, "statements/1262.html", *keys) is None
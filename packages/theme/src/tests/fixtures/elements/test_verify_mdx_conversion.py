@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+pytest.importorskip("bs4")
+
+import verify_mdx_conversion
+from verify_mdx_conversion import (build_report, compare_and_report, find_file_pairs, find_first_missing_index,
+                                   find_missing_spans, get_mdx_rendered_text, get_text_from_div, get_text_from_mdx,
+                                   group_missing_spans, normalize_text_flattened, verify_pairs, write_json_report,
+                                   write_junit_report, summarize_results)
+
+# Verification engine checks for verify_mdx_conversion.
+#   pytest test_verify_mdx_conversion.py -s      -> also prints the large-page timing
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _is_subsequence(a, b):
+    remaining = iter(b)
+    return all(char in remaining for char in a)
+
+
+def test_missing_spans_are_minimal():
+    rng = random.Random(0)
+    for _ in range(2000):
+        html_text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        mdx_text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        spans = find_missing_spans(html_text, mdx_text, max_edits=10 ** 6)
+        missing = {i for html_start, html_end, _ in spans for i in range(html_start, html_end)}
+        assert len(missing) == len(html_text) - _lcs_length(html_text, mdx_text), (html_text, mdx_text)
+        kept = "".join(char for i, char in enumerate(html_text) if i not in missing)
+        assert _is_subsequence(kept, mdx_text)
+        assert (find_first_missing_index(html_text, mdx_text) == -1) == _is_subsequence(html_text, mdx_text)
+
+
+def test_report_accepts_extra_mdx_characters(capsys):
+    assert compare_and_report("hasmanifestation", "#has**manifestation**", "1025.html", "1025.mdx") is True
+    assert "OK" in capsys.readouterr().out
+    assert compare_and_report("hasmanifestationstatement", "hasstatement", "1025.html", "1025.mdx") is False
+    out = capsys.readouterr().out
+    assert "missing 13 character(s)" in out and "[manifestation]" in out
+    assert compare_and_report(None, "x", "1025.html", "1025.mdx") is None
+
+
+def test_diff_budget_and_grouping():
+    assert find_missing_spans("abcdefgh", "", max_edits=4) == [(0, 8, 0)] # No diff needed
+    assert find_missing_spans("abcdefgh", "hgfedcba", max_edits=4) is None
+    assert group_missing_spans([(0, 2, 0), (4, 5, 1), (40, 41, 30)]) == [(0, 5, 0, 3), (40, 41, 30, 1)]
+
+
+def test_large_page_verification_is_fast():
+    rng = random.Random(1)
+    html_text = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(200_000))
+    mdx_text = html_text[:1000] + "<x>" + html_text[1010:150_000] + html_text[150_040:]
+    started = time.perf_counter()
+    assert find_first_missing_index(html_text, html_text[:5000] + "**" + html_text[5000:]) == -1
+    spans = find_missing_spans(html_text, mdx_text)
+    elapsed = time.perf_counter() - started
+    print(f"\n200k-character page: subsequence check + missing-span diff in {elapsed:.3f}s")
+    assert sum(group[3] for group in group_missing_spans(spans)) == 50
+
+
+def _page(text):
+    return f"<html><body><div class='col-md-7'><h1>{text}</h1></div></body></html>"
+
+
+def _converted_tree(tmp_path):
+    html_root, mdx_root = tmp_path / "html", tmp_path / "mdx"
+    for rel_base, html_text, mdx_text in [("1025", "has title", "# has title"),
+                                          ("statements/1026", "has statement", "# has"),
+                                          ("statements/1027", "has note", None)]:
+        (html_root / rel_base).parent.mkdir(parents=True, exist_ok=True)
+        (html_root / f"{rel_base}.html").write_text(_page(html_text), encoding='utf-8')
+        if mdx_text is not None:
+            (mdx_root / rel_base).parent.mkdir(parents=True, exist_ok=True)
+            (mdx_root / f"{rel_base}.mdx").write_text(f"---\ntitle: x\n---\n{mdx_text}\n", encoding='utf-8')
+    return str(html_root), str(mdx_root)
+
+
+def test_recursive_pairing_and_batch_reports(tmp_path):
+    html_root, mdx_root = _converted_tree(tmp_path)
+    assert [pair[0][len(html_root):] for pair in find_file_pairs(html_root, mdx_root)] == ["/1025.html"]
+    pairs = list(find_file_pairs(html_root, mdx_root, recursive=True))
+    assert [pair[1][len(mdx_root):] for pair in pairs] == ["/1025.mdx", "/statements/1026.mdx", "/statements/1027.mdx"]
+
+    for workers in (1, 2):
+        results = verify_pairs(pairs, "selector", "div.col-md-7", workers)
+        assert [result["status"] for result in results] == ["ok", "mismatch", "missing_mdx"]
+    assert results[1]["missing_chars"] == len("statement")
+    assert [result["status"] for result in verify_pairs(pairs, "selector", "div.col-md-7", fail_fast=True)] == ["ok", "mismatch"]
+
+    summary = summarize_results(results)
+    write_json_report(str(tmp_path / "report.json"), results, summary)
+    write_junit_report(str(tmp_path / "report.xml"), results, summary, html_root)
+    with open(tmp_path / "report.json", encoding='utf-8') as f:
+        assert json.load(f)["summary"]["mismatch"] == 1
+    suite = ET.parse(tmp_path / "report.xml").getroot()
+    assert (suite.get("tests"), suite.get("failures"), suite.get("skipped")) == ("3", "1", "1")
+    assert [case.get("name") for case in suite.iter("testcase") if case.find("failure") is not None] == ["statements/1026.html"]
+
+
+
+def test_model_text_replaces_the_html_parse(tmp_path, monkeypatch):
+    html_root, mdx_root = _converted_tree(tmp_path)
+    pairs = list(find_file_pairs(html_root, mdx_root, recursive=True))
+    # The converter's text output for 1026 only holds what the MDX kept; 1025 has none and is parsed
+    (tmp_path / "mdx" / "statements" / "1026.txt").write_text("has\n", encoding='utf-8')
+    results = verify_pairs(pairs, "selector", "div.col-md-7", model_text=True)
+    assert [result["status"] for result in results] == ["ok", "ok", "missing_mdx"]
+    assert [result["html_text_source"] for result in results] == [pairs[0][0], str(tmp_path / "mdx" / "statements" / "1026.txt"), None]
+
+    monkeypatch.setattr(verify_mdx_conversion, "get_text_from_div", lambda *args: pytest.fail("HTML parsed"))
+    assert verify_pairs(pairs[1:2], "selector", "div.col-md-7", model_text=True)[0]["status"] == "ok"
+
+
+MDX_SAMPLE = """---
+title: has note
+---
+import { InLink } from '@site/src/components/global/InLink';
+
+# Heading *em* and **strong** with snake_case_name
+> quote with `a<b>c` code and a < b, 1 * 2
+  - item <InLink href="/docs/a>b" data={{x: 1}}>link</InLink> [text *x*](http://y) ![alt](i.png)
+  1. ordered &amp; &#8212; \\*literal\\*
+<div className="stip">
+  <Mandatory />
+  | Property | Value |
+  |:---------|:------|
+  | has note | "a \\| b" |
+</div>
+{/* comment */}<!-- html comment -->
+***
+```js
+<Code> {kept}
+```
+*[Full example: <InLink href="x">Title</InLink>.]*
+"""
+
+
+def test_mdx_rendered_text_drops_markup():
+    assert get_mdx_rendered_text(MDX_SAMPLE).split() == [
+        "Heading", "em", "and", "strong", "with", "snake_case_name",
+        "quote", "with", "a<b>c", "code", "and", "a", "<", "b,", "1", "*", "2",
+        "item", "link", "text", "x",
+        "ordered", "&", "\u2014", "*literal*",
+        "\u273d", "Property", "Value", "has", "note", '"a', "|", 'b"',
+        "<Code>", "{kept}",
+        "[Full", "example:", "Title.]"]
+    assert get_mdx_rendered_text("---\ntitle: x\n---\r\n# Title\r\n") == "Title\n"
+
+
+def test_golden_mdx_with_element_reference_verifies():
+    # The element reference table is rendered from front matter by <ElementReference />
+    html_text = get_text_from_div(os.path.join(FIXTURES_DIR, "1025.html"), "selector", "div.col-md-7")
+    ok, missing_chars, lines = build_report(html_text, get_text_from_mdx(os.path.join(FIXTURES_DIR, "golden", "1025.mdx")),
+                                            "1025.html", "1025.mdx")
+    assert ok and missing_chars == 0, "\n".join(lines)
+
+
+def test_element_reference_renders_front_matter_rows():
+    mdx = ('---\nRDF:\n  definition: Relates a work.\n  scopeNote: ""\n  domain: Work\n  range: Literal\n'
+           '  elementSubType:\n    - label: has sub\n  elementSuperType:\n    uri: P1\n    label: has super\n---\n'
+           '## Element Reference\n<ElementReference frontMatter={frontMatter} />\n')
+    assert normalize_text_flattened(get_mdx_rendered_text(mdx)) == normalize_text_flattened(
+        "Element Reference Definition Relates a work. Scope note Domain Work Range Literal "
+        "Element sub-type has sub Element super-type") # A single mapping renders no link, as in the component
@@ -1,7 +1,18 @@
+import io
 import os
+import html
 import re
+import sys
+import json
+import time
+import argparse
+import contextlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from bs4 import BeautifulSoup
-import difflib # For showing differences
+import yaml # PyYAML
+
+from front_matter_io import load_yaml
 
 def normalize_text_flattened(text):
     """
@@ -46,32 +57,152 @@ def get_text_from_div(html_file_path, div_identifier_type, div_identifier_value)
         print(f"Error processing HTML file {html_file_path}: {e}")
         return None
 
+MODEL_TEXT_SUFFIX = ".txt" # html_to_mdx_v2's "text" output format
+
+def get_text_from_model(text_file_path):
+    """
+    Reads the main-column text html_to_mdx_v2 saved from its parse of the page (--formats text), flattened
+    and normalized like get_text_from_div, so the HTML is not parsed a second time.
+    """
+    try:
+        with open(text_file_path, 'r', encoding='utf-8') as f:
+            return normalize_text_flattened(f.read())
+    except Exception as e:
+        print(f"Error reading model text file {text_file_path}: {e}")
+        return None
+
+# --- MDX text extraction ---
+# get_text_from_div compares what the browser renders, so the MDX side is reduced to its rendered text too:
+# front matter, ESM import/export lines, JSX tags with their attributes, {expressions}, comments, Markdown
+# markers and table syntax are dropped; text inside components, link text, code and entities are kept.
+# Block markers are removed with one multiline pass, then an inline tokenizer yields the text between tokens.
+
+FRONT_MATTER_PATTERN = re.compile(r'---[ \t]*\n(?P<yaml>(?:.*?\n)??)---[^\n]*\n?', re.DOTALL)
+FENCE_PATTERN = re.compile(r'^[ \t]*(`{3,}|~{3,})[^\n]*\n(.*?)(?:^[ \t]*\1[ \t]*$|\Z)', re.MULTILINE | re.DOTALL)
+BLOCK_MARKUP_PATTERN = re.compile(r"""
+      ^(?:import|export)[ \t][^\n]*(?:\n[ \t}][^\n]*)*                              # ESM, with indented continuation lines
+    | ^[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+\|?[ \t]*$                  # table delimiter row
+    | ^[ \t]*(?:(?:-[ \t]*){3,}|(?:\*[ \t]*){3,}|(?:_[ \t]*){3,}|=+[ \t]*)$            # thematic break, setext underline
+    | ^[ \t]*(?:>[ \t]?)*(?:\#{1,6}|[-*+]|\d{1,9}[.)])(?:[ \t]+|$)                      # heading and list markers
+    | ^[ \t]*(?:>[ \t]?)+                                                            # blockquote markers
+""", re.MULTILINE | re.VERBOSE)
+# Self-closing components that render fixed text of their own (the default props' text)
+COMPONENT_RENDERED_TEXT = {"Mandatory": "✽"}
+# The Attribute:Value rows ElementReference renders from frontMatter.RDF, in its order: (label, RDF key, always shown).
+# The component hides empty sub-type and super-type rows, which the HTML always shows; their labels are
+# chrome rather than content, so they are listed either way and only a lost value is reported.
+ELEMENT_REFERENCE_ROWS = (
+    ("Definition", "definition", True),
+    ("Scope note", "scopeNote", True),
+    ("Domain", "domain", True),
+    ("Range", "range", True),
+    ("Element sub-type", "elementSubType", True),
+    ("Element super-type", "elementSuperType", True),
+    ("Type", "type", False),
+)
+TABLE_ROW_PATTERN = re.compile(r'^[ \t]*\|[^\n]*', re.MULTILINE)
+TABLE_PIPE_PATTERN = re.compile(r'(?<!\\)\|')
+# Every character belongs to a token; plain text is consumed in runs, so the scan stays in C between markup
+INLINE_TOKEN_PATTERN = re.compile(r"""
+      (?P<text>[^<{!\[`\\&*_~]+)
+    | (?P<markup><!--.*?-->                                                         # comment
+        | </?(?:(?P<tag_name>[A-Za-z][\w.-]*(?::[\w-]+)?)(?:\s+(?:[^"'{}<>]|"[^"]*"|'[^']*'|\{(?:[^{}]|\{[^{}]*\})*\})*)?\s*/?)?>  # JSX tag
+        | \{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\}                                    # expression
+        | !\[[^\]\n]*\]\([^)\n]*\))                                                 # image
+    | \[(?P<link_text>(?:[^\[\]\n]|\[[^\[\]\n]*\])*)\]\([^)\n]*\)
+    | (?P<ticks>`+)(?P<code>[^\n]+?)(?P=ticks)
+    | \\(?P<escaped>[!-/:-@\[-`{-~])
+    | (?P<entity>&(?:\#\d+|\#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);)
+    | (?P<delimiter>\*+|_+|~~)                                                      # emphasis, if flanking
+    | (?P<literal>.)
+""", re.DOTALL | re.VERBOSE)
+
+def _strip_table_pipes(row_match):
+    return TABLE_PIPE_PATTERN.sub(' ', row_match.group())
+
+def _is_emphasis_delimiter(text, start, end):
+    before = text[start - 1] if start else ' '
+    after = text[end] if end < len(text) else ' '
+    if before.isspace() and after.isspace():
+        return False
+    return text[start] != '_' or not (before.isalnum() and after.isalnum()) # snake_case stays
+
+def get_element_reference_text(front_matter):
+    """
+    Returns the text ElementReference renders in its Attribute:Value table for front_matter, with the
+    labels; sub-type and super-type rows list the linked element labels.
+    """
+    rdf = front_matter.get("RDF") if isinstance(front_matter, dict) else None
+    if not isinstance(rdf, dict):
+        rdf = {}
+    parts = []
+    for label, key, always_shown in ELEMENT_REFERENCE_ROWS:
+        value = rdf.get(key)
+        if key in ("elementSubType", "elementSuperType"):
+            # Like the component, anything but a list of {uri, url, label} renders no links
+            value = value if isinstance(value, list) else []
+            value = " ".join(str(item.get("label") or "") for item in value if isinstance(item, dict))
+        value = "" if value is None else str(value)
+        if always_shown or value:
+            parts.append(f"{label} {value}")
+    return " ".join(parts)
+
+def _component_rendered_text(front_matter):
+    return {**COMPONENT_RENDERED_TEXT, "ElementReference": get_element_reference_text(front_matter)}
+
+def _iter_inline_text(text, component_text=COMPONENT_RENDERED_TEXT):
+    for token in INLINE_TOKEN_PATTERN.finditer(text):
+        kind = token.lastgroup
+        if kind == 'text' or kind == 'literal':
+            yield token.group()
+        elif kind == 'markup':
+            rendered_text = component_text.get(token.group('tag_name'))
+            if rendered_text and token.group().endswith('/>'):
+                yield rendered_text
+        elif kind == 'link_text':
+            yield from _iter_inline_text(token.group('link_text'), component_text)
+        elif kind == 'code' or kind == 'escaped':
+            yield token.group(kind)
+        elif kind == 'entity':
+            yield html.unescape(token.group())
+        elif kind == 'delimiter' and not _is_emphasis_delimiter(text, token.start(), token.end()):
+            yield token.group()
+
+def _iter_markdown_text(text, component_text):
+    text = BLOCK_MARKUP_PATTERN.sub('', text)
+    yield from _iter_inline_text(TABLE_ROW_PATTERN.sub(_strip_table_pipes, text), component_text)
+
+def iter_mdx_text(mdx_content):
+    """
+    Yields the rendered text of an MDX document in order, as chunks. Fenced code is yielded verbatim;
+    components that render from the front matter (ElementReference) are rendered from the parsed YAML.
+    """
+    mdx_content = mdx_content.replace('\r\n', '\n')
+    front_matter_match = FRONT_MATTER_PATTERN.match(mdx_content)
+    position = front_matter_match.end() if front_matter_match else 0
+    front_matter = {}
+    if front_matter_match:
+        try:
+            front_matter = load_yaml(front_matter_match.group('yaml')) or {}
+        except yaml.YAMLError:
+            pass # Unparseable front matter renders nothing, as the site build would fail on it anyway
+    component_text = _component_rendered_text(front_matter)
+    for fence_match in FENCE_PATTERN.finditer(mdx_content, position):
+        yield from _iter_markdown_text(mdx_content[position:fence_match.start()], component_text)
+        yield fence_match.group(2)
+        position = fence_match.end()
+    yield from _iter_markdown_text(mdx_content[position:], component_text)
+
+def get_mdx_rendered_text(mdx_content):
+    return "".join(iter_mdx_text(mdx_content))
+
 def get_text_from_mdx(mdx_file_path):
     """
-    Reads and returns flattened, normalized text content from an MDX file.
+    Reads an MDX file and returns its rendered text (see iter_mdx_text), flattened and normalized.
     """
     try:
         with open(mdx_file_path, 'r', encoding='utf-8') as f:
-            # For MDX, we might want to be careful about frontmatter or JSX elements
-            # if they shouldn't be part of the textual comparison.
-            # A simple approach is to read all and normalize.
-            # If MDX has non-content elements that HTML doesn't, this might need refinement.
-            # For now, assume all text in MDX (after stripping JSX/frontmatter if any) is relevant.
-            # This naive version reads everything.
-            content = f.read()
-
-            # Basic attempt to strip common frontmatter (--- ... ---)
-            if content.startswith("---"):
-                end_frontmatter = content.find("---", 3)
-                if end_frontmatter != -1:
-                    content = content[end_frontmatter + 3:]
-
-            # Basic attempt to strip JSX tags (this is very naive and might break valid text)
-            # A more robust solution would involve a proper MDX parser or more sophisticated regex.
-            # For example, <Component>text</Component> -> text
-            # content = re.sub(r'<[^>]+>', '', content) # This is too aggressive as it removes HTML-like text
-
-            return normalize_text_flattened(content)
+            return normalize_text_flattened(get_mdx_rendered_text(f.read()))
     except FileNotFoundError:
         # This will be handled by the main loop, but good to have a local print for debugging
         # print(f"Error: MDX file not found at {mdx_file_path}")
@@ -80,88 +211,316 @@ def get_text_from_mdx(mdx_file_path):
         print(f"Error reading MDX file {mdx_file_path}: {e}")
         return None
 
-def compare_and_report(html_text_normalized, mdx_text_normalized, html_filename, mdx_filename):
+# --- Verification engine ---
+# The rule is that the MDX must not miss any character of the HTML; extra MDX characters are allowed.
+# After flattening, that is a subsequence test, done greedily in linear time. Only when it fails does a
+# Myers diff (linear space, bounded edit count) locate every missing span for the report.
+
+DEFAULT_MAX_DIFF_EDITS = 2000 # Myers cost grows with the edit count; beyond this only the first miss is reported
+REPORT_CONTEXT_CHARS = 20
+REPORT_SPAN_CHARS = 80
+REPORT_MERGE_GAP_CHARS = 8 # Missing spans this close are reported as one (minimal diffs match stray single characters)
+
+def find_first_missing_index(html_text, mdx_text):
     """
-    Compares the normalized HTML div text with normalized MDX text.
-    Reports if the MDX is missing any characters from the HTML.
+    Returns the index of the first HTML character that cannot be matched, in order, in the MDX text
+    (greedy matching is optimal for subsequences), or -1 when the HTML text is a subsequence of it.
     """
-    if html_text_normalized is None or mdx_text_normalized is None:
-        # Errors would have been printed by the functions fetching the text
+    if html_text == mdx_text or html_text in mdx_text:
+        return -1
+    mdx_position = 0
+    for html_index, char in enumerate(html_text):
+        mdx_position = mdx_text.find(char, mdx_position)
+        if mdx_position == -1:
+            return html_index
+        mdx_position += 1
+    return -1
+
+def _match_length(a, a_pos, a_end, b, b_pos, b_end):
+    """Length of the common prefix of a[a_pos:a_end] and b[b_pos:b_end], galloping over slice compares."""
+    limit = min(a_end - a_pos, b_end - b_pos)
+    if limit <= 0 or a[a_pos] != b[b_pos]:
+        return 0
+    matched, probe = 1, 2
+    while matched < limit:
+        probe = min(limit, matched * 2)
+        if a[a_pos + matched:a_pos + probe] != b[b_pos + matched:b_pos + probe]:
+            break
+        matched = probe
+    else:
+        return matched
+    low, high = matched, probe - 1 # a[..matched] matches; a[..probe] does not
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[a_pos + low:a_pos + middle] == b[b_pos + low:b_pos + middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+class DiffBudgetExceeded(Exception):
+    pass
+
+def _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi, max_edits):
+    """Myers' middle snake of a[a_lo:a_hi] vs b[b_lo:b_hi]: returns (x_start, y_start, x_end, y_end), absolute."""
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta % 2 == 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    forward = [0] * (2 * max_d + 3)  # furthest x on each diagonal k = x - y
+    backward = [0] * (2 * max_d + 3) # same, walking the reversed strings
+    for d in range(max_d + 1):
+        if 2 * d > max_edits:
+            raise DiffBudgetExceeded()
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            snake = _match_length(a, a_lo + x, a_hi, b, b_lo + y, b_hi)
+            x, y = x + snake, y + snake
+            forward[offset + k] = x
+            reverse_k = delta - k
+            if odd and -(d - 1) <= reverse_k <= d - 1 and x + backward[offset + reverse_k] >= n:
+                return a_lo + x_start, b_lo + y_start, a_lo + x, b_lo + y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_hi - x - 1] == b[b_hi - y - 1]:
+                x, y = x + 1, y + 1
+            backward[offset + k] = x
+            forward_k = delta - k
+            if not odd and -d <= forward_k <= d and x + forward[offset + forward_k] >= n:
+                return a_hi - x, b_hi - y, a_hi - x_start, b_hi - y_start
+    raise AssertionError("middle snake not found")
+
+def _diff_into(a, a_lo, a_hi, b, b_lo, b_hi, max_edits, deletions):
+    common = _match_length(a, a_lo, a_hi, b, b_lo, b_hi)
+    a_lo, b_lo = a_lo + common, b_lo + common
+    while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+        a_hi, b_hi = a_hi - 1, b_hi - 1
+    if a_lo == a_hi:
+        return
+    if b_lo == b_hi:
+        deletions.append((a_lo, a_hi, b_lo))
         return
+    x_start, y_start, x_end, y_end = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi, max_edits)
+    _diff_into(a, a_lo, x_start, b, b_lo, y_start, max_edits, deletions)
+    _diff_into(a, x_end, a_hi, b, y_end, b_hi, max_edits, deletions)
+
+def find_missing_spans(html_text, mdx_text, max_edits=DEFAULT_MAX_DIFF_EDITS):
+    """
+    Returns [(html_start, html_end, mdx_position)] for every HTML span a minimal diff leaves unmatched in
+    the MDX text, merged where adjacent, or None if the diff needs more than max_edits edits.
+    """
+    deletions = []
+    try:
+        _diff_into(html_text, 0, len(html_text), mdx_text, 0, len(mdx_text), max_edits, deletions)
+    except DiffBudgetExceeded:
+        return None
+    spans = []
+    for html_start, html_end, mdx_position in sorted(deletions):
+        if spans and spans[-1][1] == html_start and spans[-1][2] == mdx_position:
+            spans[-1] = (spans[-1][0], html_end, mdx_position)
+        else:
+            spans.append((html_start, html_end, mdx_position))
+    return spans
+
+def group_missing_spans(spans, max_gap=REPORT_MERGE_GAP_CHARS):
+    """Merges spans separated by at most max_gap HTML characters; returns [(html_start, html_end, mdx_position, missing)]."""
+    groups = []
+    for html_start, html_end, mdx_position in spans:
+        if groups and html_start - groups[-1][1] <= max_gap:
+            group_start, _, group_mdx_position, missing = groups[-1]
+            groups[-1] = (group_start, html_end, group_mdx_position, missing + html_end - html_start)
+        else:
+            groups.append((html_start, html_end, mdx_position, html_end - html_start))
+    return groups
+
+def _excerpt(text, start, end, limit=REPORT_SPAN_CHARS):
+    return text[start:end] if end - start <= limit else f"{text[start:start + limit]}...(+{end - start - limit})"
 
-    # The core requirement: "The mdx shouldn't be missing any characters present in the html."
-    # This means if we iterate through characters of html_text_normalized,
-    # they should effectively be found in mdx_text_normalized in the same order.
-    # If both are identical after normalization, then MDX is not missing anything.
-    # If MDX has *extra* characters, that's "ok" by the stated rule,
-    # but if the goal is a faithful conversion, they should be identical.
+def build_report(html_text_normalized, mdx_text_normalized, html_filename, mdx_filename, max_edits=DEFAULT_MAX_DIFF_EDITS):
+    """
+    Checks that the MDX is not missing any characters from the HTML. Returns (ok, missing character count
+    or None when the diff was cut short, report lines listing every missing span with context).
+    """
+    first_missing = find_first_missing_index(html_text_normalized, mdx_text_normalized)
+    if first_missing == -1:
+        extra = len(mdx_text_normalized) - len(html_text_normalized)
+        return True, 0, [f"OK: Content matches for {html_filename} and {mdx_filename}" + (f" (MDX has {extra} extra characters)" if extra else "")]
+
+    lines = [f"\n--- MISMATCH detected between {html_filename} and {mdx_filename} ---"]
+    spans = find_missing_spans(html_text_normalized, mdx_text_normalized, max_edits)
+    context = REPORT_CONTEXT_CHARS
+    if spans is None:
+        lines.append(f"The texts differ by more than {max_edits} edits; showing the first missing character only.")
+        lines.append(f"  HTML: ...{html_text_normalized[max(0, first_missing - context):first_missing]}"
+                     f"[{_excerpt(html_text_normalized, first_missing, len(html_text_normalized))}]")
+        return False, None, lines
+    groups = group_missing_spans(spans)
+    missing_chars = sum(group[3] for group in groups)
+    lines.append(f"The MDX is missing {missing_chars} character(s) of the HTML in {len(groups)} place(s):")
+    for html_start, html_end, mdx_position, missing in groups:
+        lines.append(f"  at HTML character {html_start} ({missing} missing):")
+        lines.append(f"    HTML: ...{html_text_normalized[max(0, html_start - context):html_start]}"
+                     f"[{_excerpt(html_text_normalized, html_start, html_end)}]{html_text_normalized[html_end:html_end + context]}...")
+        lines.append(f"    MDX:  ...{mdx_text_normalized[max(0, mdx_position - context):mdx_position]}"
+                     f"[]{mdx_text_normalized[mdx_position:mdx_position + context]}...")
+    return False, missing_chars, lines
+
+def compare_and_report(html_text_normalized, mdx_text_normalized, html_filename, mdx_filename, max_edits=DEFAULT_MAX_DIFF_EDITS):
+    """
+    Prints build_report's findings. Returns True when nothing is missing, False when something is, and
+    None if either text could not be read.
+    """
+    if html_text_normalized is None or mdx_text_normalized is None:
+        # Errors would have been printed by the functions fetching the text
+        return None
+    ok, _, lines = build_report(html_text_normalized, mdx_text_normalized, html_filename, mdx_filename, max_edits)
+    print("\n".join(lines))
+    return ok
 
-    # Let's assume "shouldn't be missing any characters" implies that after normalization,
-    # the MDX content should be EQUAL to the HTML content. If MDX can have additional
-    # characters (e.g. MDX specific syntax not rendered as text), then a simple
-    # string equality after normalization is the most direct test.
 
-    if html_text_normalized == mdx_text_normalized:
-        print(f"OK: Content matches for {html_filename} and {mdx_filename}")
+# --- Batch mode ---
+def find_file_pairs(html_directory, mdx_directory, recursive=False):
+    """Yields (html_file_path, mdx_file_path) with the MDX at the same relative path (".mdx" extension)."""
+    if recursive:
+        walker = os.walk(html_directory)
     else:
-        print(f"\n--- MISMATCH detected between {html_filename} and {mdx_filename} ---")
-        print("The normalized MDX content is NOT identical to the normalized HTML div content.")
-        print("This means either MDX is missing content from HTML, or has extra/different content.")
-
-        # Using difflib to show differences
-        # This can be verbose for very long strings, so we might show snippets or a summary.
-        # `ndiff` produces a line-by-line delta. Since we flattened, it's char-by-char.
-        # For long strings, this might be too much. Consider context_diff or unified_diff.
-
-        # To make diff more readable for long flattened strings, we can split them into chunks
-        # or compare segments. For now, let's show a snippet of where they first differ.
-
-        # Find first differing character
-        len_html = len(html_text_normalized)
-        len_mdx = len(mdx_text_normalized)
-        min_len = min(len_html, len_mdx)
-        diff_index = -1
-        for i in range(min_len):
-            if html_text_normalized[i] != mdx_text_normalized[i]:
-                diff_index = i
+        walker = [(html_directory, [], os.listdir(html_directory))]
+    for dirpath, dirnames, filenames in walker:
+        dirnames.sort()
+        for html_filename_full in sorted(filenames):
+            if html_filename_full.lower().endswith(('.html', '.htm')):
+                html_file_path = os.path.join(dirpath, html_filename_full)
+                rel_base, _ = os.path.splitext(os.path.relpath(html_file_path, html_directory))
+                yield html_file_path, os.path.join(mdx_directory, rel_base + ".mdx")
+
+def verify_pair(html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, max_edits=DEFAULT_MAX_DIFF_EDITS,
+                model_text=False):
+    """
+    Verifies one HTML/MDX pair without printing. Returns a JSON-ready dict whose status is "ok", "mismatch",
+    "error" or "missing_mdx"; messages holds what the text extractors would have printed. With model_text,
+    the HTML side is the converter's .txt next to the MDX when there is one (html_text_source says which).
+    """
+    started = time.perf_counter()
+    result = {"html": html_file_path, "mdx": mdx_file_path, "status": "missing_mdx", "missing_chars": None,
+              "report": [], "messages": [], "html_text_source": None, "seconds": 0.0}
+    if os.path.exists(mdx_file_path):
+        model_text_path = os.path.splitext(mdx_file_path)[0] + MODEL_TEXT_SUFFIX
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            if model_text and os.path.exists(model_text_path):
+                result["html_text_source"] = model_text_path
+                html_text = get_text_from_model(model_text_path)
+            else:
+                result["html_text_source"] = html_file_path
+                html_text = get_text_from_div(html_file_path, div_identifier_type, div_identifier_value)
+            mdx_text = get_text_from_mdx(mdx_file_path) if html_text is not None else None
+        result["messages"] = captured.getvalue().splitlines()
+        if html_text is None or mdx_text is None:
+            result["status"] = "error"
+        else:
+            ok, result["missing_chars"], result["report"] = build_report(
+                html_text, mdx_text, os.path.basename(html_file_path), os.path.basename(mdx_file_path), max_edits)
+            result["status"] = "ok" if ok else "mismatch"
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+def verify_pairs(pairs, div_identifier_type, div_identifier_value, workers=1, fail_fast=False, max_edits=DEFAULT_MAX_DIFF_EDITS,
+                 model_text=False):
+    """
+    Verifies pairs (in a process pool when workers > 1) and returns results in pair order. With fail_fast,
+    stops at the first mismatch or error; pairs not verified by then are left out.
+    """
+    def is_failure(result): return result["status"] in ("mismatch", "error")
+    if workers <= 1 or len(pairs) <= 1:
+        results = []
+        for html_file_path, mdx_file_path in pairs:
+            results.append(verify_pair(html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, max_edits,
+                                       model_text))
+            if fail_fast and is_failure(results[-1]): break
+        return results
+
+    results_by_index = {}
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(verify_pair, html_file_path, mdx_file_path, div_identifier_type, div_identifier_value, max_edits,
+                               model_text): index
+                   for index, (html_file_path, mdx_file_path) in enumerate(pairs)}
+        for future in as_completed(futures):
+            results_by_index[futures[future]] = future.result()
+            if fail_fast and is_failure(results_by_index[futures[future]]):
+                pool.shutdown(wait=True, cancel_futures=True)
                 break
+    return [results_by_index[index] for index in sorted(results_by_index)]
+
+def summarize_results(results):
+    summary = {"pairs": len(results), "ok": 0, "mismatch": 0, "error": 0, "missing_mdx": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    summary["seconds"] = round(sum(result["seconds"] for result in results), 3)
+    return summary
+
+def write_json_report(report_path, results, summary):
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({"summary": summary, "results": results}, f, ensure_ascii=False, indent=2)
+
+def write_junit_report(report_path, results, summary, html_directory):
+    """One testcase per HTML file: mismatches are failures, unreadable files errors, missing MDX files skipped."""
+    suite = ET.Element("testsuite", name="verify_mdx_conversion", tests=str(summary["pairs"]),
+                       failures=str(summary["mismatch"]), errors=str(summary["error"]),
+                       skipped=str(summary["missing_mdx"]), time=str(summary["seconds"]))
+    for result in results:
+        rel_path = os.path.relpath(result["html"], html_directory).replace(os.sep, '/')
+        classname = os.path.dirname(rel_path).replace('/', '.') or "root"
+        case = ET.SubElement(suite, "testcase", classname=classname, name=rel_path, time=str(result["seconds"]))
+        if result["status"] == "mismatch":
+            missing = result["missing_chars"]
+            message = f"MDX is missing {missing} character(s)" if missing is not None else "MDX is missing content"
+            ET.SubElement(case, "failure", message=message).text = "\n".join(result["report"]).strip()
+        elif result["status"] == "error":
+            ET.SubElement(case, "error", message="Could not read HTML or MDX").text = "\n".join(result["messages"])
+        elif result["status"] == "missing_mdx":
+            ET.SubElement(case, "skipped", message=f"No MDX file at {result['mdx']}")
+    ET.ElementTree(suite).write(report_path, encoding='utf-8', xml_declaration=True)
+
+def run_batch(args):
+    """Non-interactive verification of a whole converted tree; returns the process exit code."""
+    for label, directory in (("HTML", args.html_directory), ("MDX", args.mdx_directory)):
+        if not os.path.isdir(directory):
+            print(f"Error: {label} directory not found at {directory}")
+            return 2
+    pairs = list(find_file_pairs(args.html_directory, args.mdx_directory, args.recursive))
+    results = verify_pairs(pairs, args.div_type, args.div_value, args.workers, args.fail_fast, args.max_diff_edits,
+                           args.model_text)
+
+    for result in results:
+        if result["status"] in ("mismatch", "error") or args.verbose:
+            for message in result["messages"]: print(message)
+            if result["report"]: print("\n".join(result["report"]))
+        if result["status"] == "missing_mdx" and args.verbose:
+            print(f"Warning: Corresponding MDX file not found: {result['mdx']}")
+    summary = summarize_results(results)
+    if args.json: write_json_report(args.json, results, summary)
+    if args.junit: write_junit_report(args.junit, results, summary, args.html_directory)
 
-        if diff_index == -1 and len_html != len_mdx:
-            # One is a prefix of the other
-            diff_index = min_len
-            print(f"One text is a prefix of the other. Different lengths: HTML={len_html}, MDX={len_mdx}")
-
-        if diff_index != -1:
-            context = 20  # Number of characters around the difference
-            start = max(0, diff_index - context)
-            end_html = min(len_html, diff_index + context)
-            end_mdx = min(len_mdx, diff_index + context)
-
-            print(f"First difference around character {diff_index}:")
-            print(f"  HTML: ...{html_text_normalized[start:diff_index]}[{html_text_normalized[diff_index:end_html]}]...")
-            print(f"  MDX:  ...{mdx_text_normalized[start:diff_index]}[{mdx_text_normalized[diff_index:end_mdx]}]...")
-
-        # For a more detailed diff:
-        # d = difflib.Differ()
-        # diff = list(d.compare(html_text_normalized.splitlines(), mdx_text_normalized.splitlines())) # splitlines won't work well for flattened
-        # For character by character (can be very long output):
-        # diff = list(difflib.ndiff(html_text_normalized, mdx_text_normalized))
-        # print("\nDetailed Character Diff (lines starting with '-' are from HTML only, '+' from MDX only, ' ' are common):")
-        # for line in diff:
-        #     if line.startswith('- ') or line.startswith('+ '): # Only show actual differences
-        #         print(line)
-        #     elif not line.startswith('? ') and not line.startswith('  '): # Handle other diff outputs if necessary
-        #          # This part might need adjustment depending on what difflib.ndiff actually outputs for changes
-        #          print(line) # if there's a change within a 'common' part it uses '?'
-
-        # A simple check if HTML content is "in" MDX (less strict)
-        # if html_text_normalized not in mdx_text_normalized:
-        # print("  Specifically, some content from the HTML div seems to be entirely missing in the MDX.")
-        # else:
-        # print("  MDX content contains HTML content, but they are not identical (could be extra chars in MDX or different chars).")
+    print("\n--- Summary ---")
+    print(f"Verified {summary['pairs']} of {len(pairs)} HTML files under '{args.html_directory}'"
+          f"{' (stopped at the first failure)' if len(results) < len(pairs) else ''}: {summary['ok']} OK, "
+          f"{summary['mismatch']} with MDX missing HTML content, {summary['error']} unreadable, "
+          f"{summary['missing_mdx']} without an MDX file.")
+    return 1 if summary["mismatch"] or summary["error"] else 0
 
 
-def main():
+def interactive_main():
     html_directory = input("Enter the path to the directory containing HTML files: ").strip()
     mdx_directory = input("Enter the path to the directory containing corresponding MDX files: ").strip()
     div_identifier_type = input("Enter HTML div identifier type ('id', 'class', or 'selector'): ").lower().strip()
@@ -208,18 +567,46 @@ def main():
             # print(f"Norm MDX  (len {len(mdx_content_normalized)}): '{mdx_content_normalized[:100]}...'")
 
 
-            if html_div_text_normalized != mdx_content_normalized:
+            if compare_and_report(html_div_text_normalized, mdx_content_normalized, html_filename_full, mdx_filename_full) is False:
                 mismatched_files +=1
-            compare_and_report(html_div_text_normalized, mdx_content_normalized, html_filename_full, mdx_filename_full)
 
 
     print("\n--- Summary ---")
     print(f"Found {found_html_files} HTML files in '{html_directory}'.")
     print(f"Processed {processed_pairs} HTML/MDX file pairs.")
-    print(f"{mismatched_files} pairs had content mismatches after normalization.")
+    print(f"{mismatched_files} pairs had MDX missing HTML content after normalization.")
     if found_html_files > processed_pairs:
         print(f"{found_html_files - processed_pairs} HTML files did not have a corresponding MDX file in '{mdx_directory}'.")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Check that converted MDX files contain all the text of their HTML sources. "
+                                                 "Without directories, prompts for them interactively.")
+    parser.add_argument("html_directory", nargs="?", help="Directory of source HTML files.")
+    parser.add_argument("mdx_directory", nargs="?", help="Directory of converted MDX files (same relative paths).")
+    parser.add_argument("--div_type", choices=["id", "class", "selector"], default="selector",
+                        help="How --div_value identifies the HTML content div (default: selector).")
+    parser.add_argument("--div_value", default="div.col-md-7", help="The content div's id, class or CSS selector (default: div.col-md-7).")
+    parser.add_argument("--recursive", action="store_true", help="Pair files in subdirectories too.")
+    parser.add_argument("--model_text", action="store_true",
+                        help="Take the HTML text from the .txt html_to_mdx_v2 --formats text wrote next to each MDX instead "
+                             "of parsing the HTML again; pages without one are parsed. --div_type/--div_value then do not apply.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes; 1 verifies in this process.")
+    parser.add_argument("--fail_fast", action="store_true", help="Stop at the first mismatch or unreadable file.")
+    parser.add_argument("--max_diff_edits", type=int, default=DEFAULT_MAX_DIFF_EDITS,
+                        help="Edit budget for locating missing spans on a mismatch.")
+    parser.add_argument("--json", help="Write results and a summary to this JSON file.")
+    parser.add_argument("--junit", help="Write a JUnit XML report to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Also print passing pairs and HTML files without an MDX file.")
+    args = parser.parse_args()
+
+    if args.html_directory is None:
+        interactive_main()
+        return
+    if args.mdx_directory is None:
+        parser.error("mdx_directory is required with html_directory")
+    sys.exit(run_batch(args))
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark for reformat_mdx.replace_element_reference_section on pathological inputs.
+
+Compares the linear section scanner with the regex it replaced, checks that both give
+the same output, and reports timings. The legacy regex is quadratic on a long blank run
+after the heading with no following heading, so it is only run up to --legacy_limit.
+
+  python bench_reformat_mdx.py
+  python bench_reformat_mdx.py --sizes 1000 10000 100000 --legacy_limit 8000
+"""
+
+import re
+import sys
+import time
+import argparse
+
+from reformat_mdx import replace_element_reference_section
+
+LEGACY_PATTERN = r'(## Element Reference\s*\n)((?:(?!##)[\s\S])*?)(\n(?:##|####))'
+LEGACY_REPLACEMENT = r'\1\n<ElementReference frontMatter={frontMatter} />\n\3'
+
+def legacy_replace_element_reference_section(content):
+  return re.sub(LEGACY_PATTERN, LEGACY_REPLACEMENT, content, flags=re.MULTILINE)
+
+# name -> builder taking a size parameter
+CASES = {
+  'blank-run-without-heading': lambda n: '## Element Reference' + '\n' * n + 'text' * n,
+  'huge-section-without-heading': lambda n: '## Element Reference\n' + 'Some text # with hashes\n' * n,
+  'huge-section-then-heading': lambda n: '## Element Reference\n' + 'Some text # with hashes\n' * n + '## Next\n',
+  'many-sections': lambda n: ('## Element Reference\n\nDefinition text\n\n## Other\n\nBody\n' * n),
+}
+
+def time_call(func, content, repeat=3):
+  best = None
+  for _ in range(repeat):
+    started = time.perf_counter()
+    result = func(content)
+    elapsed = time.perf_counter() - started
+    best = elapsed if best is None else min(best, elapsed)
+  return best, result
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000, 16000, 256000],
+                      help='Size parameters for each pathological case.')
+  parser.add_argument('--legacy_limit', type=int, default=2000,
+                      help='Largest size the legacy regex is run on (it is quadratic on some cases).')
+  args = parser.parse_args()
+
+  mismatches = 0
+  print(f"{'case':<30} {'size':>8} {'chars':>10} {'scanner ms':>11} {'regex ms':>10}")
+  for case_name, build in CASES.items():
+    for size in args.sizes:
+      content = build(size)
+      scanner_seconds, scanner_result = time_call(replace_element_reference_section, content)
+      legacy_column = '-'
+      if size <= args.legacy_limit:
+        legacy_seconds, legacy_result = time_call(legacy_replace_element_reference_section, content, repeat=1)
+        legacy_column = f"{legacy_seconds * 1000:.1f}"
+        if legacy_result != scanner_result:
+          mismatches += 1
+          legacy_column += ' MISMATCH'
+      print(f"{case_name:<30} {size:>8} {len(content):>10} {scanner_seconds * 1000:>11.2f} {legacy_column:>10}")
+
+  if mismatches:
+    print(f"\n{mismatches} case(s) where the scanner and the legacy regex disagree")
+    sys.exit(1)
+
+if __name__ == '__main__':
+  main()
@@ -1,105 +1,173 @@
 import os
 import re
-from bs4 import BeautifulSoup, NavigableString
-
-def to_markdown(soup, level=0):
-    """Recursively converts BeautifulSoup object to Markdown."""
-    markdown = ""
-    indent = "  " * level
-    for element in soup.contents:
-        if isinstance(element, NavigableString):
-            # Preserve whitespace and newlines from NavigableString
-            markdown += element.string
-        elif element.name == 'strong':
-            markdown += f"**{element.get_text(strip=True)}**"
-        elif element.name == 'ul':
-            markdown += to_markdown(element, level + 1)
-        elif element.name == 'li':
-            # Process list item content
-            item_content = ''.join(to_markdown(c, level) for c in element.contents).strip()
-            markdown += f"{indent}- {item_content}\n"
+import sys
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+DEFAULT_SES_DIRECTORY = 'standards/isbd/docs/elements/isbd/SES'
+
+# One scanner for every tag the converter cares about; everything else (JSX components, <details>, text) is
+# copied through untouched, so the rest of the MDX is never re-serialized.
+TAG_PATTERN = re.compile(r'<(/?)(div|strong|ul|li)\b[^>]*>', re.IGNORECASE)
+INNER_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def render_list_lines(list_lines):
+    return "".join(f"{prefix}{''.join(parts).strip()}\n" for prefix, parts in list_lines)
+
+
+def convert_mdx_content(content):
+    """
+    Rewrites <strong> and <ul>/<li> inside <div> blocks as Markdown in a single pass over the file.
+    List items are collected as part lists and joined once, so the cost stays linear in the size of
+    the file however deeply the lists nest.
+    """
+    out = []
+    div_depth = 0
+    open_strong = None     # match of an open <strong> inside a div
+    list_level = 0         # nesting depth of <ul> inside a div
+    list_lines = []        # (prefix, parts) per <li>, in document order
+    open_items = []        # (list_level, parts) for each <li> not yet closed
+    position = 0
+
+    def emit(text):
+        # Text inside a list only survives as part of an <li>; whitespace between items is dropped.
+        if not list_level:
+            out.append(text)
+        elif open_items:
+            open_items[-1][1].append(text)
+
+    for match in TAG_PATTERN.finditer(content):
+        is_closing, tag_name = match.group(1) == '/', match.group(2).lower()
+        if open_strong is not None:
+            if tag_name != 'strong' or not is_closing: continue
+            emit(f"**{INNER_TAG_PATTERN.sub('', content[open_strong.end():match.start()]).strip()}**")
+            open_strong = None
+            position = match.end()
+            continue
+
+        emit(content[position:match.start()])
+        position = match.end()
+        if tag_name == 'div':
+            div_depth = max(div_depth - 1, 0) if is_closing else div_depth + 1
+            emit(match.group(0))
+        elif not div_depth:
+            emit(match.group(0))
+        elif tag_name == 'strong' and not is_closing:
+            open_strong = match
+        elif tag_name == 'ul':
+            if not is_closing:
+                list_level += 1
+            elif list_level:
+                while open_items and open_items[-1][0] >= list_level: open_items.pop()
+                list_level -= 1
+                if not list_level:
+                    open_items.clear()
+                    out.append(render_list_lines(list_lines))
+                    list_lines.clear()
+        elif tag_name == 'li' and list_level:
+            # An unclosed <li> ends where its own </ul> or the next sibling <li> starts.
+            while open_items and open_items[-1][0] >= list_level: open_items.pop()
+            if not is_closing:
+                parts = []
+                list_lines.append(("  " * (list_level - 1) + "- ", parts))
+                open_items.append((list_level, parts))
         else:
-            # For other tags like <div>, <p>, etc., just process their content
-            markdown += to_markdown(element, level)
-    return markdown
+            emit(match.group(0))
+
+    if open_strong is not None: position = open_strong.start()  # Unterminated <strong>: keep it as written
+    emit(content[position:])
+    if list_lines: out.append(render_list_lines(list_lines))
+    return "".join(out)
+
 
 def process_mdx_file(filepath):
-    """Reads an MDX file, converts specific HTML tags to Markdown, and saves it."""
-    print(f"Processing {filepath}...")
-    with open(filepath, 'r', encoding='utf-8') as f:
-        original_content = f.read()
-
-    # Split content to isolate parts inside <div> tags for processing
-    parts = re.split(r'(<div.*?/div>)', original_content, flags=re.DOTALL)
-    
-    new_content = ""
-    converted = False
-    for part in parts:
-        if part.startswith('<div'):
-            # Extract content within the div
-            div_match = re.match(r'(<div.*?>)(.*)(</div>)', part, re.DOTALL)
-            if div_match:
-                div_start_tag, div_content, div_end_tag = div_match.groups()
-                
-                # Use BeautifulSoup to parse and convert only the div's content
-                soup = BeautifulSoup(div_content, 'html.parser')
-                
-                # Convert <strong>
-                for strong in soup.find_all('strong'):
-                    strong.replace_with(f"**{strong.get_text(strip=True)}**")
-                
-                # Convert <ul>
-                for ul in soup.find_all('ul'):
-                    md_list = ""
-                    for li in ul.find_all('li', recursive=False):
-                        # Handle nested lists by recursively calling a conversion function
-                        def process_li_content(li_tag, current_level=1):
-                            prefix = "  " * (current_level -1)
-                            text = ''.join(f"**{c.get_text(strip=True)}**" if c.name == 'strong' else c.string for c in li_tag.contents if c.name != 'ul').strip()
-                            md_item = f"{prefix}- {text}\n"
-                            nested_ul = li_tag.find('ul')
-                            if nested_ul:
-                                for nested_li in nested_ul.find_all('li', recursive=False):
-                                    md_item += process_li_content(nested_li, current_level + 1)
-                            return md_item
-                        md_list += process_li_content(li)
-
-                    # Replace the ul tag with the markdown string
-                    ul.replace_with(md_list)
-
-                converted_div_content = str(soup)
-                
-                if div_content != converted_div_content:
-                    converted = True
-
-                new_content += div_start_tag + converted_div_content + div_end_tag
-            else:
-                new_content += part # Should not happen with the regex
+    """
+    Converts one MDX file in place. Returns (filepath, status, seconds) where status is 'converted',
+    'unchanged' or 'error'; plain values so the result can come back from a worker process.
+    """
+    started = time.perf_counter()
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            original_content = f.read()
+
+        new_content = convert_mdx_content(original_content)
+
+        if new_content != original_content:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            status = "converted"
         else:
-            new_content += part
+            status = "unchanged"
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"  - Error processing {filepath}: {e}")
+        status = "error"
+    return filepath, status, time.perf_counter() - started
 
-    if converted:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        print(f"  - Converted {os.path.basename(filepath)}")
-    else:
-        print(f"  - No changes needed for {os.path.basename(filepath)}")
 
+def find_mdx_files(roots, recursive=False, dir_names=None):
+    """
+    Yields the .mdx files under each root. With dir_names, only files that sit below a directory of one of
+    those names (case-insensitive, e.g. 'ses') are kept, so one recursive call can cover every standard.
+    """
+    dir_names = {name.lower() for name in dir_names} if dir_names else None
+    for root in roots:
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            print(f"Directory not found: {root}")
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            if not recursive: dirnames.clear()
+            if dir_names is not None:
+                rel_parts = os.path.relpath(dirpath, os.path.dirname(root)).lower().split(os.sep)
+                if not dir_names.intersection(rel_parts): continue
+            for filename in sorted(filenames):
+                if filename.endswith(".mdx"): yield os.path.join(dirpath, filename)
 
-def process_directory(directory):
-    """Processes all MDX files in a given directory."""
-    for filename in os.listdir(directory):
-        if filename.endswith(".mdx"):
-            filepath = os.path.join(directory, filename)
-            process_mdx_file(filepath)
 
-if __name__ == "__main__":
-    ses_directory = 'standards/isbd/docs/elements/isbd/SES'
-    abs_ses_directory = os.path.abspath(ses_directory)
+def process_directory(roots, recursive=False, dir_names=None, workers=None, verbose=False):
+    """Processes all MDX files under roots, in a worker pool when workers > 1; returns a Counter of statuses."""
+    filepaths = list(find_mdx_files(roots, recursive, dir_names))
+    counts = Counter()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) if workers > 1 and len(filepaths) > 1 else nullcontext() as pool:
+        results = pool.map(process_mdx_file, filepaths, chunksize=16) if pool else map(process_mdx_file, filepaths)
+        for filepath, status, seconds in results:
+            counts[status] += 1
+            if status == "converted":
+                print(f"  - Converted {filepath}")
+            elif verbose:
+                print(f"  - {status.capitalize()} {filepath} ({seconds * 1000:.1f} ms)")
+    return counts
 
-    if os.path.exists(abs_ses_directory):
-        process_directory(abs_ses_directory)
-    else:
-        print(f"Directory not found: {abs_ses_directory}")
 
-    print("\nProcessing complete.")
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert <strong> and <ul>/<li> inside <div> blocks of MDX files to Markdown, in place.",
+        epilog="Example: convert every standard's SES pages with  %(prog)s standards --recursive --dir_name ses")
+    parser.add_argument("roots", nargs="*", default=[DEFAULT_SES_DIRECTORY],
+                        help=f"Directories to process (default: {DEFAULT_SES_DIRECTORY}).")
+    parser.add_argument("--recursive", action="store_true", help="Also process MDX files in subdirectories.")
+    parser.add_argument("--dir_name", action="append", dest="dir_names",
+                        help="Only process files below a directory with this name (case-insensitive); repeatable.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes; 1 processes files in this process.")
+    parser.add_argument("--verbose", action="store_true", help="Also list unchanged files with their timings.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = process_directory(args.roots, args.recursive, args.dir_names, args.workers, args.verbose)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"\nProcessing complete: {total} file(s) in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:.0f} files/s) - {counts['converted']} converted, "
+          f"{counts['unchanged']} unchanged, {counts['error']} error(s).")
+    if counts['error']: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
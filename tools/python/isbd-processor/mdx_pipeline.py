@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Fused MDX clean-up pipeline.
+
+Each clean-up is a rule: a function taking (frontmatter, body) and returning the new
+(frontmatter, body). frontmatter is the raw text between the '---' delimiters, or None
+when the file has none. Rules that need settings take them as keyword arguments, passed
+per rule name through rule_options. The engine reads every file once, runs the selected rules in
+order on the in-memory text and writes the file at most once, so combining clean-ups
+costs one read/write pass over the tree instead of one per script.
+
+  mdx_pipeline.py standards/isbd/docs --recursive
+  mdx_pipeline.py standards --recursive --rules element-reference,div-markdown --check
+  mdx_pipeline.py --list
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from reformat_mdx import filter_frontmatter_languages, remove_spanish_from_yaml, replace_element_reference_section
+from convert_mdx import convert_mdx_content, find_mdx_files
+
+# Rule name -> (function, description), in registration order (the default run order)
+RULES = {}
+
+def rule(name, description):
+  """Register a (frontmatter, body) -> (frontmatter, body) function as a pipeline rule."""
+  def register(func):
+    if name in RULES:
+      raise ValueError(f"Duplicate pipeline rule '{name}'")
+    RULES[name] = (func, description)
+    return func
+  return register
+
+@rule('remove-spanish', "Drop '@es'-tagged entries from the frontmatter (YAML-aware)")
+def remove_spanish_rule(frontmatter, body):
+  if frontmatter is None or '@es' not in frontmatter:
+    return frontmatter, body
+  return remove_spanish_from_yaml(frontmatter), body
+
+@rule('filter-languages', "Keep only the --keep_languages tags in the frontmatter (YAML-aware)")
+def filter_languages_rule(frontmatter, body, keep_languages=('en',)):
+  if frontmatter is None:
+    return frontmatter, body
+  return filter_frontmatter_languages(frontmatter, keep_languages), body
+
+@rule('element-reference', "Replace the Element Reference section with <ElementReference />")
+def element_reference_rule(frontmatter, body):
+  # The component renders from the page's frontmatter, so pages without one are left alone.
+  if frontmatter is None:
+    return frontmatter, body
+  return frontmatter, replace_element_reference_section(body)
+
+@rule('div-markdown', "Rewrite <strong> and <ul>/<li> inside <div> blocks as Markdown")
+def div_markdown_rule(frontmatter, body):
+  return frontmatter, convert_mdx_content(body)
+
+# filter-languages generalises remove-spanish, so it is opt-in through --rules
+DEFAULT_RULES = ('remove-spanish', 'element-reference', 'div-markdown')
+
+def split_frontmatter(content):
+  """Split content the way reformat_mdx does: ('---' + frontmatter + '---' + body)."""
+  if content.startswith('---'):
+    end_index = content.find('---', 3)
+    if end_index != -1:
+      return content[3:end_index], content[end_index + 3:]
+  return None, content
+
+def join_frontmatter(frontmatter, body):
+  return body if frontmatter is None else f"---{frontmatter}---{body}"
+
+def apply_rules(content, rule_names, rule_stats=None, rule_options=None):
+  """
+  Run the named rules over one file's content; returns the new content. rule_stats, if given,
+  is a dict of rule name -> [seconds, changed file count] that is updated in place.
+  rule_options maps a rule name to the keyword arguments it is called with.
+  """
+  frontmatter, body = split_frontmatter(content)
+  for name in rule_names:
+    func = RULES[name][0]
+    options = rule_options.get(name, {}) if rule_options else {}
+    started = time.perf_counter()
+    new_frontmatter, new_body = func(frontmatter, body, **options)
+    elapsed = time.perf_counter() - started
+    changed = new_frontmatter != frontmatter or new_body != body
+    if rule_stats is not None:
+      stats = rule_stats.setdefault(name, [0.0, 0])
+      stats[0] += elapsed
+      stats[1] += changed
+    frontmatter, body = new_frontmatter, new_body
+  return join_frontmatter(frontmatter, body)
+
+def process_file(filepath, rule_names, check=False, rule_options=None):
+  """
+  Read one file, apply the rules, and write it back only if it changed (never with check).
+  Returns (filepath, status, rule_stats) with status 'changed', 'unchanged' or 'error'.
+  """
+  rule_stats = {}
+  try:
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+      content = f.read()
+    new_content = apply_rules(content, rule_names, rule_stats, rule_options)
+    if new_content == content:
+      return filepath, 'unchanged', rule_stats
+    if not check:
+      tmp_path = filepath + '.tmp'
+      with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(new_content)
+      os.replace(tmp_path, filepath)
+    return filepath, 'changed', rule_stats
+  except (OSError, UnicodeDecodeError) as e:
+    print(f"  ✗ Error processing {filepath}: {e}")
+    return filepath, 'error', rule_stats
+
+def run_pipeline(filepaths, rule_names, workers=1, check=False, rule_options=None):
+  """Process files (in a worker pool when workers > 1); returns (status counts, per-rule stats, changed paths)."""
+  counts = Counter()
+  rule_stats = {name: [0.0, 0] for name in rule_names}
+  changed_paths = []
+  if workers > 1 and len(filepaths) > 1:
+    with ProcessPoolExecutor(workers) as pool:
+      results = list(pool.map(process_file, filepaths, [rule_names] * len(filepaths),
+                              [check] * len(filepaths), [rule_options] * len(filepaths), chunksize=16))
+  else:
+    results = [process_file(filepath, rule_names, check, rule_options) for filepath in filepaths]
+  for filepath, status, file_rule_stats in results:
+    counts[status] += 1
+    if status == 'changed':
+      changed_paths.append(filepath)
+    for name, (seconds, changed) in file_rule_stats.items():
+      rule_stats[name][0] += seconds
+      rule_stats[name][1] += changed
+  return counts, rule_stats, changed_paths
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('roots', nargs='*', help="Directories of MDX files to clean up in place.")
+  parser.add_argument('--recursive', action='store_true', help="Also process MDX files in subdirectories.")
+  parser.add_argument('--dir_name', action='append', dest='dir_names',
+                      help="Only process files below a directory with this name (case-insensitive); repeatable.")
+  parser.add_argument('--rules', help=f"Comma-separated rules to run, in order (default: {','.join(DEFAULT_RULES)}).")
+  parser.add_argument('--keep_languages', default='en',
+                      help="Comma-separated language tags kept by the filter-languages rule (default: en).")
+  parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help="Worker processes; 1 runs in this process.")
+  parser.add_argument('--check', action='store_true',
+                      help="Report files that would change without writing them; exit 1 if any would.")
+  parser.add_argument('--list', action='store_true', help="List the available rules and exit.")
+  args = parser.parse_args()
+
+  if args.list:
+    for name, (_, description) in RULES.items():
+      print(f"{name:<20} {description}")
+    return
+  if not args.roots:
+    parser.error("at least one root directory is required")
+  rule_names = [name.strip() for name in args.rules.split(',') if name.strip()] if args.rules else list(DEFAULT_RULES)
+  unknown_rules = [name for name in rule_names if name not in RULES]
+  if unknown_rules or not rule_names:
+    parser.error(f"unknown rule(s) {unknown_rules}; choose from {', '.join(RULES)}")
+
+  started = time.perf_counter()
+  filepaths = list(find_mdx_files(args.roots, args.recursive, args.dir_names))
+  rule_options = {'filter-languages': {'keep_languages': [lang.strip() for lang in args.keep_languages.split(',')
+                                                         if lang.strip()]}}
+  counts, rule_stats, changed_paths = run_pipeline(filepaths, rule_names, args.workers, args.check, rule_options)
+  elapsed = time.perf_counter() - started
+
+  for filepath in changed_paths:
+    print(f"  {'Would change' if args.check else '✓ Changed'}: {filepath}")
+  print(f"\n{'rule':<20} {'files changed':>13} {'time (s)':>9}")
+  for name in rule_names:
+    seconds, changed = rule_stats[name]
+    print(f"{name:<20} {changed:>13} {seconds:>9.3f}")
+  print(f"\n{len(filepaths)} file(s) in {elapsed:.2f}s: {counts['changed']} "
+        f"{'would change' if args.check else 'changed'}, {counts['unchanged']} unchanged, {counts['error']} error(s).")
+  if counts['error'] or (args.check and counts['changed']):
+    sys.exit(1)
+
+if __name__ == '__main__':
+  main()
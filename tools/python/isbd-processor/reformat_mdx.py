@@ -4,47 +4,157 @@ Script to reformat existing MDX files:
 1. Remove Spanish entries from frontmatter
 2. Replace Element Reference section content with component
 3. Copy from .bak directory to main directory
+
+Runs as an incremental sync: a manifest in the output directory records each source's
+size, mtime and hash, so only changed sources are transformed (in a process pool) and
+outputs whose content would not change are not rewritten.
+
+  reformat_mdx.py [SOURCE_DIR] [OUTPUT_DIR] [--workers N] [--full] [--delete]
 """
 
 import os
 import re
+import sys
+import json
+import hashlib
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import shutil
 import yaml
 
-# Define paths
+# Default paths (the ISBD elements tree this script was written for)
 BACKUP_DIR = Path('/Users/jonphipps/Code/IFLA/standards-dev/standards/isbd/docs/elements/isbd.bak')
 OUTPUT_DIR = Path('/Users/jonphipps/Code/IFLA/standards-dev/standards/isbd/docs/elements/isbd')
 
+MANIFEST_FILENAME = '.reformat_mdx_manifest.json'
+MANIFEST_VERSION = 1
+
+# libyaml-backed loader/dumper when PyYAML was built with it; resolved once for every file of a batch
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# The vocabulary tags with two-letter language codes, optionally with a region or script subtag
+LANGUAGE_TAG = r'([a-z]{2}(?:-[A-Za-z0-9]{2,8})?)'
+# A tagged property key ('skos:definition@es', 'rdfs:label@fr[0]'); untagged or non-CURIE keys never match
+KEY_LANGUAGE_TAG_PATTERN = re.compile(r'^[A-Za-z][\w.-]*:[\w.-]+@' + LANGUAGE_TAG + r'(?:\[\d+\])?$')
+# A tagged literal value ('Titre@fr', '"Titre"@fr'); 'name@ifla' or 'a@b.org' are not tags
+VALUE_LANGUAGE_TAG_PATTERN = re.compile(r'\S@' + LANGUAGE_TAG + r'$')
+# Finds every possible tag in the raw text, so files with nothing to drop are never parsed
+LANGUAGE_TAG_SCAN_PATTERN = re.compile(r'@' + LANGUAGE_TAG + r'\b')
+
+def language_of(text, pattern=VALUE_LANGUAGE_TAG_PATTERN):
+  """Language tag of a tagged value (or key, with KEY_LANGUAGE_TAG_PATTERN), or None."""
+  match = pattern.search(text) if isinstance(text, str) else None
+  return match.group(1).lower() if match else None
+
+def drop_language_entries(data, is_dropped):
+  """
+  Return (data without entries tagged with a dropped language, number of entries removed).
+  A mapping entry goes when its key or its scalar value is tagged; a list item when it is tagged.
+  """
+  if isinstance(data, dict):
+    filtered, removed = {}, 0
+    for key, value in data.items():
+      if is_dropped(language_of(key, KEY_LANGUAGE_TAG_PATTERN)) or is_dropped(language_of(value)):
+        removed += 1
+        continue
+      filtered[key], child_removed = drop_language_entries(value, is_dropped)
+      removed += child_removed
+    return filtered, removed
+  if isinstance(data, list):
+    filtered, removed = [], 0
+    for item in data:
+      if is_dropped(language_of(item)):
+        removed += 1
+        continue
+      item, child_removed = drop_language_entries(item, is_dropped)
+      filtered.append(item)
+      removed += child_removed
+    return filtered, removed
+  return data, 0
+
+def filter_frontmatter_languages(yaml_content, keep_languages=None, drop_languages=None):
+  """
+  Remove language-tagged entries from YAML frontmatter: with keep_languages, every tag not in
+  the set; with drop_languages, every tag in it. The YAML is parsed, so multi-line values go
+  with their key, and it is re-serialized only when something was actually removed.
+  """
+  keep = {lang.lower() for lang in keep_languages} if keep_languages is not None else None
+  drop = {lang.lower() for lang in drop_languages} if drop_languages is not None else set()
+  def is_dropped(lang):
+    return lang is not None and (lang not in keep if keep is not None else lang in drop)
+
+  if not any(is_dropped(tag.lower()) for tag in LANGUAGE_TAG_SCAN_PATTERN.findall(yaml_content)):
+    return yaml_content
+  try:
+    data = yaml.load(yaml_content, Loader=YAML_LOADER)
+  except yaml.YAMLError as e:
+    print(f"Warning: frontmatter is not valid YAML, languages left unfiltered: {e}")
+    return yaml_content
+  data, removed = drop_language_entries(data, is_dropped)
+  if not removed:
+    return yaml_content
+  dumped = yaml.dump(data, Dumper=YAML_DUMPER, sort_keys=False, allow_unicode=True,
+                     default_flow_style=False, width=4096)
+  # Keep the newlines that sit inside the '---' delimiters
+  return '\n' + dumped
+
 def remove_spanish_from_yaml(yaml_content):
   """Remove Spanish language entries from YAML frontmatter"""
-  lines = yaml_content.split('\n')
-  filtered_lines = []
+  return filter_frontmatter_languages(yaml_content, drop_languages={'es'})
+
+ELEMENT_REFERENCE_HEADING = '## Element Reference'
+ELEMENT_REFERENCE_COMPONENT = '<ElementReference frontMatter={frontMatter} />'
 
-  for line in lines:
-    # Skip lines that end with @es or contain @es
-    if '@es' in line:
+def find_element_reference_sections(content):
+  """
+  Yield (keep_end, section_end) for each Element Reference section in one forward scan.
+  content[:keep_end] ends with the heading line (and any blank lines after it) and
+  content[section_end:] starts with the newline before the next '##' heading.
+  A section must be followed by a heading and may not contain '##' itself; sections
+  that never reach a heading are left alone.
+  """
+  search_from = 0
+  while True:
+    heading_start = content.find(ELEMENT_REFERENCE_HEADING, search_from)
+    if heading_start == -1:
+      return
+    heading_end = heading_start + len(ELEMENT_REFERENCE_HEADING)
+    blank_end = heading_end
+    while blank_end < len(content) and content[blank_end].isspace():
+      blank_end += 1
+
+    next_heading = content.find('##', blank_end)
+    section_end = next_heading - 1
+    if next_heading == -1 or content[section_end] != '\n':
+      search_from = heading_start + 1
+      continue
+    # The heading line ends at the last newline of the blank run that still leaves the
+    # newline before the next heading to close the section.
+    heading_newline = content.rfind('\n', heading_end, min(blank_end, section_end))
+    if heading_newline == -1:
+      search_from = heading_start + 1
       continue
-    filtered_lines.append(line)
 
-  return '\n'.join(filtered_lines)
+    yield heading_newline + 1, section_end
+    search_from = next_heading + 2
 
 def replace_element_reference_section(content):
   """Replace the Element Reference section content with the component"""
-  # Pattern to match the Element Reference section
-  # This looks for ## Element Reference and captures everything until the next ## or ####
-  pattern = r'(## Element Reference\s*\n)((?:(?!##)[\s\S])*?)(\n(?:##|####))'
-
-  # Replacement with the component
-  replacement = r'\1\n<ElementReference frontMatter={frontMatter} />\n\3'
-
-  # Perform the replacement
-  updated_content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
-
-  return updated_content
+  parts = []
+  position = 0
+  for keep_end, section_end in find_element_reference_sections(content):
+    if content[keep_end:section_end].strip() == ELEMENT_REFERENCE_COMPONENT:
+      continue  # Already converted; rewriting would only add another blank line
+    parts.append(content[position:keep_end])
+    parts.append(f'\n{ELEMENT_REFERENCE_COMPONENT}\n')
+    position = section_end
+  parts.append(content[position:])
+  return ''.join(parts)
 
-def process_mdx_file(file_path):
-  """Process a single MDX file"""
+def process_mdx_file(file_path, keep_languages=None):
+  """Process a single MDX file (keep_languages: language tags to keep instead of only removing Spanish)"""
   print(f"Processing: {file_path}")
 
   try:
@@ -61,7 +171,10 @@ def process_mdx_file(file_path):
         body = content[end_index + 3:]
 
         # Remove Spanish from frontmatter
-        cleaned_frontmatter = remove_spanish_from_yaml(frontmatter)
+        if keep_languages is not None:
+          cleaned_frontmatter = filter_frontmatter_languages(frontmatter, keep_languages)
+        else:
+          cleaned_frontmatter = remove_spanish_from_yaml(frontmatter)
 
         # Replace Element Reference section in body
         updated_body = replace_element_reference_section(body)
@@ -81,56 +194,189 @@ def process_mdx_file(file_path):
     print(f"Error processing {file_path}: {e}")
     return None
 
+def compute_transform_hash():
+  """Hash of this script; a changed transform invalidates every manifest entry."""
+  with open(os.path.abspath(__file__), 'rb') as f:
+    return hashlib.sha256(f.read()).hexdigest()
+
+def load_manifest(output_dir):
+  try:
+    with open(output_dir / MANIFEST_FILENAME, 'r', encoding='utf-8') as f:
+      manifest = json.load(f)
+    if manifest.get('version') == MANIFEST_VERSION:
+      return manifest
+  except FileNotFoundError:
+    pass
+  except (OSError, ValueError) as e:
+    print(f"Warning: ignoring unreadable manifest in {output_dir}: {e}")
+  return {'version': MANIFEST_VERSION, 'transform_hash': None, 'files': {}}
+
+def save_manifest(output_dir, manifest):
+  write_if_changed(output_dir / MANIFEST_FILENAME, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+
+def write_if_changed(file_path, content):
+  """Write content atomically unless the file already holds exactly that; returns True if written."""
+  try:
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+      if f.read() == content:
+        return False
+  except (FileNotFoundError, UnicodeDecodeError):
+    pass
+  tmp_path = file_path.with_name(file_path.name + '.tmp')
+  with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+    f.write(content)
+  os.replace(tmp_path, file_path)
+  return True
+
+def hash_file(file_path):
+  with open(file_path, 'rb') as f:
+    return hashlib.sha256(f.read()).hexdigest()
+
+def is_source_unchanged(entry, input_file, output_file, source_stat):
+  """Like rsync's quick check: size and mtime first, content hash only when those differ."""
+  if not entry or not output_file.exists():
+    return False
+  if entry['size'] == source_stat.st_size and entry['mtime_ns'] == source_stat.st_mtime_ns:
+    return True
+  return hash_file(input_file) == entry['source_hash']
+
+def sync_mdx_file(task):
+  """
+  Transform one source file into the output tree. Runs in a worker process; returns
+  (rel_path, status, manifest_entry) with status 'written', 'identical' or 'error'.
+  """
+  rel_path, input_file, output_file, keep_languages = task
+  source_stat = os.stat(input_file)
+  source_hash = hash_file(input_file)
+  updated_content = process_mdx_file(input_file, keep_languages)
+  if updated_content is None:
+    return rel_path, 'error', None
+  try:
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    status = 'written' if write_if_changed(output_file, updated_content) else 'identical'
+  except OSError as e:
+    print(f"  ✗ Error saving {output_file}: {e}")
+    return rel_path, 'error', None
+  return rel_path, status, {'size': source_stat.st_size, 'mtime_ns': source_stat.st_mtime_ns,
+                            'source_hash': source_hash}
+
+def prune_stale_outputs(manifest, seen, output_dir, delete):
+  """
+  Handle outputs whose source is gone: with delete, unlink them and forget their manifest
+  entries; otherwise report them and keep the entries so a later --delete run still finds
+  them. Returns (deleted count, stale outputs left in place).
+  """
+  deleted_count = stale_count = 0
+  for rel_path in sorted(set(manifest['files']) - seen):
+    stale_output = output_dir / rel_path
+    if not delete:
+      if stale_output.exists():
+        print(f"  ! Source removed; stale output remains: {stale_output} (use --delete to remove)")
+        stale_count += 1
+        continue
+    elif stale_output.exists():
+      stale_output.unlink()
+      print(f"  ✗ Deleted: {stale_output}")
+      deleted_count += 1
+    del manifest['files'][rel_path]
+  return deleted_count, stale_count
+
 def main():
   """Main function to process all MDX files"""
-  if not BACKUP_DIR.exists():
-    print(f"Error: Backup directory does not exist: {BACKUP_DIR}")
+  parser = argparse.ArgumentParser(description="Reformat MDX files from a source (.bak) tree into an output tree.")
+  parser.add_argument('source_dir', nargs='?', type=Path, default=BACKUP_DIR,
+                      help=f"Tree of original MDX files (default: {BACKUP_DIR}).")
+  parser.add_argument('output_dir', nargs='?', type=Path, default=OUTPUT_DIR,
+                      help=f"Tree to write reformatted files to (default: {OUTPUT_DIR}).")
+  parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help="Worker processes for transforming changed files; 1 runs in this process.")
+  parser.add_argument('--full', action='store_true',
+                      help="Transform every source file, whatever the manifest says has changed.")
+  parser.add_argument('--delete', action='store_true',
+                      help="Delete outputs whose source file has been removed since the last sync.")
+  parser.add_argument('--keep_languages',
+                      help="Comma-separated language tags to keep in the frontmatter (e.g. en,fr); "
+                           "by default only Spanish ('@es') entries are removed.")
+  args = parser.parse_args()
+  source_dir, output_dir = args.source_dir, args.output_dir
+  keep_languages = sorted({lang.strip().lower() for lang in args.keep_languages.split(',') if lang.strip()}) \
+    if args.keep_languages else None
+
+  if not source_dir.exists():
+    print(f"Error: Backup directory does not exist: {source_dir}")
     return
 
-  if not OUTPUT_DIR.exists():
-    print(f"Creating output directory: {OUTPUT_DIR}")
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+  if not output_dir.exists():
+    print(f"Creating output directory: {output_dir}")
+    output_dir.mkdir(parents=True, exist_ok=True)
 
-  # Counter for processed files
-  processed_count = 0
-  error_count = 0
+  # The manifest only knows about the transform, so a different language selection means a full pass.
+  # Entries are kept either way: they are what lets a stale output be reported or deleted later.
+  transform_hash = hashlib.sha256((compute_transform_hash() + repr(keep_languages)).encode()).hexdigest()
+  manifest = load_manifest(output_dir)
+  full_pass = args.full or manifest['transform_hash'] != transform_hash
+  manifest['transform_hash'] = transform_hash
 
   # Walk through all subdirectories in the backup directory
-  for root, dirs, files in os.walk(BACKUP_DIR):
+  tasks = []
+  seen = set()
+  skipped_count = 0
+  for root, dirs, files in os.walk(source_dir):
+    dirs.sort()
     # Get relative path from backup root
-    rel_path = Path(root).relative_to(BACKUP_DIR)
-
-    # Create corresponding output directory
-    output_subdir = OUTPUT_DIR / rel_path
-    if not output_subdir.exists():
-      output_subdir.mkdir(parents=True, exist_ok=True)
-
-    # Process each MDX file
-    for filename in files:
+    rel_root = Path(root).relative_to(source_dir)
+    for filename in sorted(files):
       if filename.endswith('.mdx'):
         input_file = Path(root) / filename
-        output_file = output_subdir / filename
-
-        # Process the file
-        updated_content = process_mdx_file(input_file)
-
-        if updated_content:
-          # Write to output directory
-          try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-              f.write(updated_content)
-            print(f"  ✓ Saved to: {output_file}")
-            processed_count += 1
-          except Exception as e:
-            print(f"  ✗ Error saving {output_file}: {e}")
-            error_count += 1
+        output_file = output_dir / rel_root / filename
+        rel_path = (rel_root / filename).as_posix()
+        seen.add(rel_path)
+        source_stat = os.stat(input_file)
+        entry = manifest['files'].get(rel_path)
+        if not full_pass and is_source_unchanged(entry, input_file, output_file, source_stat):
+          entry.update(size=source_stat.st_size, mtime_ns=source_stat.st_mtime_ns)
+          skipped_count += 1
         else:
-          error_count += 1
+          tasks.append((rel_path, input_file, output_file, keep_languages))
+
+  # Counter for processed files
+  written_count = 0
+  identical_count = 0
+  error_count = 0
+
+  if args.workers > 1 and len(tasks) > 1:
+    with ProcessPoolExecutor(args.workers) as pool:
+      results = list(pool.map(sync_mdx_file, tasks, chunksize=8))
+  else:
+    results = [sync_mdx_file(task) for task in tasks]
+
+  for rel_path, status, entry in results:
+    if status == 'error':
+      manifest['files'].pop(rel_path, None)
+      error_count += 1
+      continue
+    manifest['files'][rel_path] = entry
+    if status == 'written':
+      print(f"  ✓ Saved to: {output_dir / rel_path}")
+      written_count += 1
+    else:
+      identical_count += 1
+
+  deleted_count, stale_count = prune_stale_outputs(manifest, seen, output_dir, args.delete)
+  save_manifest(output_dir, manifest)
 
   print(f"\nProcessing complete!")
-  print(f"Files processed successfully: {processed_count}")
+  print(f"Files written: {written_count}")
+  print(f"Files transformed with identical output: {identical_count}")
+  print(f"Files unchanged since last sync: {skipped_count}")
+  if args.delete:
+    print(f"Outputs deleted: {deleted_count}")
+  elif stale_count:
+    print(f"Stale outputs kept (source removed): {stale_count}")
   print(f"Files with errors: {error_count}")
-  print(f"Total files: {processed_count + error_count}")
+  print(f"Total files: {written_count + identical_count + skipped_count + error_count}")
+  if error_count:
+    sys.exit(1)
 
 if __name__ == "__main__":
   main()
@@ -0,0 +1,83 @@
+import sys
+import json
+
+import pytest
+import yaml
+
+import reformat_mdx
+from reformat_mdx import MANIFEST_FILENAME
+
+# Sync checks for reformat_mdx.
+#   pytest test_reformat_mdx.py
+
+PAGE = """---
+title: Title proper
+---
+## Element Reference
+
+| Definition | Text |
+
+## Stipulations
+"""
+
+
+def _sync(monkeypatch, source_dir, output_dir, *options):
+  monkeypatch.setattr(sys, 'argv', ['reformat_mdx.py', str(source_dir), str(output_dir), '--workers', '1', *options])
+  reformat_mdx.main()
+  with open(output_dir / MANIFEST_FILENAME, encoding='utf-8') as f:
+    return json.load(f)['files']
+
+
+def test_stale_output_survives_sync_until_delete(tmp_path, monkeypatch, capsys):
+  source_dir, output_dir = tmp_path / 'isbd.bak', tmp_path / 'isbd'
+  (source_dir / 'area1').mkdir(parents=True)
+  for name in ('1001.mdx', '1002.mdx'):
+    (source_dir / 'area1' / name).write_text(PAGE, encoding='utf-8')
+  assert sorted(_sync(monkeypatch, source_dir, output_dir)) == ['area1/1001.mdx', 'area1/1002.mdx']
+
+  (source_dir / 'area1' / '1002.mdx').unlink()
+  assert sorted(_sync(monkeypatch, source_dir, output_dir)) == ['area1/1001.mdx', 'area1/1002.mdx']
+  assert (output_dir / 'area1' / '1002.mdx').exists()
+  assert 'stale output remains' in capsys.readouterr().out
+
+  assert sorted(_sync(monkeypatch, source_dir, output_dir, '--delete')) == ['area1/1001.mdx']
+  assert not (output_dir / 'area1' / '1002.mdx').exists()
+  assert (output_dir / 'area1' / '1001.mdx').exists()
+
+
+def _filtered(yaml_content, **languages):
+  return yaml.safe_load(reformat_mdx.filter_frontmatter_languages(yaml_content, **languages))
+
+
+def test_tagged_scalar_values_are_removed():
+  assert _filtered("\ntitle: Title\nlabel: Titre@es\naltLabel:\n- Title@en\n- Titulo@es\n", drop_languages={'es'}) == \
+    {'title': 'Title', 'altLabel': ['Title@en']}
+  assert reformat_mdx.remove_spanish_from_yaml("\nlabel: '\"Titre\"@es'\n") == '\n{}\n'
+
+
+def test_keep_mode_only_drops_vocabulary_tags():
+  yaml_content = ("\nskos:definition@en: Definition\nskos:definition@fr[0]: Définition\nlabel: Titre@es-ES\n"
+                  "contact: name@ifla\nemail: jon@ifla.org\nmaintainer@bnf: yes\nslug: /docs/a@b\n")
+  assert _filtered(yaml_content, keep_languages={'en'}) == {
+    'skos:definition@en': 'Definition', 'contact': 'name@ifla', 'email': 'jon@ifla.org', 'maintainer@bnf': True,
+    'slug': '/docs/a@b'}
+
+
+def test_untagged_frontmatter_is_returned_unchanged():
+  yaml_content = "\ntitle: Title  # comment kept\ncontact: name@ifla\n"
+  assert reformat_mdx.filter_frontmatter_languages(yaml_content, keep_languages={'en'}) == yaml_content
+
+
+@pytest.mark.parametrize("full_option", [['--full'], ['--keep_languages', 'en']])
+def test_full_pass_still_deletes_stale_outputs(tmp_path, monkeypatch, full_option):
+  source_dir, output_dir = tmp_path / 'isbd.bak', tmp_path / 'isbd'
+  source_dir.mkdir()
+  for name in ('a.mdx', 'b.mdx'):
+    (source_dir / name).write_text(PAGE, encoding='utf-8')
+  _sync(monkeypatch, source_dir, output_dir)
+
+  (source_dir / 'b.mdx').unlink()
+  (output_dir / 'a.mdx').write_text('stale', encoding='utf-8')
+  assert sorted(_sync(monkeypatch, source_dir, output_dir, *full_option, '--delete')) == ['a.mdx']
+  assert not (output_dir / 'b.mdx').exists()
+  assert (output_dir / 'a.mdx').read_text(encoding='utf-8') != 'stale' # Re-transformed despite an unchanged source